@@ -13,6 +13,9 @@ import re
 from app.agents.amazon_automator.automator import AmazonAutomator
 # Assuming search is in this path
 from app.tools.Amazon_tools.search import AmazonScraper
+from app.tools.crawler_pool import crawler_pool
+from app.tools.http_fetch import http_fetcher
+from app.browser.pool import browser_pool
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -61,7 +64,7 @@ async def _is_session_valid(session_file: str) -> bool:
         session_store_path=session_file
     )
     try:
-        await automator.initialize_browser()
+        await automator.initialize_browser(pool=browser_pool)
         # Go to a page that reliably shows login state
         await automator.page.goto("https://www.amazon.in/gp/css/homepage.html", wait_until="networkidle")
         
@@ -94,6 +97,7 @@ class SearchRequest(BaseModel):
     product_name: str
     max_pages: Optional[int] = 2
     max_items: Optional[int] = None
+    email_or_phone: Optional[str] = None  # search with this user's saved session cookies, when logged in
 
 class ProductSelectionRequest(BaseModel):
     email_or_phone: str
@@ -130,7 +134,7 @@ async def login_user(request: LoginRequest):
     )
     
     try:
-        await automator.initialize_browser() # This will load old session if it exists
+        await automator.initialize_browser(pool=browser_pool) # This will load old session if it exists
         
         await automator.page.goto(
             "https://www.amazon.in/ap/signin?openid.pape.max_auth_age=0&openid.return_to=https%3A%2F%2Fwww.amazon.in%2F%3Fref_%3Dnav_signin&openid.identity=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.assoc_handle=inflex&openid.mode=checkid_setup&openid.claimed_id=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.ns=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0",
@@ -193,9 +197,11 @@ async def run_search_flow(
     async def scraping_task():
         try:
             logger.info(f"Starting background scrape for '{request.product_name}'")
+            session_file = _get_session_filepath(request.email_or_phone) if request.email_or_phone else None
             extractor = AmazonScraper(
                 max_pages=request.max_pages,
-                max_items=request.max_items
+                max_items=request.max_items,
+                storage_state=session_file if session_file and Path(session_file).exists() else None
             )
             results = await extractor.search(request.product_name)
             
@@ -220,6 +226,17 @@ async def run_search_flow(
         "output_file": str(product_file_path)
     }
 
+# ----------------------------
+# Endpoint: Fetch tier stats
+# ----------------------------
+@router.get("/fetch-stats")
+async def fetch_stats():
+    """How many search pages were served over plain HTTP vs escalated to the browser, and why."""
+    return {
+        "http_fetch": http_fetcher.stats().get("amazon", {}),
+        "crawler_pool": crawler_pool.stats(),
+    }
+
 # ----------------------------
 # Endpoint: Product selection
 # ----------------------------
@@ -271,7 +288,7 @@ async def select_product(request: ProductSelectionRequest):
 
     try:
         # This will load the saved session file and be logged in
-        await automator.initialize_browser()
+        await automator.initialize_browser(pool=browser_pool)
         
         
         # Select the product from the list
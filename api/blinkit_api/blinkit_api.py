@@ -1,7 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-from playwright.async_api import async_playwright
 import uuid
 import sys
 import os
@@ -11,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from app.agents.blinkit.blinkit_automation import automate_blinkit, login, AUTH_FILE_PATH, enter_otp_and_save_session, search_multiple_products, add_product_to_cart, add_address, submit_upi_and_pay
 from app.prompts.blinkit_prompts.blinkit_prompts import analyze_query
+from app.browser.pool import browser_pool
 
 router = APIRouter()
 
@@ -49,15 +49,12 @@ class UpiRequest(BaseModel):
 @router.post("/login")
 async def start_login(request: LoginRequest):
     session_id = str(uuid.uuid4())
-    playwright = await async_playwright().start()
     
     try:
-        context, page = await login(playwright, request.phone_number, request.location)
-        ACTIVE_SESSIONS[session_id] = {"context": context, "playwright": playwright}
+        context, page = await login(browser_pool, request.phone_number, request.location)
+        ACTIVE_SESSIONS[session_id] = {"context": context}
         return {"status": "success", "session_id": session_id, "message": "Login process initiated. Please submit OTP."}
     except Exception as e:
-        # Ensure playwright is stopped on failure
-        await playwright.stop()
         raise HTTPException(status_code=500, detail=f"Failed to initiate login: {e}")
 
 @router.post("/submit-otp")
@@ -67,15 +64,14 @@ async def submit_otp(request: OtpSubmitRequest):
         raise HTTPException(status_code=404, detail="Session not found, expired, or already used.")
     
     context = session["context"]
-    playwright = session["playwright"]
     
     try:
         await enter_otp_and_save_session(context, request.otp)
         return {"status": "success", "message": "OTP submitted and session saved."}
     finally:
-        # Ensure cleanup happens even if OTP submission fails
-        await context.browser.close()
-        await playwright.stop()
+        # Ensure cleanup happens even if OTP submission fails.
+        # Only the leased context is closed; the pooled browser stays up.
+        await context.close()
         ACTIVE_SESSIONS.pop(request.session_id, None)
 
 @router.post("/search")
@@ -89,12 +85,11 @@ async def search_for_product(request: SearchRequest):
         raise HTTPException(status_code=401, detail="User not logged in. Please complete the login flow first.")
 
     session_id = str(uuid.uuid4())
-    playwright = await async_playwright().start()
 
     try:
-        context, page, results = await search_multiple_products(playwright, queries)
+        context, page, results = await search_multiple_products(browser_pool, queries)
         # Store the context for subsequent operations like 'add-to-cart'
-        ACTIVE_SESSIONS[session_id] = {"context": context, "playwright": playwright}
+        ACTIVE_SESSIONS[session_id] = {"context": context}
         
         return {
             "status": "success", 
@@ -103,7 +98,6 @@ async def search_for_product(request: SearchRequest):
             "results": results
         }
     except Exception as e:
-        await playwright.stop()
         raise HTTPException(status_code=500, detail=f"An error occurred during search: {e}")
 
 @router.post("/add-to-cart")
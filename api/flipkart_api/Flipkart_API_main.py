@@ -9,7 +9,10 @@ from datetime import datetime
 from app.agents.flipkart.automation.core import FlipkartAutomation
 from app.agents.flipkart.automation.steps import FlipkartSteps
 from app.tools.flipkart_tools.search import FlipkartCrawler
+from app.tools.crawler_pool import crawler_pool
+from app.tools.http_fetch import http_fetcher
 from app.agents.flipkart.utills.logger import setup_logger
+from app.browser.pool import browser_pool
 
 logger = setup_logger()
 router = APIRouter()
@@ -28,6 +31,7 @@ class OTPVerifyRequest(BaseModel):
 class SearchRequest(BaseModel):
     product_name: str
     max_pages: int = Field(default=1, ge=1, le=5)
+    phone: Optional[str] = None  # search with this user's saved session cookies, when logged in
 
 class ShippingInfo(BaseModel):
     name: str
@@ -58,7 +62,7 @@ async def login(request: LoginRequest):
     try:
         # Initialize browser
         automation = FlipkartAutomation()
-        await automation.initialize_browser()
+        await automation.initialize_browser(pool=browser_pool)
         
         # Navigate to Flipkart
         await automation.page.goto("https://www.flipkart.com/account/login?ret=/")
@@ -138,7 +142,12 @@ async def verify_otp(request: OTPVerifyRequest):
 async def search_products(request: SearchRequest):
     """Search Flipkart products and save results"""
     try:
-        crawler = FlipkartCrawler(concurrency=2, rate_limit_delay=1.0)
+        session_file = Path(f"sessions/.flipkart_session_{request.phone}.json") if request.phone else None
+        crawler = FlipkartCrawler(
+            concurrency=2,
+            rate_limit_delay=1.0,
+            storage_state=str(session_file) if session_file and session_file.exists() else None,
+        )
         
         # Search products
         products = await crawler.search(request.product_name, max_pages=request.max_pages)
@@ -173,6 +182,15 @@ async def search_products(request: SearchRequest):
         raise HTTPException(500, f"Search failed: {str(e)}")
 
 
+@router.get("/fetch-stats")
+async def fetch_stats():
+    """How many search pages were served over plain HTTP vs escalated to the browser, and why."""
+    return {
+        "http_fetch": http_fetcher.stats().get("flipkart", {}),
+        "crawler_pool": crawler_pool.stats(),
+    }
+
+
 @router.post("/run-automation")
 async def run_automation(request: AutomationRequest, background_tasks: BackgroundTasks):
     """Execute complete Flipkart purchase automation"""
@@ -224,7 +242,7 @@ async def run_automation(request: AutomationRequest, background_tasks: Backgroun
     # 5. Run automation
     try:
         automation = FlipkartAutomation()
-        await automation.initialize_browser()
+        await automation.initialize_browser(pool=browser_pool)
         
         logger.info("Navigate to product")
         await automation.page.goto(product_url)
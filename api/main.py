@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -11,8 +13,33 @@ from api.ride_booking_api import api
 from api.blinkit_api.blinkit_api import router as blinkit_router
 from api.zepto_api.zepto_api import router as zepto_router
 from api.swiggy_api.swiggy_api import router as swiggy_router
+from app.browser.pool import browser_pool
+from app.tools.crawler_pool import crawler_pool
+from app.tools.http_fetch import http_fetcher
+from app.tools.parse_pool import shutdown_parse_pool
 import uvicorn
 
+# -------------------------------------------------
+# Lifespan: shared Playwright driver + browser pool
+# -------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await browser_pool.start()
+    # Warm ride-booking pages in the background so startup isn't blocked on logins.
+    warm_task = asyncio.create_task(api.start_ride_pools())
+    # Boot the shared scraper crawler the same way, so the first product search starts immediately.
+    crawler_task = asyncio.create_task(crawler_pool.start())
+    try:
+        yield
+    finally:
+        warm_task.cancel()
+        crawler_task.cancel()
+        await api.stop_ride_pools()
+        await crawler_pool.stop()
+        await http_fetcher.close()
+        await browser_pool.stop()
+        shutdown_parse_pool()
+
 # -------------------------------------------------
 # Initialize app once
 # -------------------------------------------------
@@ -20,6 +47,7 @@ app = FastAPI(
     title="Khwaaish API",
     description="A single API to rule them all.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # -------------------------------------------------
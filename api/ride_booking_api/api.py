@@ -1,27 +1,47 @@
 import asyncio
+import json
+import time
 import uuid
-import asyncio
 import traceback
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 import re
 from fastapi import APIRouter
 
-# from app.agents.ride_booking.ola.core import OlaAutomation
-from app.agents.ride_booking.uber.core import UberAutomation
-from app.agents.ride_booking.rapido.core import RapidoAutomation
+from app.agents.ride_booking.config import Config
+from app.agents.ride_booking.fare_cache import fare_cache
+from app.agents.ride_booking.fare_matrix import MATRIX_PLATFORMS, compute_fare_matrix
+from app.agents.ride_booking.llm.health import llm_health
+from app.agents.ride_booking.llm.provider import close_llm_clients
+from app.agents.ride_booking.llm.recovery_cache import recovery_cache
+from app.agents.ride_booking.platforms import RIDE_PLATFORMS, RidePlatform
+from app.agents.ride_booking.ranking import price_sort_key, summarize_rides
 from app.agents.ride_booking.utills.logger import setup_logger
+from app.agents.ride_booking.search_job import RideSearchJob
+from app.agents.ride_booking.warm_pool import ride_pools
 
 # --- Pydantic Models for API Request/Response ---
 
 class RideSearchRequest(BaseModel):
-    """Defines the data needed to perform a ride search."""
+    """
+    Defines the data needed to perform a ride search.
+    A platform is searched only when its session name is given.
+    """
     pickup_location: str
     destination_location: str
-    # ola_session_name: str
-    uber_session_name: str
-    rapido_session_name: str
+    ola_session_name: Optional[str] = None
+    uber_session_name: Optional[str] = None
+    rapido_session_name: Optional[str] = None
+    # Serve recent fares for the same route from cache first. Cached rides are not bookable on their own.
+    use_cache: bool = True
+    # After a cache hit, still run the live search so the job holds an automation and can /book.
+    # Send False for a price check only: the cached answer is final and a stale entry refreshes in the background.
+    live: bool = True
+
+    def session_for(self, platform: str) -> Optional[str]:
+        return getattr(self, f"{platform.lower()}_session_name", None)
 
 class Ride(BaseModel):
     """A structured model for a single ride option."""
@@ -31,8 +51,60 @@ class Ride(BaseModel):
     raw_details: Dict[str, Any]
 
 class RideSearchResponse(BaseModel):
-    """The response containing the job ID and all found ride options."""
+    """Current state of a search job: per-platform progress and the rides found so far, sorted by price."""
     job_id: str
+    status: str
+    platforms: Dict[str, Dict[str, Any]]
+    rides: List[Ride]
+    summary: Optional[Dict[str, Any]] = None  # cheapest / fastest / best_value, ranked locally
+
+class RideSearchJobResponse(BaseModel):
+    """Returned immediately by /search; results arrive on the stream or poll URLs."""
+    job_id: str
+    status: str
+    stream_url: str
+    poll_url: str
+
+class RoutePair(BaseModel):
+    pickup_location: str
+    destination_location: str
+
+class FareMatrixRequest(BaseModel):
+    """A batch of routes to price on each platform whose session name is given (Uber and Rapido only)."""
+    pairs: List[RoutePair]
+    uber_session_name: Optional[str] = None
+    rapido_session_name: Optional[str] = None
+    max_tabs: Optional[int] = None
+
+    def session_for(self, platform: str) -> Optional[str]:
+        return getattr(self, f"{platform.lower()}_session_name", None)
+
+class FareMatrixCell(BaseModel):
+    """Ride options for one route on one platform."""
+    platform: str
+    pickup_location: str
+    destination_location: str
+    status: str
+    elapsed_ms: int
+    rides: List[Ride]
+    error: Optional[str] = None
+
+class FareMatrixResponse(BaseModel):
+    """One cell per (route, platform), routes in request order."""
+    cells: List[FareMatrixCell]
+
+class FareWatchRequest(BaseModel):
+    """Search one route on one platform and keep its results page open to watch fares."""
+    platform: str
+    session_name: str
+    pickup_location: str
+    destination_location: str
+    poll_interval: Optional[float] = None
+
+class FareWatchResponse(BaseModel):
+    watch_id: str
+    platform: str
+    stream_url: str
     rides: List[Ride]
 
 class RideBookingRequest(BaseModel):
@@ -49,7 +121,7 @@ class BookingResponse(BaseModel):
 
 app = FastAPI(
     title="Ride Booking Aggregator API",
-    description="An API to automate searching and booking rides on Ola and Uber.",
+    description="An API to automate searching and booking rides on Ola, Uber and Rapido.",
 )
 
 router = APIRouter()
@@ -58,7 +130,16 @@ logger = setup_logger()
 
 # In-memory storage for active automation jobs.
 # In a production scenario, you might replace this with Redis or another persistent store.
-active_jobs: Dict[str, Dict[str, Any]] = {}
+active_jobs: Dict[str, RideSearchJob] = {}
+
+# Searches that missed their job's deadline but are still running to fill the fare cache.
+straggler_tasks: Set[asyncio.Task] = set()
+
+# Open fare watches: watch_id -> {"platform", "watch", "automation", "pool"}.
+active_watches: Dict[str, Dict[str, Any]] = {}
+
+# Background task that expires abandoned jobs and idle watches; started with the warm pools.
+reaper_task: Optional[asyncio.Task] = None
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -75,125 +156,414 @@ async def shutdown_event():
     # Create a list of 'stop' tasks to run in parallel for all active jobs
     shutdown_tasks = []
     # Use list(active_jobs.items()) to avoid "dictionary changed size during iteration" error
-    for job_id, job_data in list(active_jobs.items()):
+    for job_id, job in list(active_jobs.items()):
         logger.info(f"Scheduling cleanup for job_id: {job_id}")
-        if job_data.get("uber"):
-            shutdown_tasks.append(job_data["uber"].stop())
-        if job_data.get("rapido"):
-            shutdown_tasks.append(job_data["rapido"].stop())
+        if job.task and not job.task.done():
+            job.task.cancel()
+        for automation in job.automations.values():
+            shutdown_tasks.append(automation.stop())
     
-    await asyncio.gather(*shutdown_tasks)
+    await asyncio.gather(*shutdown_tasks, return_exceptions=True)
     logger.info(f"Cleaned up {len(active_jobs)} active job(s). Shutdown complete.")
 
-def _parse_price(price_str: Optional[str]) -> float:
-    """Helper function to parse price strings like '₹1,234' into a float."""
-    if price_str is None:
-        return float('inf')
-    # Remove currency symbols, commas, and whitespace, then convert to float
-    cleaned_price = re.sub(r'[^\d.]', '', price_str)
-    return float(cleaned_price) if cleaned_price else float('inf')
+
+async def _release_job(job: RideSearchJob):
+    """Hand a job's automations back to their warm pools, which reset them to the entry screen."""
+    await asyncio.gather(*(
+        job.pools[name].release(automation) for name, automation in job.automations.items()
+    ))
+    job.automations.clear()
+
+
+async def _reap_expired():
+    """
+    Every RIDE_REAPER_INTERVAL seconds, release and drop finished jobs older than
+    RIDE_JOB_TTL that were never booked, and close fare watches nobody has
+    streamed for FARE_WATCH_IDLE_TTL seconds.
+    """
+    while True:
+        await asyncio.sleep(Config.RIDE_REAPER_INTERVAL)
+        now = time.time()
+        for job_id, job in list(active_jobs.items()):
+            if job.done and now - job.created_at > Config.RIDE_JOB_TTL:
+                active_jobs.pop(job_id, None)
+                logger.info(f"Job {job_id}: expired unbooked; returning its automations to the warm pool.")
+                try:
+                    await _release_job(job)
+                except Exception as e:
+                    logger.error(f"Job {job_id}: failed to release automations: {e}")
+        for watch_id, entry in list(active_watches.items()):
+            if entry["watch"].idle_for > Config.FARE_WATCH_IDLE_TTL:
+                logger.info(f"Watch {watch_id}: idle for {entry['watch'].idle_for:.0f}s; closing it.")
+                try:
+                    await _close_watch(watch_id)
+                except Exception as e:
+                    logger.error(f"Watch {watch_id}: failed to close: {e}")
+
+
+async def start_ride_pools():
+    """Park pre-authenticated Uber/Rapido pages for the configured sessions. Called from the app lifespan."""
+    global reaper_task
+    if reaper_task is None:
+        reaper_task = asyncio.create_task(_reap_expired())
+    try:
+        await ride_pools.warm_configured()
+    except Exception as e:
+        logger.error(f"Failed to warm ride-booking pools: {e}")
+
+
+async def stop_ride_pools():
+    """Stop every parked automation and any automation still held by a job or a late search."""
+    global reaper_task
+    if reaper_task is not None:
+        reaper_task.cancel()
+        reaper_task = None
+    for task in list(straggler_tasks):
+        task.cancel()
+    fare_cache.cancel_refreshes()
+    for watch_id in list(active_watches):
+        await _close_watch(watch_id)
+    await shutdown_event()
+    active_jobs.clear()
+    await ride_pools.stop_all()
+    await close_llm_clients()
+
+# --- Search job helpers ---
+
+def _to_api_ride(platform: str, ride: Dict[str, Any]) -> Ride:
+    """Build the serializable API view of a ride, dropping the Playwright locator some platforms attach."""
+    serializable_details = {k: v for k, v in ride.items() if k != 'locator'}
+    serializable_details['platform'] = platform # Ensure platform is in details
+    return Ride(platform=platform, name=ride['name'], price=ride.get('price'), raw_details=serializable_details)
+
+
+async def _lease_and_search(pool, request: RideSearchRequest):
+    """Lease an automation and run its search. A failed or cancelled automation is handed back to be stopped."""
+    automation = await pool.acquire()
+    try:
+        results = await automation.search_rides(request.pickup_location, request.destination_location)
+    except BaseException:
+        await pool.release(automation, reusable=False)
+        raise
+    return automation, results
+
+
+async def _absorb_straggler(platform: RidePlatform, pool, search: asyncio.Task, request: RideSearchRequest):
+    """Let a search that missed its job's deadline finish, cache its rides for the next request, and return the automation."""
+    try:
+        automation, results = await search
+    except Exception as e:
+        logger.warning(f"Late {platform.name} search failed: {e}")
+        return
+    try:
+        fare_cache.put(platform.name, request.pickup_location, request.destination_location,
+                       [_to_api_ride(platform.name, r).model_dump() for r in results])
+        logger.info(f"Late {platform.name} search cached {len(results)} rides.")
+    finally:
+        await pool.release(automation)
+
+
+async def _refresh_fares(platform: RidePlatform, pool, request: RideSearchRequest):
+    """Background refresh of a stale cache entry through the platform's warm pool. Failures are logged by the cache."""
+    automation, results = await _lease_and_search(pool, request)
+    try:
+        fare_cache.put(platform.name, request.pickup_location, request.destination_location,
+                       [_to_api_ride(platform.name, r).model_dump() for r in results])
+        logger.info(f"Background refresh cached {len(results)} {platform.name} rides.")
+    finally:
+        await pool.release(automation)
+
+
+async def _search_platform(job: RideSearchJob, platform: RidePlatform, request: RideSearchRequest, budget_ms: int):
+    """Search one platform within its budget and report the result on the job."""
+    pool = ride_pools.pool_for(platform.automation_cls, request.session_for(platform.name))
+
+    if request.use_cache:
+        cached = fare_cache.get(platform.name, request.pickup_location, request.destination_location)
+        if cached:
+            logger.info(f"Job {job.job_id}: Serving {platform.name} from cache "
+                        f"({'fresh' if cached.fresh else 'stale'}, {cached.age:.0f}s old).")
+            await job.platform_cached(platform.name, cached.rides, round(cached.age, 1), cached.fresh)
+            if not request.live:
+                if not cached.fresh:
+                    fare_cache.refresh(platform.name, request.pickup_location, request.destination_location,
+                                       lambda: _refresh_fares(platform, pool, request))
+                return
+            # The live search below replaces the cached rides with bookable ones and refreshes the cache.
+
+    started = time.perf_counter()
+    await job.platform_started(platform.name)
+
+    search = asyncio.create_task(_lease_and_search(pool, request))
+    try:
+        automation, results = await asyncio.wait_for(asyncio.shield(search), timeout=budget_ms / 1000)
+    except asyncio.CancelledError:
+        # The shield keeps the search alive past our cancellation: stop it (its automation is
+        # released by _lease_and_search), or release the automation if it had just finished.
+        search.cancel()
+        if search.done() and not search.cancelled() and search.exception() is None:
+            await pool.release(search.result()[0])
+        raise
+    except asyncio.TimeoutError:
+        # Keep the browser flow running so its rides land in the cache for the next request.
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        straggler = asyncio.create_task(_absorb_straggler(platform, pool, search, request))
+        straggler_tasks.add(straggler)
+        straggler.add_done_callback(straggler_tasks.discard)
+
+        cached = fare_cache.peek(platform.name, request.pickup_location, request.destination_location)
+        logger.warning(f"Job {job.job_id}: {platform.name} missed its {budget_ms}ms budget"
+                       + (f"; serving rides cached {cached.age:.0f}s ago." if cached else "."))
+        await job.platform_timed_out(
+            platform.name,
+            elapsed_ms,
+            cached.rides if cached else None,
+            round(cached.age, 1) if cached else None,
+        )
+        return
+    except Exception as e:
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        logger.error(f"Job {job.job_id}: Failed to get {platform.name} rides: {e}")
+        await job.platform_failed(platform.name, str(e), elapsed_ms)
+        return
+
+    elapsed_ms = int((time.perf_counter() - started) * 1000)
+    logger.info(f"Job {job.job_id}: Found {len(results)} rides on {platform.name} in {elapsed_ms}ms.")
+    # The automation stays with the job until /book, since its page holds the results.
+    job.automations[platform.name] = automation
+    job.pools[platform.name] = pool
+    for ride in results:
+        ride['platform'] = platform.name # Add platform to the original ride object for matching
+        # The original ride keeps any Playwright locator; it is stored for the booking step.
+        job.all_rides.append(ride)
+    api_rides = [_to_api_ride(platform.name, r).model_dump() for r in results]
+    fare_cache.put(platform.name, request.pickup_location, request.destination_location, api_rides)
+    await job.platform_completed(platform.name, api_rides, elapsed_ms)
+
+
+async def _run_search_job(job: RideSearchJob, request: RideSearchRequest):
+    """
+    Search every requested platform concurrently; each one publishes as soon as it finishes.
+    No platform may run past its own budget or the overall deadline, whichever is sooner.
+    """
+    try:
+        await asyncio.gather(*(
+            _search_platform(job, RIDE_PLATFORMS[name], request, min(RIDE_PLATFORMS[name].budget_ms, Config.RIDE_SEARCH_DEADLINE))
+            for name in job.platforms
+        ))
+    finally:
+        await job.finish()
+        logger.info(f"Job {job.job_id}: Search finished with status '{job.status}'.")
+
+
+def _get_job(job_id: str) -> RideSearchJob:
+    job = active_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+def _format_event(event: Dict[str, Any], fmt: str) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    if fmt == "ndjson":
+        return data + "\n"
+    return f"event: {event['event']}\ndata: {data}\n\n"
 
 
 # --- API Endpoints ---
 
-@router.post("/search", response_model=RideSearchResponse)
+@router.post("/search", response_model=RideSearchJobResponse, status_code=202)
 async def search_for_rides(request: RideSearchRequest):
     """
-    Initializes a new automation job, searches for rides on both platforms,
-    and returns the combined, sorted results.
+    Starts a ride search on every platform and returns the job ID immediately.
 
-    Note: This is a long-running endpoint and may take 30-60 seconds to respond.
+    Results arrive per platform as each search finishes: stream them from
+    /search/{job_id}/stream (Server-Sent Events, or NDJSON with ?format=ndjson),
+    or poll /search/{job_id}.
     """
     job_id = str(uuid.uuid4())
     logger.info(f"Creating new job with ID: {job_id}")
 
-    # ola_automation = OlaAutomation()
-    uber_automation = UberAutomation()
-    rapido_automation = RapidoAutomation()
+    platforms = [name for name in RIDE_PLATFORMS if request.session_for(name)]
+    if not platforms:
+        raise HTTPException(status_code=400, detail="Provide a session name for at least one platform (ola, uber, rapido).")
 
+    job = RideSearchJob(job_id, platforms)
+    active_jobs[job_id] = job
+    job.task = asyncio.create_task(_run_search_job(job, request))
+
+    return RideSearchJobResponse(
+        job_id=job_id,
+        status=job.status,
+        stream_url=f"/ride-booking/search/{job_id}/stream",
+        poll_url=f"/ride-booking/search/{job_id}",
+    )
+
+
+@router.get("/search/{job_id}", response_model=RideSearchResponse)
+async def get_search_results(job_id: str):
+    """Polling fallback: the job's progress and all rides found so far, sorted by price."""
+    job = _get_job(job_id)
+    snapshot = job.snapshot()
+    rides = sorted((Ride(**r) for r in job.rides()), key=lambda r: price_sort_key(r.price))
+    summary = summarize_rides([r.raw_details for r in rides]) if rides else None
+    return RideSearchResponse(rides=rides, summary=summary, **snapshot)
+
+
+@router.get("/search/{job_id}/stream")
+async def stream_search_results(job_id: str, format: str = Query("sse", pattern="^(sse|ndjson)$")):
+    """Streams one event per platform as its search finishes, then a final 'done' event."""
+    job = _get_job(job_id)
+
+    async def event_source():
+        async for event in job.stream():
+            yield _format_event(event, format)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(event_source(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/fare-matrix", response_model=FareMatrixResponse)
+async def fare_matrix(request: FareMatrixRequest):
+    """
+    Prices many routes in one call. Each platform leases a single authenticated
+    browser context and searches the routes in parallel tabs of it.
+    """
+    if not request.pairs:
+        raise HTTPException(status_code=400, detail="Provide at least one route pair.")
+    if len(request.pairs) > Config.FARE_MATRIX_MAX_PAIRS:
+        raise HTTPException(status_code=400, detail=f"At most {Config.FARE_MATRIX_MAX_PAIRS} route pairs per request.")
+    platforms = [RIDE_PLATFORMS[name] for name in MATRIX_PLATFORMS if request.session_for(name)]
+    if not platforms:
+        raise HTTPException(status_code=400, detail="Provide a session name for Uber and/or Rapido.")
+
+    pairs = [(p.pickup_location, p.destination_location) for p in request.pairs]
+    max_tabs = min(request.max_tabs or Config.FARE_MATRIX_MAX_TABS, Config.FARE_MATRIX_MAX_TABS)
+    results = await asyncio.gather(
+        *(compute_fare_matrix(platform, request.session_for(platform.name), pairs, max_tabs) for platform in platforms),
+        return_exceptions=True,
+    )
+
+    cells = []
+    for platform, platform_cells in zip(platforms, results):
+        if isinstance(platform_cells, Exception):
+            # The platform could not lease a browser at all; every route fails for it.
+            logger.error(f"Fare matrix: {platform.name} unavailable: {platform_cells}")
+            platform_cells = [
+                {"platform": platform.name, "pickup": pickup, "destination": destination,
+                 "status": "failed", "rides": [], "error": str(platform_cells), "elapsed_ms": 0}
+                for pickup, destination in pairs
+            ]
+        for cell in platform_cells:
+            rides = [_to_api_ride(platform.name, r) for r in cell["rides"]]
+            if cell["status"] == "completed":
+                # Same shape as _search_platform caches, so a later /search for the route can serve it.
+                fare_cache.put(platform.name, cell["pickup"], cell["destination"], [r.model_dump() for r in rides])
+            cells.append(FareMatrixCell(
+                platform=cell["platform"],
+                pickup_location=cell["pickup"],
+                destination_location=cell["destination"],
+                status=cell["status"],
+                elapsed_ms=cell["elapsed_ms"],
+                rides=sorted(rides, key=lambda r: price_sort_key(r.price)),
+                error=cell.get("error"),
+            ))
+
+    # Group by route (request order), then platform.
+    route_order = {pair: i for i, pair in reversed(list(enumerate(pairs)))}
+    cells.sort(key=lambda c: route_order[(c.pickup_location, c.destination_location)])
+    return FareMatrixResponse(cells=cells)
+
+
+async def _close_watch(watch_id: str):
+    entry = active_watches.pop(watch_id, None)
+    if entry is None:
+        return  # already closed by a concurrent DELETE or the idle reaper
+    await entry["watch"].stop()
+    await entry["pool"].release(entry["automation"])
+
+
+@router.post("/watch", response_model=FareWatchResponse)
+async def start_fare_watch(request: FareWatchRequest):
+    """
+    Runs one search and then keeps its results page open. Fare changes are pushed
+    on /watch/{watch_id}/stream until the watch is deleted, or closed after
+    FARE_WATCH_IDLE_TTL seconds with no stream connected.
+    """
+    platform = RIDE_PLATFORMS.get(request.platform)
+    if not platform or not hasattr(platform.automation_cls, "watch_fares"):
+        raise HTTPException(status_code=400, detail="Fare watch is available for Uber and Rapido.")
+
+    pool = ride_pools.pool_for(platform.automation_cls, request.session_name)
     try:
-        # --- 1. Initialize Browsers ---
-        logger.info(f"Job {job_id}: Initializing browsers and sessions...")
-        await asyncio.gather(
-            # ola_automation.initialize(request.ola_session_name),
-            uber_automation.initialize(request.uber_session_name),
-            rapido_automation.initialize(request.rapido_session_name)
-        )
-        logger.info(f"Job {job_id}: Browsers are ready.")
+        automation, results = await _lease_and_search(pool, request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{platform.name} search failed: {e}")
 
+    watch = automation.watch_fares(request.poll_interval or Config.FARE_WATCH_POLL_INTERVAL)
+    try:
+        await watch.start()
     except Exception as e:
-        error_message = f"Initialization failed for job {job_id}: {e}\n{traceback.format_exc()}"
-        logger.error(error_message)
-        # Ensure cleanup even on initialization failure
-        await asyncio.gather(uber_automation.stop(), rapido_automation.stop())
-        raise HTTPException(status_code=500, detail=f"Browser initialization failed: {e}")
-
-    # --- 5. Search for Rides in Parallel (from aggregator.py) ---
-    # ola_task = ola_automation.search_rides(request.pickup_location, request.destination_location)
-    uber_task = uber_automation.search_rides(request.pickup_location, request.destination_location)
-    rapido_task = rapido_automation.search_rides(request.pickup_location, request.destination_location)
-    # return_exceptions=True prevents one failure from stopping the other.
-    uber_results, rapido_results = await asyncio.gather(uber_task, rapido_task, return_exceptions=True)
-
-    # --- 6. Combine and Process Results (from aggregator.py) ---
-    all_rides = []
-    api_response_rides = []
-
-    # if isinstance(ola_results, list):
-    #     logger.info(f"Job {job_id}: Found {len(ola_results)} rides on Ola.")
-    #     for ride in ola_results:
-    #         ride['platform'] = 'Ola' # Add platform to the original ride object for matching
-    #         # The original 'ride' object contains the non-serializable Playwright locator.
-    #         # We store it in 'all_rides' for the booking step.
-    #         all_rides.append(ride)
-            
-    #         # For the API response, we create a serializable copy and remove the locator.
-    #         serializable_details = ride.copy()
-    #         serializable_details.pop('locator', None) # Safely remove the locator
-    #         serializable_details['platform'] = 'Ola' # Ensure platform is in details
-    #         api_response_rides.append(Ride(platform='Ola', name=ride['name'], price=ride.get('price'), raw_details=serializable_details))
-    # else:
-    #     logger.error(f"Job {job_id}: Failed to get Ola rides: {ola_results}")
-
-    if isinstance(uber_results, list):
-        logger.info(f"Job {job_id}: Found {len(uber_results)} rides on Uber.")
-        for ride in uber_results:
-            ride['platform'] = 'Uber' # Add platform to the original ride object for matching
-            # Uber results are already JSON-friendly.
-            all_rides.append(ride)
-            serializable_details = ride.copy()
-            serializable_details['platform'] = 'Uber' # Ensure platform is in details
-            api_response_rides.append(Ride(platform='Uber', name=ride['name'], price=ride.get('price'), raw_details=serializable_details))
-    else:
-        logger.error(f"Job {job_id}: Failed to get Uber rides: {uber_results}")
-
-    if isinstance(rapido_results, list):
-        logger.info(f"Job {job_id}: Found {len(rapido_results)} rides on Rapido.")
-        for ride in rapido_results:
-            ride['platform'] = 'Rapido' # Add platform to the original ride object for matching
-            all_rides.append(ride)
-            
-            # For the API response, create a serializable copy and remove the locator.
-            serializable_details = ride.copy()
-            serializable_details.pop('locator', None) # Safely remove the locator
-            serializable_details['platform'] = 'Rapido' # Ensure platform is in details
-            api_response_rides.append(Ride(platform='Rapido', name=ride['name'], price=ride.get('price'), raw_details=serializable_details))
-    else:
-        logger.error(f"Job {job_id}: Failed to get Rapido rides: {rapido_results}")
-
-    # Store the necessary objects for the booking step
-    active_jobs[job_id] = {
-        # "ola": ola_automation,
-        "uber": uber_automation,
-        "rapido": rapido_automation,
-        "all_rides": all_rides
+        await pool.release(automation, reusable=False)
+        raise HTTPException(status_code=500, detail=f"Could not start fare watch: {e}")
+
+    watch_id = str(uuid.uuid4())
+    active_watches[watch_id] = {"platform": platform.name, "watch": watch, "automation": automation, "pool": pool}
+    logger.info(f"Watch {watch_id}: watching {platform.name} fares for {request.pickup_location!r} -> {request.destination_location!r}.")
+    return FareWatchResponse(
+        watch_id=watch_id,
+        platform=platform.name,
+        stream_url=f"/ride-booking/watch/{watch_id}/stream",
+        rides=[_to_api_ride(platform.name, r) for r in results],
+    )
+
+
+@router.get("/watch/{watch_id}/stream")
+async def stream_fare_watch(watch_id: str, format: str = Query("sse", pattern="^(sse|ndjson)$")):
+    """Streams the current rides once, then a 'fare_delta' event whenever a fare, ETA or ride list changes."""
+    entry = active_watches.get(watch_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Watch not found.")
+    watch = entry["watch"]
+
+    async def event_source():
+        queue = watch.subscribe()
+        try:
+            while True:
+                event = await queue.get()
+                yield _format_event(event, format)
+                if event["event"] == "watch_stopped":
+                    return
+        finally:
+            watch.unsubscribe(queue)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(event_source(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@router.delete("/watch/{watch_id}")
+async def stop_fare_watch(watch_id: str):
+    """Stops watching and returns the automation to its warm pool."""
+    if watch_id not in active_watches:
+        raise HTTPException(status_code=404, detail="Watch not found.")
+    reads = active_watches[watch_id]["watch"].reads
+    await _close_watch(watch_id)
+    return {"watch_id": watch_id, "status": "stopped", "reads": reads}
+
+
+@router.get("/stats")
+async def ride_booking_stats():
+    """Warm pool occupancy, fare cache and recovery cache hit counters, and LLM backend health."""
+    return {
+        "warm_pools": ride_pools.stats(),
+        "fare_cache": fare_cache.stats(),
+        "llm_backends": llm_health.stats(),
+        "llm_recoveries": recovery_cache.stats(),
+        "active_jobs": len(active_jobs),
+        "late_searches": len(straggler_tasks),
+        "fare_watches": len(active_watches),
     }
 
-    # Sort the rides by price before returning them
-    sorted_api_rides = sorted(api_response_rides, key=lambda r: _parse_price(r.price))
-
-    return RideSearchResponse(job_id=job_id, rides=sorted_api_rides)
-
 
 @router.post("/book", response_model=BookingResponse)
 async def book_a_ride(request: RideBookingRequest):
@@ -205,9 +575,8 @@ async def book_a_ride(request: RideBookingRequest):
         raise HTTPException(status_code=404, detail="Job not found.")
 
     job = active_jobs[job_id]
-    # ola_automation = job["ola"]
-    uber_automation = job["uber"]
-    rapido_automation = job["rapido"]
+    if not job.done:
+        raise HTTPException(status_code=409, detail="The search for this job is still running.")
 
     # --- FIX: Make the endpoint robust to handle nested raw_details ---
     # If the user sends the whole Ride object, we extract the inner raw_details.
@@ -218,34 +587,28 @@ async def book_a_ride(request: RideBookingRequest):
     platform = selected_ride.get('platform')
 
     if not platform:
-        raise HTTPException(status_code=400, detail="Ride details must include a 'platform' (Ola or Uber).")
+        raise HTTPException(status_code=400, detail="Ride details must include a 'platform' (Ola, Uber or Rapido).")
+
+    if platform not in job.automations:
+        raise HTTPException(status_code=409, detail=f"No live {platform} results in this job (failed, timed out or served from cache). Please search again.")
 
     # --- Find the original ride object from the server's stored list ---
-    # This is crucial because the original object has the Playwright locator for Ola.
-    ride_to_book = None
-    for original_ride in job["all_rides"]:
-        # Match based on platform and a unique identifier (product_id for Uber, name for Ola)
-        if original_ride.get('platform') == platform:
-            if platform == 'Uber' and original_ride.get('product_id') == selected_ride.get('product_id'):
-                ride_to_book = original_ride
-                break
-            elif platform == 'Rapido' and original_ride.get('name') == selected_ride.get('name'):
-                ride_to_book = original_ride
-                break
+    # This is crucial because the original object has the Playwright locator for Ola and Rapido.
+    match_key = RIDE_PLATFORMS[platform].match_key
+    ride_to_book = next(
+        (r for r in job.all_rides
+         if r.get('platform') == platform and r.get(match_key) == selected_ride.get(match_key)),
+        None,
+    )
     
     if not ride_to_book:
         raise HTTPException(status_code=404, detail="The selected ride could not be found in the last search results. Please search again.")
 
+    # Claim the job so the expiry reaper cannot release its automations mid-booking.
+    active_jobs.pop(job_id, None)
     try:
         logger.info(f"Job {job_id}: Attempting to book '{selected_ride.get('name')}' on {platform}.")
-        # if platform == 'Ola':
-        #     await ola_automation.book_ride(ride_to_book)
-        if platform == 'Uber':
-            await uber_automation.book_ride(ride_to_book)
-        elif platform == 'Rapido':
-            await rapido_automation.book_ride(ride_to_book)
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown platform: {platform}")
+        await job.automations[platform].book_ride(ride_to_book)
 
         return BookingResponse(status="booking_initiated", message=f"Booking process for '{selected_ride.get('name')}' has started.")
     except Exception as e:
@@ -253,8 +616,7 @@ async def book_a_ride(request: RideBookingRequest):
         raise HTTPException(status_code=500, detail=f"An error occurred during booking: {e}")
     finally:
         # --- Always clean up the job after a booking attempt ---
-        logger.info(f"Job {job_id}: Shutting down automations...")
-        await asyncio.gather(uber_automation.stop(), rapido_automation.stop())
-        # Remove the job from memory
-        del active_jobs[job_id]
+        # The automations go back to their warm pools, which reset them to the entry screen.
+        logger.info(f"Job {job_id}: Returning automations to the warm pool...")
+        await _release_job(job)
         logger.info(f"Job {job_id} stopped and cleaned up successfully.")
\ No newline at end of file
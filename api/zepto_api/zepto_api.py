@@ -1,6 +1,5 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from playwright.async_api import async_playwright
 import uuid
 import sys
 import os
@@ -15,6 +14,7 @@ from app.agents.zepto.zepto_automation import (
     add_to_cart_and_checkout,
 )
 from app.prompts.zepto_prompts.zepto_prompts import analyze_query
+from app.browser.pool import browser_pool
 
 router = APIRouter()
 
@@ -28,12 +28,6 @@ DESKTOP_USER_AGENT = (
 )
 DEFAULT_VIEWPORT = {"width": 1366, "height": 900}
 DEFAULT_GEOLOCATION = {"latitude": 19.0760, "longitude": 72.8777}
-HEADLESS_ARGS = [
-    "--disable-blink-features=AutomationControlled",
-    "--disable-dev-shm-usage",
-    "--disable-gpu",
-    "--no-sandbox",
-]
 
 
 class LoginRequest(BaseModel):
@@ -58,16 +52,10 @@ class AddToCartRequest(BaseModel):
 async def login(request: LoginRequest):
     session_id = str(uuid.uuid4())
     try:
-        playwright = await async_playwright().start()
-        browser, page = await login_zepto(request.mobile_number, request.location, playwright)
-        sessions[session_id] = {"playwright": playwright, "browser": browser, "page": page}
+        context, page = await login_zepto(request.mobile_number, request.location, browser_pool)
+        sessions[session_id] = {"context": context, "page": page}
         return {"status": "success", "message": "Login process initiated. Use the session_id to enter OTP.", "session_id": session_id}
     except Exception as e:
-        try:
-            if 'playwright' in locals():
-                await playwright.stop()
-        except Exception:
-            pass
         return {"status": "error", "message": str(e)}
 
 @router.post("/zepto/enter-otp")
@@ -91,21 +79,16 @@ async def enter_otp(request: OtpRequest):
     except Exception as e:
         return {"status": "error", "message": str(e)}
     finally:
-        # Always close the browser and clean up the session
-        await session["browser"].close()
-        await session["playwright"].stop()
+        # Always close the leased context and clean up the session
+        await session["context"].close()
         if request.session_id in sessions:
             del sessions[request.session_id]
 
 
-async def _open_zepto_page(playwright, storage_state_path: str):
-    """Launch Chromium in headless mode with human-like settings and return (browser, page)."""
-    browser = await playwright.chromium.launch(
+async def _open_zepto_page(storage_state_path: str):
+    """Lease a headless context from the shared pool with human-like settings and return (context, page)."""
+    context = await browser_pool.new_context(
         headless=True,
-        slow_mo=50,
-        args=HEADLESS_ARGS,
-    )
-    context = await browser.new_context(
         storage_state=storage_state_path,
         viewport=DEFAULT_VIEWPORT,
         user_agent=DESKTOP_USER_AGENT,
@@ -114,12 +97,12 @@ async def _open_zepto_page(playwright, storage_state_path: str):
         geolocation=DEFAULT_GEOLOCATION,
         permissions=["geolocation"],
     )
-    context.add_init_script(
+    await context.add_init_script(
         "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
     )
     page = await context.new_page()
     await page.goto("https://www.zeptonow.com/", wait_until="domcontentloaded")
-    return browser, page
+    return context, page
 
 @router.post("/zepto/search")
 async def search(request: SearchRequest):
@@ -137,10 +120,11 @@ async def search(request: SearchRequest):
         return {"status": "error", "message": "Session data directory not found. Please log in first."}
 
     try:
-        async with async_playwright() as p:
-            browser, page = await _open_zepto_page(p, latest_session_file)
+        context, page = await _open_zepto_page(latest_session_file)
+        try:
             products = await search_products_zepto(page, request.query, max_items=(request.max_items or 20))
-            await browser.close()
+        finally:
+            await context.close()
         return {"status": "success", "products": products}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -158,13 +142,14 @@ async def add_to_cart(request: AddToCartRequest):
         return {"status": "error", "message": "Session data directory not found. Please log in first."}
 
     try:
-        async with async_playwright() as p:
-            browser, page = await _open_zepto_page(p, latest_session_file)
+        context, page = await _open_zepto_page(latest_session_file)
+        try:
             await add_to_cart_and_checkout(page, request.product_name, request.quantity, request.upi_id, None)
-            # Keep the browser open for the user to approve the payment on phone (if requested)
+            # Keep the page open for the user to approve the payment on phone (if requested)
             if request.hold_seconds and request.hold_seconds > 0:
                 await page.wait_for_timeout(request.hold_seconds * 1000)
-            await browser.close()
+        finally:
+            await context.close()
         return {
             "status": "success",
             "message": "Item added to cart and proceeded to Click to Pay.",
@@ -9,6 +9,7 @@ from datetime import datetime
 from pathlib import Path
 from app.tools.Amazon_tools.search import AmazonScraper
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, expect
+from app.browser.pool import BrowserPool
 
 logger = logging.getLogger(__name__)
 
@@ -154,25 +155,32 @@ class AmazonAutomator:
             return response in ['yes', 'y']
         return True
     
-    async def initialize_browser(self):
-        """Initialize Playwright browser and context."""
-        logger.info("Initializing Playwright browser...")
-        
-        playwright = await async_playwright().start()
-        
-        browser_kwargs = {
-            # BUGFIX: Correctly use the headful flag from __init__
-            'headless': not self.headful,
-            'args': [
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-resources',
-            ]
-        }
+    async def initialize_browser(self, pool: Optional[BrowserPool] = None):
+        """
+        Initialize Playwright browser and context.
         
-        # if self.proxy:
-        #     browser_kwargs['proxy'] = {'server': self.proxy}
+        Args:
+            pool: Shared BrowserPool to lease a context from. When omitted a
+                private driver and browser are launched for this automator.
+        """
+        logger.info("Initializing Playwright browser...")
         
-        self.browser = await playwright.chromium.launch(**browser_kwargs)
+        if pool is None:
+            playwright = await async_playwright().start()
+            
+            browser_kwargs = {
+                # BUGFIX: Correctly use the headful flag from __init__
+                'headless': not self.headful,
+                'args': [
+                    '--disable-blink-features=AutomationControlled',
+                    '--disable-web-resources',
+                ]
+            }
+            
+            # if self.proxy:
+            #     browser_kwargs['proxy'] = {'server': self.proxy}
+            
+            self.browser = await playwright.chromium.launch(**browser_kwargs)
         
         context_kwargs = {
             'viewport': {'width': 1280, 'height': 720},
@@ -190,7 +198,10 @@ class AmazonAutomator:
             except Exception as e:
                 logger.warning(f"Could not load session: {e}")
         
-        self.context = await self.browser.new_context(**context_kwargs)
+        if pool is not None:
+            self.context = await pool.new_context(headless=not self.headful, **context_kwargs)
+        else:
+            self.context = await self.browser.new_context(**context_kwargs)
         self.page = await self.context.new_page()
         
         # Set default timeout
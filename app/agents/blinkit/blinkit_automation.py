@@ -1,6 +1,7 @@
 import re
 import asyncio
 import json
+from dataclasses import replace
 from playwright.async_api import TimeoutError
 from urllib.parse import quote_plus
 import sys
@@ -14,11 +15,26 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from app.prompts.blinkit_prompts.blinkit_prompts import find_best_match
+from app.browser.extraction import CardSpec, Field, extract_cards, parse_price
 
 # Path to store authentication state
 AUTH_FILE_PATH = os.path.join(MODULE_DIR, "playwright_auth.json")
 SEARCH_HISTORY_DIR = os.path.join(MODULE_DIR, "search_history")
 
+# Search result cards, read in a single evaluate. The add-to-cart flow only
+# considers cards whose name and price are actually rendered.
+BLINKIT_PRODUCT_CARD = CardSpec(
+    card='div[id][data-pf="reset"]',
+    fields={
+        "name": Field('.tw-text-300.tw-font-semibold.tw-line-clamp-2'),
+        "price": Field('.tw-text-200.tw-font-semibold', parse=parse_price),
+    },
+)
+BLINKIT_PRODUCT_CARD_VISIBLE = CardSpec(
+    card=BLINKIT_PRODUCT_CARD.card,
+    fields={name: replace(f, visible=True) for name, f in BLINKIT_PRODUCT_CARD.fields.items()},
+)
+
 # Utility: safe sleep with small logs
 async def safe_sleep(ms: int = 500):
     await asyncio.sleep(ms / 1000)
@@ -40,26 +56,12 @@ async def search_and_add_item(page, item_name: str, quantity: int):
         return
 
     product_locator = page.locator(first_product_card_selector)
-    count = await product_locator.count()
-    scraped_products = []
-    print(f"- Found {count} products. Analyzing top 10.")
-
-    for i in range(min(count, 10)):
-        card = product_locator.nth(i)
-        try:
-            name_elem = card.locator('.tw-text-300.tw-font-semibold.tw-line-clamp-2').first
-            price_elem = card.locator('.tw-text-200.tw-font-semibold').first
-
-            if not await name_elem.is_visible(timeout=1000) or not await price_elem.is_visible(timeout=1000):
-                continue
-
-            name = (await name_elem.text_content(timeout=2000)) or ""
-            price_text = (await price_elem.text_content(timeout=2000)) or ""
-            price = float(re.sub(r'[^\d.]', '', price_text)) if price_text else float('inf')
-
-            scraped_products.append({'name': name.strip(), 'price': price, 'card': card})
-        except Exception:
-            continue
+    cards = await extract_cards(page, BLINKIT_PRODUCT_CARD_VISIBLE, limit=10)
+    print(f"- Scraped {len(cards)} of the top 10 products.")
+    scraped_products = [
+        {'name': card['name'], 'price': card['price'], 'card': product_locator.nth(card['index'])}
+        for card in cards
+    ]
 
     if not scraped_products:
         print(f"⚠ Could not scrape product details for '{item_name}'. Skipping.")
@@ -375,14 +377,13 @@ async def automate_blinkit(shopping_list: dict, location: str, mobile_number: st
     await asyncio.sleep(10)
 
 
-async def login(p, mobile_number: str, location: str) -> tuple:
+async def login(browser_pool, mobile_number: str, location: str) -> tuple:
     """
-    Launches Playwright, navigates to Blinkit, and proceeds until the OTP screen.
-    Returns the browser context and page for the next step.
+    Leases a context from the shared browser pool, navigates to Blinkit, and
+    proceeds until the OTP screen. Returns the browser context and page for the next step.
     """
     print("\nStarting browser automation for Blinkit login...")
-    browser = await p.chromium.launch(headless=False, slow_mo=5)
-    context = await browser.new_context()
+    context = await browser_pool.new_context(headless=False)
     page = await context.new_page()
     try:
         print("Navigating to Blinkit...")
@@ -415,8 +416,7 @@ async def login(p, mobile_number: str, location: str) -> tuple:
         return context, page
 
     except Exception as e:
-        if 'context' in locals() and context:
-            await context.browser.close()
+        await context.close()
         print(f"❌ An error occurred during login automation: {e}")
         raise
 
@@ -592,30 +592,35 @@ async def submit_upi_and_pay(context, upi_id: str):
         raise
 
 
-async def search_multiple_products(p, queries: list[str]) -> tuple[any, any, dict]:
+async def search_multiple_products(browser_pool, queries: list[str]) -> tuple[any, any, dict]:
     """
-    Launches a browser, logs in with saved state, and searches for multiple products.
-    Returns the context, page, and scraped results to keep the session alive.
+    Leases a context from the shared browser pool with the saved login state and
+    searches for multiple products. Returns the context, page, and scraped results
+    to keep the session alive.
     """
     print("\nStarting browser automation for multi-product search...")
     if not os.path.exists(AUTH_FILE_PATH):
         print("❌ Authentication file not found. Please login first.")
         return {"error": "User not logged in. Please use the /login endpoint first."}
 
-    browser = await p.chromium.launch(headless=False, slow_mo=5)
-    context = await browser.new_context(storage_state=AUTH_FILE_PATH)
-    page = await context.new_page()
+    context = await browser_pool.new_context(headless=False, storage_state=AUTH_FILE_PATH)
+    try:
+        page = await context.new_page()
 
-    print("Navigating to Blinkit home page to initialize session...")
-    await page.goto("https://www.blinkit.com/", wait_until="domcontentloaded")
-    print("- Allowing time for session to be recognized...")
-    await page.wait_for_timeout(1000)
+        print("Navigating to Blinkit home page to initialize session...")
+        await page.goto("https://www.blinkit.com/", wait_until="domcontentloaded")
+        print("- Allowing time for session to be recognized...")
+        await page.wait_for_timeout(1000)
 
-    all_results = {}
-    for query in queries:
-        print(f"\n--- Searching for: '{query}' ---")
-        products = await search_products(page, query)
-        all_results[query] = products
+        all_results = {}
+        for query in queries:
+            print(f"\n--- Searching for: '{query}' ---")
+            products = await search_products(page, query)
+            all_results[query] = products
+    except BaseException:
+        # The caller only owns the context once it is returned; close it here so a failed search doesn't leak it.
+        await context.close()
+        raise
 
     return context, page, all_results
 
@@ -633,18 +638,9 @@ async def search_products(page, query: str) -> list:
         await page.wait_for_selector(product_card_selector, timeout=15000)
         print("- Product results page loaded.")
 
-        product_cards = await page.locator(product_card_selector).all()
-        scraped_products = []
-        print(f"- Found {len(product_cards)} products. Scraping details...")
-
-        for card in product_cards:
-            try:
-                name = await card.locator('.tw-text-300.tw-font-semibold.tw-line-clamp-2').text_content(timeout=2000)
-                price_text = await card.locator('.tw-text-200.tw-font-semibold').text_content(timeout=2000)
-                price = float(re.sub(r'[^\d.]', '', price_text))
-                scraped_products.append({'name': name.strip(), 'price': price})
-            except Exception:
-                continue
+        cards = await extract_cards(page, BLINKIT_PRODUCT_CARD)
+        scraped_products = [{'name': card['name'], 'price': card['price']} for card in cards]
+        print(f"- Scraped {len(scraped_products)} products.")
 
         try:
             os.makedirs(SEARCH_HISTORY_DIR, exist_ok=True)
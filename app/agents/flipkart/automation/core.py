@@ -1,9 +1,11 @@
 import json
+from typing import Optional
 from playwright.async_api import async_playwright
 from app.agents.flipkart.config import Config
 from app.agents.flipkart.utills.logger import setup_logger
 from pathlib import Path
 from playwright.async_api import async_playwright
+from app.browser.pool import BrowserPool
 import json
 
 class FlipkartAutomation:
@@ -35,21 +37,27 @@ class FlipkartAutomation:
         self.page = None
         # self.user_agent = None # This is now handled above
 
-    async def initialize_browser(self):
-        """Initialize Playwright browser and context."""
+    async def initialize_browser(self, pool: Optional[BrowserPool] = None):
+        """
+        Initialize Playwright browser and context.
+
+        When a BrowserPool is given, only a fresh context is leased from one of
+        its browsers; otherwise a private driver and browser are launched.
+        """
         self.logger.info("Initializing Playwright browser...")
         
-        self.playwright = await async_playwright().start()
-        
-        browser_kwargs = {
-            'headless': False,
-            'args': [
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-resources',
-            ]
-        }
-        
-        self.browser = await self.playwright.chromium.launch(**browser_kwargs)
+        if pool is None:
+            self.playwright = await async_playwright().start()
+            
+            browser_kwargs = {
+                'headless': False,
+                'args': [
+                    '--disable-blink-features=AutomationControlled',
+                    '--disable-web-resources',
+                ]
+            }
+            
+            self.browser = await self.playwright.chromium.launch(**browser_kwargs)
         
         context_kwargs = {
             'viewport': {'width': 1280, 'height': 720},
@@ -67,7 +75,10 @@ class FlipkartAutomation:
             except Exception as e:
                 self.logger.warning(f"Could not load session: {e}")
         
-        self.context = await self.browser.new_context(**context_kwargs)
+        if pool is not None:
+            self.context = await pool.new_context(headless=False, **context_kwargs)
+        else:
+            self.context = await self.browser.new_context(**context_kwargs)
         self.page = await self.context.new_page()
         
         self.logger.info("Browser initialized successfully")
@@ -19,6 +19,20 @@ class Config:
     USE_LLM: bool = os.getenv("USE_LLM", "true").lower() == "true"
     PREFERRED_PROVIDER: str = os.getenv("PREFERRED_PROVIDER", "openai")
     LLM_TIMEOUT: int = int(os.getenv("LLM_TIMEOUT", "60"))
+    # Threads for SDKs without an async API (boto3, g4f) so their calls never block the event loop
+    LLM_SYNC_WORKERS: int = int(os.getenv("LLM_SYNC_WORKERS", "8"))
+    # Hedged fallbacks: start the next provider if the current one hasn't answered within the delay (seconds);
+    # a delay of 0 races up to the parallel limit outright
+    LLM_HEDGE_DELAY: float = float(os.getenv("LLM_HEDGE_DELAY", "8"))
+    LLM_HEDGE_PARALLEL: int = int(os.getenv("LLM_HEDGE_PARALLEL", "2"))
+    G4F_HEDGE_DELAY: float = float(os.getenv("G4F_HEDGE_DELAY", "4"))
+    G4F_HEDGE_PARALLEL: int = int(os.getenv("G4F_HEDGE_PARALLEL", "3"))
+    G4F_ATTEMPT_TIMEOUT: int = int(os.getenv("G4F_ATTEMPT_TIMEOUT", "20"))
+    # Backend health: EWMA weight of the newest sample; consecutive failures that open a circuit;
+    # seconds an open circuit waits before letting one probe call through
+    LLM_HEALTH_ALPHA: float = float(os.getenv("LLM_HEALTH_ALPHA", "0.3"))
+    LLM_CIRCUIT_FAILURES: int = int(os.getenv("LLM_CIRCUIT_FAILURES", "3"))
+    LLM_CIRCUIT_COOLDOWN: float = float(os.getenv("LLM_CIRCUIT_COOLDOWN", "120"))
     
     # Playwright Configuration
     HEADLESS: bool = os.getenv("HEADLESS", "false").lower() == "true"
@@ -29,6 +43,58 @@ class Config:
     MAX_RETRIES: int = int(os.getenv("MAX_RETRIES", "3"))
     RETRY_DELAY: int = int(os.getenv("RETRY_DELAY", "2"))
 
+    # Uber fare extraction: parse the fare/product JSON the web app fetches, falling back to DOM scraping
+    UBER_NETWORK_EXTRACTION: bool = os.getenv("UBER_NETWORK_EXTRACTION", "true").lower() == "true"
+    FARE_RESPONSE_TIMEOUT: int = int(os.getenv("FARE_RESPONSE_TIMEOUT", "15000"))
+
+    # Uber deep links: routes whose places were resolved before open the product-selection page directly
+    UBER_DEEP_LINKS: bool = os.getenv("UBER_DEEP_LINKS", "true").lower() == "true"
+    UBER_DEEP_LINK_URL: str = os.getenv("UBER_DEEP_LINK_URL", "https://m.uber.com/go/product-selection")
+    UBER_PLACE_CACHE_PATH: str = os.getenv(
+        "UBER_PLACE_CACHE_PATH",
+        os.path.join(os.path.dirname(__file__), "sessions", "uber_places.json"),
+    )
+
+    # Warm Standby Pool (pre-authenticated pages parked on the ride entry screen)
+    WARM_POOL_SIZE: int = int(os.getenv("RIDE_WARM_POOL_SIZE", "1"))
+    WARM_UBER_SESSION: Optional[str] = os.getenv("UBER_WARM_SESSION")
+    WARM_RAPIDO_SESSION: Optional[str] = os.getenv("RAPIDO_WARM_SESSION")
+    WARM_OLA_SESSION: Optional[str] = os.getenv("OLA_WARM_SESSION")
+
+    # Search fan-out deadlines (ms). Each platform gets its own budget and the response is
+    # built from whatever finished inside the overall deadline; late searches still fill the fare cache.
+    RIDE_SEARCH_DEADLINE: int = int(os.getenv("RIDE_SEARCH_DEADLINE", "45000"))
+    UBER_SEARCH_BUDGET: int = int(os.getenv("UBER_SEARCH_BUDGET", "35000"))
+    RAPIDO_SEARCH_BUDGET: int = int(os.getenv("RAPIDO_SEARCH_BUDGET", "40000"))
+    OLA_SEARCH_BUDGET: int = int(os.getenv("OLA_SEARCH_BUDGET", "35000"))
+    # Finished search jobs not booked within this many seconds release their automations and are dropped
+    RIDE_JOB_TTL: int = int(os.getenv("RIDE_JOB_TTL", "600"))
+    RIDE_REAPER_INTERVAL: int = int(os.getenv("RIDE_REAPER_INTERVAL", "30"))
+
+    # Fare cache (seconds): fresh hits skip the browser; stale hits are served and refreshed in the background
+    FARE_CACHE_TTL: int = int(os.getenv("FARE_CACHE_TTL", "180"))
+    FARE_CACHE_MAX_STALE: int = int(os.getenv("FARE_CACHE_MAX_STALE", "900"))
+
+    # Fare matrix: concurrent tabs per platform context and the largest batch accepted per request
+    FARE_MATRIX_MAX_TABS: int = int(os.getenv("FARE_MATRIX_MAX_TABS", "4"))
+    FARE_MATRIX_MAX_PAIRS: int = int(os.getenv("FARE_MATRIX_MAX_PAIRS", "25"))
+
+    # Fare watch: safety-net re-read interval (s) when the page reports no change
+    FARE_WATCH_POLL_INTERVAL: float = float(os.getenv("FARE_WATCH_POLL_INTERVAL", "30"))
+    # Fare watch: seconds with no stream subscriber before the watch is closed and its automation released
+    FARE_WATCH_IDLE_TTL: int = int(os.getenv("FARE_WATCH_IDLE_TTL", "300"))
+
+    # LLM self-healing: validated selector/recovery answers reused per (site, URL pattern, goal, DOM fingerprint)
+    RECOVERY_CACHE_PATH: str = os.getenv(
+        "RECOVERY_CACHE_PATH",
+        os.path.join(os.path.dirname(__file__), "sessions", "llm_recoveries.json"),
+    )
+    # Size cap (characters of JSON) of the interactive-element digest sent in LLM prompts
+    DOM_DIGEST_MAX_CHARS: int = int(os.getenv("DOM_DIGEST_MAX_CHARS", "6000"))
+    RECOVERY_CACHE_TTL: int = int(os.getenv("RECOVERY_CACHE_TTL", str(7 * 24 * 3600)))
+    # Ask the LLM for a recovery plan when a search's route entry fails, then retry once (adds an LLM call to the failure path)
+    LLM_STEP_RECOVERY: bool = os.getenv("LLM_STEP_RECOVERY", "false").lower() == "true"
+
     # Session Management
     SESSIONS_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "automation", "sessions")
 
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.agents.ride_booking.config import Config
+from app.agents.ride_booking.utills.common import normalize_location
+from app.agents.ride_booking.utills.logger import setup_logger
+
+logger = setup_logger()
+
+
+@dataclass
+class CachedFares:
+    rides: List[Dict[str, Any]]
+    captured_at: float = field(default_factory=time.time)
+    ttl: float = Config.FARE_CACHE_TTL
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.captured_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.age <= self.ttl
+
+
+class FareCache:
+    """
+    Short-TTL cache of serializable rides per platform and normalized
+    ``(pickup, destination)`` pair.
+
+    Entries younger than ``ttl`` seconds are fresh and answer a search with no
+    browser work. Older entries, up to ``max_stale`` seconds, are still served
+    instantly but flagged stale, and a background refresh through the pooled
+    automations replaces them. Entries older than that are ignored.
+    """
+
+    def __init__(self, ttl: float = Config.FARE_CACHE_TTL, max_stale: float = Config.FARE_CACHE_MAX_STALE):
+        self.ttl = ttl
+        self.max_stale = max(ttl, max_stale)
+        self._entries: Dict[Tuple[str, str, str], CachedFares] = {}
+        self._refreshing: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(platform: str, pickup: str, destination: str) -> Tuple[str, str, str]:
+        return platform, normalize_location(pickup), normalize_location(destination)
+
+    def put(self, platform: str, pickup: str, destination: str, rides: List[Dict[str, Any]]):
+        self._entries[self._key(platform, pickup, destination)] = CachedFares(rides, ttl=self.ttl)
+
+    def peek(self, platform: str, pickup: str, destination: str) -> Optional[CachedFares]:
+        """Like ``get``, but not counted as a hit or miss; for fallbacks after a search already looked."""
+        key = self._key(platform, pickup, destination)
+        entry = self._entries.get(key)
+        if entry is None or entry.age > self.max_stale:
+            self._entries.pop(key, None)
+            return None
+        return entry
+
+    def get(self, platform: str, pickup: str, destination: str) -> Optional[CachedFares]:
+        """Return the entry for the route if it is within ``max_stale``, fresh or not."""
+        entry = self.peek(platform, pickup, destination)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry
+
+    def refresh(self, platform: str, pickup: str, destination: str, fetch: Callable[[], Awaitable[Any]]):
+        """
+        Run ``fetch`` (which is expected to ``put`` the new rides) in the background,
+        unless a refresh for the same route is already in flight.
+        """
+        key = self._key(platform, pickup, destination)
+        if key in self._refreshing:
+            return
+
+        async def run():
+            try:
+                await fetch()
+            except Exception as e:
+                logger.warning(f"Background fare refresh for {platform} {key[1]!r} -> {key[2]!r} failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(run())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._refreshing),
+        }
+
+    def cancel_refreshes(self):
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+
+
+fare_cache = FareCache()
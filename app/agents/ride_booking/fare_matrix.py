@@ -0,0 +1,75 @@
+import asyncio
+import copy
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.agents.ride_booking.config import Config
+from app.agents.ride_booking.platforms import RidePlatform
+from app.agents.ride_booking.utills.logger import setup_logger
+from app.agents.ride_booking.warm_pool import ride_pools
+from app.browser.waits import WaitEngine
+
+logger = setup_logger()
+
+# Platforms whose flow stays inside its own tab. Ola opens a new tab per search
+# and closes sibling pages on reset, so it cannot share a context this way.
+MATRIX_PLATFORMS = ("Uber", "Rapido")
+
+
+async def open_tab(automation):
+    """
+    A view of ``automation`` on a new tab of the same (authenticated) context.
+
+    The copy shares config, logger, LLM and context with its parent but has
+    its own page, wait engine and steps, so the platform's regular
+    ``reset``/``search_rides`` flow can run on it alongside other tabs.
+    Close it with ``tab.page.close()``, never ``tab.stop()``.
+    """
+    tab = copy.copy(automation)
+    tab.page = await automation.context.new_page()
+    tab.waits = WaitEngine(tab.page, automation.logger)
+    tab.steps = type(automation.steps)(tab)
+    tab.ride_data = None
+    return tab
+
+
+async def compute_fare_matrix(
+    platform: RidePlatform,
+    session_name: Optional[str],
+    pairs: List[Tuple[str, str]],
+    max_tabs: int = Config.FARE_MATRIX_MAX_TABS,
+) -> List[Dict[str, Any]]:
+    """
+    Search every ``(pickup, destination)`` pair on one platform.
+
+    One warm automation is leased for the whole batch and each pair runs in its
+    own tab of that automation's context, at most ``max_tabs`` at a time, so
+    login and browser start-up are paid once per batch instead of once per
+    pair. Returns one cell per pair, in input order, holding the platform's
+    ride dicts as returned by ``search_rides``.
+    """
+    pool = ride_pools.pool_for(platform.automation_cls, session_name)
+    automation = await pool.acquire()
+    tabs = asyncio.Semaphore(max(1, max_tabs))
+
+    async def search_pair(pickup: str, destination: str) -> Dict[str, Any]:
+        cell = {"platform": platform.name, "pickup": pickup, "destination": destination}
+        async with tabs:
+            started = time.perf_counter()
+            tab = await open_tab(automation)
+            try:
+                await tab.reset()
+                results = await tab.search_rides(pickup, destination)
+                cell.update(status="completed", rides=results)
+            except Exception as e:
+                logger.error(f"Fare matrix: {platform.name} {pickup!r} -> {destination!r} failed: {e}")
+                cell.update(status="failed", rides=[], error=str(e))
+            finally:
+                cell["elapsed_ms"] = int((time.perf_counter() - started) * 1000)
+                await tab.page.close()
+        return cell
+
+    try:
+        return await asyncio.gather(*(search_pair(pickup, destination) for pickup, destination in pairs))
+    finally:
+        await pool.release(automation)
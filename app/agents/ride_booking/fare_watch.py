@@ -0,0 +1,206 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.agents.ride_booking.utills.logger import setup_logger
+
+logger = setup_logger()
+
+# Name of the page function the in-page observer calls when the fare list changes.
+_CHANGE_BINDING = "__fareWatchChanged"
+
+# Observes the list that holds the ride cards and reports (debounced) changes
+# to Python through the exposed binding. Re-installed after every navigation.
+_OBSERVER_JS = """
+([cardSelector, debounce, binding]) => {
+    if (window.__fareWatchObserver) window.__fareWatchObserver.disconnect();
+    const card = document.querySelector(cardSelector);
+    const root = (card && card.parentElement) || document.body;
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(() => window[binding](), debounce);
+    });
+    observer.observe(root, { childList: true, subtree: true, characterData: true, attributes: true });
+    window.__fareWatchObserver = observer;
+}
+"""
+
+# Fields whose change is worth pushing to a watcher.
+WATCHED_FIELDS = ("price", "eta", "eta_and_time", "is_selected")
+
+
+def diff_rides(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Added/removed rides and per-ride changes of the watched fields between two extractions."""
+    changed = []
+    for key in before.keys() & after.keys():
+        fields = {
+            name: {"before": before[key].get(name), "after": after[key].get(name)}
+            for name in WATCHED_FIELDS
+            if before[key].get(name) != after[key].get(name)
+        }
+        if fields:
+            changed.append({"key": key, "name": after[key].get("name"), "changes": fields})
+    return {
+        "added": [after[key] for key in after.keys() - before.keys()],
+        "removed": [before[key] for key in before.keys() - after.keys()],
+        "changed": changed,
+    }
+
+
+class FareWatch:
+    """
+    Keeps a results page open and re-reads the fare list only when it changes.
+
+    An in-page MutationObserver on the ride list (and, when ``is_fare_response``
+    is given, any response it accepts) marks the list dirty. The list is
+    then re-read with the platform's single-evaluate extraction and the
+    difference from the previous read is pushed to every subscriber queue. A
+    read also happens every ``poll_interval`` seconds as a safety net; when
+    nothing changed that costs one ``evaluate`` call.
+    """
+
+    def __init__(
+        self,
+        automation,
+        read_rides: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        key: str,
+        card_selector: str,
+        poll_interval: float = 30.0,
+        is_fare_response: Optional[Callable[[Any], bool]] = None,
+        debounce_ms: int = 250,
+    ):
+        self.automation = automation
+        self.read_rides = read_rides
+        self.key = key
+        self.card_selector = card_selector
+        self.poll_interval = poll_interval
+        self.is_fare_response = is_fare_response
+        self.debounce_ms = debounce_ms
+
+        self.rides: Dict[str, Dict[str, Any]] = {}
+        self.reads = 0
+        self.updated_at: Optional[float] = None
+        # When the last subscriber left (or the watch started with none); None while someone is listening.
+        self.idle_since: Optional[float] = time.time()
+        self._subscribers: List[asyncio.Queue] = []
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def idle_for(self) -> float:
+        """Seconds without any subscriber; 0 while one is connected."""
+        return time.time() - self.idle_since if self.idle_since is not None else 0.0
+
+    def _index(self, rides: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        return {
+            str(ride.get(self.key)): {k: v for k, v in ride.items() if k != "locator"}
+            for ride in rides
+            if ride.get(self.key)
+        }
+
+    # --- Change signals ---
+
+    def _mark_dirty(self, *_):
+        self._dirty.set()
+
+    def _on_response(self, response):
+        if self.is_fare_response(response):
+            self._dirty.set()
+
+    async def _install_observer(self):
+        page = self.automation.page
+        # A page keeps its exposed functions for life; route the shared binding to whichever watch is current.
+        page_bindings = getattr(self.automation, "_fare_watch_bindings", None)
+        if page_bindings is None or page_bindings[0] is not page:
+            await page.expose_function(_CHANGE_BINDING, lambda: self.automation._fare_watch_bindings[1]())
+        self.automation._fare_watch_bindings = (page, self._mark_dirty)
+        await page.evaluate(_OBSERVER_JS, [self.card_selector, self.debounce_ms, _CHANGE_BINDING])
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        self.rides = self._index(await self.read_rides())
+        self.reads = 1
+        self.updated_at = time.time()
+        await self._install_observer()
+        if self.is_fare_response:
+            self.automation.page.on("response", self._on_response)
+        self.automation.page.on("load", self._reinstall_after_navigation)
+        self._task = asyncio.create_task(self._run())
+
+    def _reinstall_after_navigation(self, *_):
+        asyncio.create_task(self._safe_reinstall())
+
+    async def _safe_reinstall(self):
+        try:
+            await self.automation.page.evaluate(_OBSERVER_JS, [self.card_selector, self.debounce_ms, _CHANGE_BINDING])
+            self._dirty.set()
+        except Exception as e:
+            logger.debug(f"Could not re-install fare observer: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+
+            # Each re-read's waits are reported on their own; the list would otherwise grow for the life of the watch.
+            waits = getattr(self.automation, "waits", None)
+            if waits is not None:
+                waits.reset()
+            try:
+                current = self._index(await self.read_rides())
+            except Exception as e:
+                logger.warning(f"Fare watch read failed: {e}")
+                continue
+            self.reads += 1
+            delta = diff_rides(self.rides, current)
+            if not current or not any(delta.values()):
+                continue
+
+            self.rides = current
+            self.updated_at = time.time()
+            await self._publish({"event": "fare_delta", "at": self.updated_at, **delta})
+
+    async def _publish(self, event: Dict[str, Any]):
+        for queue in list(self._subscribers):
+            await queue.put(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        """A queue that first receives the current rides, then every delta."""
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait({"event": "fare_snapshot", "at": self.updated_at, "rides": list(self.rides.values())})
+        self._subscribers.append(queue)
+        self.idle_since = None
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+        if not self._subscribers:
+            self.idle_since = time.time()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        page = self.automation.page
+        if page and not page.is_closed():
+            page.remove_listener("load", self._reinstall_after_navigation)
+            if self.is_fare_response:
+                page.remove_listener("response", self._on_response)
+            try:
+                await page.evaluate("() => window.__fareWatchObserver && window.__fareWatchObserver.disconnect()")
+            except Exception:
+                pass
+        self.automation._fare_watch_bindings = (page, lambda: None) if page else None
+        for queue in list(self._subscribers):
+            queue.put_nowait({"event": "watch_stopped"})
+        self._subscribers.clear()
@@ -1,8 +1,21 @@
 import re
 import json
-from typing import Any, Optional, List
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, List, TypeVar
 from app.agents.ride_booking.config import Config
 from app.agents.ride_booking.llm.provider import LLMProviderManager
+from app.agents.ride_booking.llm.recovery_cache import (
+    error_signature, recovery_cache, snapshot_fingerprint, verify_on_page,
+)
+from app.browser.digest import build_dom_digest, capture_dom_snapshot, format_digest
+from app.agents.ride_booking.ranking import format_summary, summarize_rides
+
+# Opening tags only: no DOTALL body matching, so the scan stays linear on large pages.
+_INTERACTIVE_OPEN_TAG_RE = re.compile(r'<(?:button|input|select|textarea|a)\b[^>]{0,500}>', re.IGNORECASE)
+# Per-action bound while replaying a recovery plan, in milliseconds.
+_RECOVERY_ACTION_TIMEOUT = 5000
+
+T = TypeVar("T")
 
 class LLMAssistant:
     def __init__(self, config: Config, logger):
@@ -11,11 +24,19 @@ class LLMAssistant:
         self.provider_manager = LLMProviderManager(self.config)
         self.provider_manager.set_logger(logger)
 
-    async def analyze_dom_and_suggest_action(self, dom_snapshot: dict, goal: str) -> dict[str, Any]:
+    async def analyze_dom_and_suggest_action(self, dom_snapshot: dict, goal: str, page=None) -> dict[str, Any]:
         """
         Use LLM to analyze DOM and suggest next action (with fallback to rule-based).
         Updated as per new workflow: mainly used for fallback or fine-grained actions, as main steps are now generated in main.py and steps.py.
+
+        With the live ``page``, answers are served from and validated into the recovery cache (see recovery_cache.py).
         """
+        dom_snapshot = await self._with_digest(dom_snapshot, page)
+        key = recovery_cache.key("action", dom_snapshot.get('url', ''), goal, snapshot_fingerprint(dom_snapshot))
+        cached = await self._cached_answer(key, page)
+        if cached:
+            return cached
+
         prompt = self._build_action_prompt(dom_snapshot, goal)
 
         response = await self.provider_manager.get_completion(
@@ -26,6 +47,7 @@ class LLMAssistant:
         if response:
             parsed_response = self._parse_llm_response(response)
             if parsed_response:
+                await self._remember_answer(key, parsed_response, page)
                 return parsed_response
 
         # Fallback to rule-based system (logic aligned with steps and new workflow)
@@ -33,21 +55,114 @@ class LLMAssistant:
         return self._get_rule_based_action(goal)
 
 
-    async def analyze_failure(self, step_name: str, error: str, dom_snapshot: dict) -> dict[str, Any]:
+    async def analyze_failure(self, step_name: str, error: str, dom_snapshot: dict, page=None) -> dict[str, Any]:
         """
         Use LLM to analyze step failure and suggest a recovery plan (fallback if LLM fails).
+        With the live ``page``, plans are served from and validated into the recovery cache.
         """
+        dom_snapshot = await self._with_digest(dom_snapshot, page)
+        key = recovery_cache.key(
+            "failure", dom_snapshot.get('url', ''), f"{step_name}: {error_signature(error)}", snapshot_fingerprint(dom_snapshot)
+        )
+        cached = await self._cached_answer(key, page)
+        if cached:
+            return cached
+
         prompt = self._build_failure_prompt(step_name, error, dom_snapshot)
 
         response = await self.provider_manager.get_completion(prompt)
         if response:
             parsed_response = self._parse_llm_response(response)
             if parsed_response:
+                await self._remember_answer(key, parsed_response, page)
                 return parsed_response
 
         # Fallback: very basic self-healing aligned to new workflow steps
         return self._get_fallback_recovery_plan()
 
+    async def run_with_recovery(self, page, step_name: str, step: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``step``; if it raises, apply the recovery plan for the failure to
+        ``page`` and run it once more. The original error is re-raised when no
+        recovery action could be applied. Only clicks, waits and reloads are
+        replayed, never navigation. Off unless ``LLM_STEP_RECOVERY`` is set.
+        """
+        if not self.config.LLM_STEP_RECOVERY:
+            return await step()
+        try:
+            return await step()
+        except Exception as e:
+            self.logger.warning(f"Step '{step_name}' failed: {e}. Attempting recovery.")
+            if not await self.recover(page, step_name, e):
+                raise
+        return await step()
+
+    async def recover(self, page, step_name: str, error: Exception) -> bool:
+        """Ask for (or reuse a cached) recovery plan for a failed step and apply it; True if any action ran."""
+        try:
+            dom_snapshot = await capture_dom_snapshot(page, max_chars=self.config.DOM_DIGEST_MAX_CHARS)
+        except Exception as e:
+            self.logger.debug(f"Could not snapshot the page for recovery: {e}")
+            return False
+        plan = await self.analyze_failure(step_name, str(error), dom_snapshot, page=page)
+        self.logger.info(f"Recovery plan for '{step_name}': {plan.get('analysis', 'n/a')}")
+        applied = False
+        for action in plan.get("actions") or []:
+            if isinstance(action, dict) and await self._apply_recovery_action(page, action):
+                applied = True
+        return applied
+
+    async def _apply_recovery_action(self, page, action: dict) -> bool:
+        kind = (action.get("type") or action.get("action") or "").lower()
+        selector = action.get("selector")
+        try:
+            if kind == "click" and selector:
+                await page.locator(selector).first.click(timeout=_RECOVERY_ACTION_TIMEOUT)
+            elif kind == "wait" and selector and selector != "body":
+                await page.locator(selector).first.wait_for(state="visible", timeout=_RECOVERY_ACTION_TIMEOUT)
+            elif kind == "wait":
+                await page.wait_for_load_state("domcontentloaded", timeout=_RECOVERY_ACTION_TIMEOUT)
+            elif kind == "reload":
+                await page.reload(wait_until="domcontentloaded")
+            else:
+                return False
+        except Exception as e:
+            self.logger.debug(f"Recovery action {kind} {selector or ''} did not apply: {e}")
+            return False
+        self.logger.info(f"Applied recovery action: {kind} {selector or ''} ({action.get('reason', '')})")
+        return True
+
+    async def _with_digest(self, dom_snapshot: dict, page) -> dict:
+        """Add the live page's interactive-element digest to a snapshot that lacks one."""
+        if page is None or dom_snapshot.get('elements') is not None:
+            return dom_snapshot
+        try:
+            elements = await build_dom_digest(page, max_chars=self.config.DOM_DIGEST_MAX_CHARS)
+        except Exception as e:
+            self.logger.debug(f"Could not build DOM digest: {e}")
+            return dom_snapshot
+        return {**dom_snapshot, 'elements': elements}
+
+    async def _cached_answer(self, key: str, page) -> Optional[dict[str, Any]]:
+        """A cached answer whose selectors still resolve on ``page``; stale entries are dropped."""
+        if page is None:
+            return None
+        answer = recovery_cache.get(key)
+        if answer is None:
+            return None
+        if not await verify_on_page(page, answer):
+            self.logger.info("Cached recovery no longer matches the page; asking the LLM again.")
+            await recovery_cache.invalidate(key)
+            return None
+        recovery_cache.mark_used(key)
+        self.logger.info("Using cached recovery answer (no LLM call).")
+        return answer
+
+    async def _remember_answer(self, key: str, answer: dict[str, Any], page):
+        """Cache an LLM answer once its selectors are confirmed on the live page."""
+        if page is not None and await verify_on_page(page, answer):
+            await recovery_cache.put(key, answer)
+
     def _build_action_prompt(self, dom_snapshot: dict, goal: str) -> str:
         # More focused prompt for updated workflow (works for both search and in-page actions)
         return f"""
@@ -57,12 +172,12 @@ Page Info:
 - Title: {dom_snapshot.get('title', 'N/A')}
 - URL: {dom_snapshot.get('url', 'N/A')}
 
-Relevant Interactive HTML (first 10 of each type):
-{self._extract_interactive_elements(dom_snapshot.get('body', ''))}
+Visible interactive elements (tag, attributes, "text"):
+{self._interactive_summary(dom_snapshot)}
 
 Please answer ONLY in this JSON format:
 {{
-    "action": "click/type/select/wait/navigate",
+    "action": "click/type/select/wait",
     "selector": "css_selector_here",
     "value": "optional_value_for_typing",
     "confidence": 0.0-1.0,
@@ -88,26 +203,41 @@ Current page info:
 - Title: {dom_snapshot.get('title', 'N/A')}
 - URL: {dom_snapshot.get('url', 'N/A')}
 
+Visible interactive elements (tag, attributes, "text"):
+{self._interactive_summary(dom_snapshot)}
+
 Suggest a concise fallback recovery plan in JSON as shown. If a simple reload or close-modal would help, include it in 'actions':
 
 {{
     "analysis": "what_may_have_gone_wrong",
     "actions": [
-        {{"type": "click/wait/navigate/reload", "selector": "css_selector", "reason": "why_this_helps"}}
+        {{"type": "click/wait/reload", "selector": "css_selector", "reason": "why_this_helps"}}
     ]
 }}
 """
 
-    def _extract_interactive_elements(self, html: str) -> str:
-        """Extract first N interactive elements for LLM prompt (for efficiency with big DOMs)."""
-        elements = []
-        buttons = re.findall(r'<button[^>]*>.*?</button>', html, re.IGNORECASE | re.DOTALL)
-        elements.extend(buttons[:10])
-        inputs = re.findall(r'<input[^>]*>', html, re.IGNORECASE)
-        elements.extend(inputs[:10])
-        links = re.findall(r'<a[^>]*href[^>]*>.*?</a>', html, re.IGNORECASE | re.DOTALL)
-        elements.extend(links[:10])
-        return '\n'.join(elements)
+    def _interactive_summary(self, dom_snapshot: dict) -> str:
+        """
+        Prompt text for the page's interactive elements: the in-page digest when
+        the snapshot has one, otherwise the opening tags of interactive elements
+        in its HTML (one linear scan), both capped at ``DOM_DIGEST_MAX_CHARS``.
+        """
+        budget = self.config.DOM_DIGEST_MAX_CHARS
+        elements = dom_snapshot.get('elements')
+        if elements is not None:
+            return format_digest(elements)[:budget]
+
+        lines, seen, used = [], set(), 0
+        for match in _INTERACTIVE_OPEN_TAG_RE.finditer(dom_snapshot.get('body', '')):
+            tag = " ".join(match.group(0).split())[:200]
+            if tag in seen:
+                continue
+            seen.add(tag)
+            used += len(tag) + 1
+            if used > budget:
+                break
+            lines.append(tag)
+        return '\n'.join(lines)
 
     def _parse_llm_response(self, response: str) -> Optional[dict[str, Any]]:
         # Extract any JSON in response, for robustness
@@ -185,37 +315,32 @@ Suggest a concise fallback recovery plan in JSON as shown. If a simple reload or
 
     async def analyze_ride_options(self, ride_data: list[dict[str, Any]]) -> Optional[str]:
         """
-        Uses an LLM to analyze a list of ride options and suggest the cheapest and fastest.
+        Identifies the cheapest and fastest ride locally (see ranking.summarize_rides)
+        and returns a short plain-text summary. No LLM call is made.
         """
         if not ride_data:
             self.logger.warning("No ride data provided to analyze.")
             return None
+        return format_summary(summarize_rides(ride_data))
 
-        # Convert the ride data to a clean JSON string for the prompt
-        ride_data_json = json.dumps(ride_data, indent=2)
-
+    def start_ride_prose_summary(self, ride_data: list[dict[str, Any]]) -> Optional[asyncio.Task]:
+        """
+        Optionally asks the LLM to phrase the locally computed comparison as prose.
+        Runs as a background task so callers never wait on it; await the task only if the prose is wanted.
+        """
+        if not ride_data:
+            return None
+        summary = summarize_rides(ride_data)
         prompt = f"""
-Analyze the following list of Uber ride options provided in JSON format. Your task is to identify the cheapest and the fastest ride.
+Write a two-sentence, friendly recommendation for a rider based on this comparison of ride options.
+Do not invent prices or times that are not in the data.
 
-Ride Data:
+Comparison:
 ```json
-{ride_data_json}
+{json.dumps(summary, indent=2, ensure_ascii=False)}
 ```
-
-Based on the data, please provide a concise summary highlighting:
-1.  **The Cheapest Ride**: Mention its name and price.
-2.  **The Fastest Ride**: Mention its name and ETA.
-
-If a single ride is both the cheapest and fastest, state that clearly. Present the output in a clean, human-readable format.
 """
-
-        self.logger.info("Asking LLM to analyze ride options for the cheapest and fastest...")
-        analysis = await self.provider_manager.get_completion(
-            prompt,
-            preferred_provider="g4f"  # Explicitly use g4f as requested
-        )
-
-        return analysis
+        return asyncio.create_task(self.provider_manager.get_completion(prompt, preferred_provider="g4f"))
 
     async def invoke(self, prompt: str, preferred_provider: Optional[str] = None) -> dict[str, str]:
         """
@@ -0,0 +1,135 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from app.agents.ride_booking.config import Config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class BackendHealth:
+    """Rolling health of one LLM backend (a paid provider or a g4f provider/model pair)."""
+    latency: Optional[float] = None  # EWMA of seconds per answered call
+    success_rate: Optional[float] = None  # EWMA of 1 (usable answer) / 0 (failure or timeout)
+    calls: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    state: str = CLOSED
+    opened_at: float = 0.0
+    probing: bool = False
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "latency_s": None if self.latency is None else round(self.latency, 3),
+            "success_rate": None if self.success_rate is None else round(self.success_rate, 3),
+            "calls": self.calls,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "circuit": self.state,
+        }
+
+
+class LLMHealthTracker:
+    """
+    Remembers which LLM backends answer, and how fast.
+
+    Every attempt updates an exponentially weighted latency and success rate
+    for its backend. ``rank`` orders candidates by expected time to a usable
+    answer (latency divided by success rate), so backends that worked recently
+    are tried first. After ``failure_threshold`` consecutive failures a
+    backend's circuit opens and ``rank`` leaves it out; once ``cooldown``
+    seconds have passed a single probe call is let through (half-open), and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        alpha: float = Config.LLM_HEALTH_ALPHA,
+        failure_threshold: int = Config.LLM_CIRCUIT_FAILURES,
+        cooldown: float = Config.LLM_CIRCUIT_COOLDOWN,
+    ):
+        self.alpha = alpha
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._backends: Dict[str, BackendHealth] = {}
+
+    def _get(self, key: str) -> BackendHealth:
+        health = self._backends.get(key)
+        if health is None:
+            health = self._backends[key] = BackendHealth()
+        return health
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        return sample if current is None else self.alpha * sample + (1 - self.alpha) * current
+
+    # --- Recording ---
+
+    def record(self, key: str, ok: bool, latency: float):
+        """Record the outcome of one call. Cancelled calls (hedging losers) should not be recorded."""
+        health = self._get(key)
+        health.calls += 1
+        health.probing = False
+        health.success_rate = self._ewma(health.success_rate, 1.0 if ok else 0.0)
+        if ok:
+            health.latency = self._ewma(health.latency, latency)
+            health.consecutive_failures = 0
+            health.state = CLOSED
+            return
+
+        health.failures += 1
+        health.consecutive_failures += 1
+        if health.state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+            health.state = OPEN
+            health.opened_at = time.time()
+
+    def release_probe(self, key: str):
+        """A half-open probe ended without a verdict (e.g. it lost a hedge race); allow another."""
+        health = self._backends.get(key)
+        if health is not None:
+            health.probing = False
+
+    # --- Selection ---
+
+    def allow(self, key: str) -> bool:
+        """Whether a call to ``key`` may be made now. Claims the probe slot of a half-open circuit."""
+        health = self._get(key)
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            if time.time() - health.opened_at < self.cooldown:
+                return False
+            health.state = HALF_OPEN
+        if health.probing:
+            return False
+        health.probing = True
+        return True
+
+    def expected_seconds(self, key: str) -> float:
+        """Expected seconds to a usable answer; unknown backends get a neutral prior."""
+        health = self._backends.get(key)
+        latency = health.latency if health and health.latency is not None else Config.LLM_HEDGE_DELAY
+        success = health.success_rate if health and health.success_rate is not None else 0.5
+        return latency / max(success, 0.05)
+
+    def rank(self, keys: Iterable[str], pinned: Optional[str] = None) -> List[str]:
+        """
+        ``keys`` whose circuit allows a call, best first. ``pinned`` (e.g. the
+        caller's preferred provider) stays in front when allowed. Ties keep the
+        input order.
+        """
+        allowed = [key for key in keys if self.allow(key)]
+        ranked = sorted(allowed, key=self.expected_seconds)
+        if pinned in ranked:
+            ranked.remove(pinned)
+            ranked.insert(0, pinned)
+        return ranked
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {key: health.to_dict() for key, health in sorted(self._backends.items())}
+
+
+# Process-wide: every automation's provider manager shares what the others learned.
+llm_health = LLMHealthTracker()
@@ -1,12 +1,161 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
 import openai
 from app.agents.ride_booking.config import Config
 import asyncio
+import functools
+import inspect
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.agents.ride_booking.llm.health import llm_health
+
+# --- Shared clients ---
+# SDK clients are created once per process and reused, so every call rides on
+# an already-open HTTP connection pool instead of a fresh TLS handshake.
+_clients: Dict[Tuple[str, ...], Any] = {}
+
+# SDKs with only a blocking API (boto3, g4f) run here instead of on the event loop.
+_sync_sdk_executor = ThreadPoolExecutor(max_workers=Config.LLM_SYNC_WORKERS, thread_name_prefix="llm-sdk")
+
+
+def _shared_client(key: Tuple[str, ...], factory: Callable[[], Any]) -> Any:
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = factory()
+    return client
+
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking SDK call on the LLM thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_sync_sdk_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def hedged_first(
+    attempts: List[Callable[[], Awaitable[Optional[str]]]],
+    hedge_delay: float,
+    max_parallel: int = 2,
+    on_error: Optional[Callable[[int, BaseException], None]] = None,
+) -> Optional[str]:
+    """
+    First non-empty result of ``attempts``, started in order with hedging.
+
+    The first attempt starts immediately. Whenever ``hedge_delay`` seconds pass
+    without an answer, the next attempt starts alongside it, up to
+    ``max_parallel`` in flight; an attempt that fails or comes back empty is
+    replaced by the next one at once. As soon as one attempt returns a usable
+    answer the others are cancelled. Returns None when every attempt failed.
+    """
+    remaining = iter(enumerate(attempts))
+    pending: Dict[asyncio.Future, int] = {}
+    exhausted = False
+
+    def launch() -> bool:
+        nonlocal exhausted
+        nxt = next(remaining, None)
+        if nxt is None:
+            exhausted = True
+            return False
+        index, attempt = nxt
+        pending[asyncio.ensure_future(attempt())] = index
+        return True
+
+    launch()
+    try:
+        while pending:
+            can_hedge = not exhausted and len(pending) < max(1, max_parallel)
+            done, _ = await asyncio.wait(
+                pending.keys(),
+                timeout=hedge_delay if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                launch()
+                continue
+            for task in done:
+                index = pending.pop(task)
+                error = task.exception()
+                if error is not None:
+                    if on_error:
+                        on_error(index, error)
+                    continue
+                result = task.result()
+                if result and result.strip():
+                    return result
+            for _ in done:
+                if not launch():
+                    break
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def hedged_tracked(
+    candidates: Dict[str, Callable[[], Awaitable[Optional[str]]]],
+    hedge_delay: float,
+    max_parallel: int,
+    pinned: Optional[str] = None,
+    on_error: Optional[Callable[[str, BaseException], None]] = None,
+) -> Optional[str]:
+    """
+    ``hedged_first`` over the candidates ``llm_health`` currently allows, best
+    ranked first, recording the latency and outcome of every call that
+    finishes. Calls cancelled because another one won are not recorded.
+    """
+    ranked = llm_health.rank(candidates.keys(), pinned=pinned)
+    launched = set()
+
+    def tracked(key: str):
+        async def run() -> Optional[str]:
+            launched.add(key)
+            started = time.perf_counter()
+            try:
+                result = await candidates[key]()
+            except asyncio.CancelledError:
+                llm_health.release_probe(key)
+                raise
+            except Exception:
+                llm_health.record(key, False, time.perf_counter() - started)
+                raise
+            llm_health.record(key, bool(result and result.strip()), time.perf_counter() - started)
+            return result
+        return run
+
+    try:
+        return await hedged_first(
+            [tracked(key) for key in ranked],
+            hedge_delay=hedge_delay,
+            max_parallel=max_parallel,
+            on_error=(lambda index, error: on_error(ranked[index], error)) if on_error else None,
+        )
+    finally:
+        for key in ranked:
+            if key not in launched:
+                llm_health.release_probe(key)
+
+
+async def close_llm_clients():
+    """Close the shared SDK clients (and their connection pools) and the sync-SDK thread pool. Called from the app lifespan."""
+    for client in list(_clients.values()):
+        close = getattr(client, "close", None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            pass
+    _clients.clear()
+    _sync_sdk_executor.shutdown(wait=False, cancel_futures=True)
+
 
 class LLMProvider:
     def __init__(self, config: Config):
         self.config = config
         self.logger = None
+        self.timeout = config.LLM_TIMEOUT
         
     def set_logger(self, logger):
         self.logger = logger
@@ -19,17 +168,28 @@ class LLMProvider:
             print(f"[{level.upper()}] {message}")
         
     async def get_completion(self, prompt: str) -> Optional[str]:
+        """Provider completion bounded by ``Config.LLM_TIMEOUT``; None on failure or timeout."""
+        try:
+            return await asyncio.wait_for(self._complete(prompt), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._safe_log('warning', f"{self.__class__.__name__} timed out after {self.timeout}s")
+            return None
+
+    async def _complete(self, prompt: str) -> Optional[str]:
         raise NotImplementedError
 
 class OpenAIProvider(LLMProvider):
-    async def get_completion(self, prompt: str) -> Optional[str]:
+    async def _complete(self, prompt: str) -> Optional[str]:
         if not self.config.OPENAI_API_KEY:
             self._safe_log('warning', "OpenAI API key not provided")
             return None
             
         try:
-            client = openai.OpenAI(api_key=self.config.OPENAI_API_KEY)
-            response = client.chat.completions.create(
+            client = _shared_client(
+                ("openai", self.config.OPENAI_API_KEY),
+                lambda: openai.AsyncOpenAI(api_key=self.config.OPENAI_API_KEY, timeout=self.timeout),
+            )
+            response = await client.chat.completions.create(
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
@@ -61,7 +221,7 @@ class G4FProvider(LLMProvider):
             self._safe_log('warning', f"Failed to initialize g4f client: {str(e)}")
             self.client = None
 
-    async def get_completion(self, prompt: str) -> Optional[str]:
+    async def _complete(self, prompt: str) -> Optional[str]:
         """Get completion using latest g4f API"""
         # Initialize client on first use (after logger is set)
         if not self._client_initialized:
@@ -78,61 +238,77 @@ class G4FProvider(LLMProvider):
             return None
 
     async def _try_traditional_approach(self, prompt: str) -> Optional[str]:
-        """Try traditional g4f ChatCompletion with working providers"""
+        """
+        Try traditional g4f ChatCompletion with working providers.
+
+        Provider/model pairs are hedged (see ``hedged_first``) rather than walked
+        one by one, so a hanging backend costs ``G4F_HEDGE_DELAY`` instead of its
+        full timeout, and the whole search stays inside ``LLM_TIMEOUT``.
+        """
         try:
             import g4f
             from g4f.Provider import (
                 Bing, You, Liaobots, Phind, GeekGpt, FreeGpt
             )
-            
-            # A curated list of providers that generally work without special authentication (like .har files)
-            providers = [
-                You, Bing, Liaobots, Phind, GeekGpt, FreeGpt
-            ]
-            
-            models = ["gpt-4", "gpt-4.1", "gpt-3.5-turbo"]
-            
-            for provider in providers:
-                for model in models:
-                    try:
-                        self._safe_log('info', f"Trying {provider.__name__} with {model}")
-                        
-                        response = g4f.ChatCompletion.create(
-                            model=model,
-                            messages=[{"role": "user", "content": prompt}],
-                            provider=provider,
-                            timeout=30
-                        )
-                        
-                        if response and response.strip():
-                            self._safe_log('info', f"✅ {provider.__name__} success with {model}")
-                            return response
-                            
-                    except Exception as e:
-                        self._safe_log('debug', f"{provider.__name__} with {model} failed: {str(e)}")
-                        continue
-                        
         except Exception as e:
             self._safe_log('debug', f"Traditional g4f approach failed: {str(e)}")
-            
-        return None
+            return None
+
+        # A curated list of providers that generally work without special authentication (like .har files)
+        providers = [
+            You, Bing, Liaobots, Phind, GeekGpt, FreeGpt
+        ]
+
+        models = ["gpt-4", "gpt-4.1", "gpt-3.5-turbo"]
+
+        def attempt(provider, model):
+            async def run() -> Optional[str]:
+                self._safe_log('info', f"Trying {provider.__name__} with {model}")
+                response = await run_blocking(
+                    g4f.ChatCompletion.create,
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    provider=provider,
+                    timeout=min(self.config.G4F_ATTEMPT_TIMEOUT, self.timeout)
+                )
+                if response and response.strip():
+                    self._safe_log('info', f"✅ {provider.__name__} success with {model}")
+                return response
+            return run
+
+        # Keyed per provider/model pair so a dead pair is skipped without writing off the provider
+        candidates = {
+            f"g4f:{provider.__name__}/{model}": attempt(provider, model)
+            for provider in providers for model in models
+        }
+
+        def on_error(key: str, error: BaseException):
+            self._safe_log('debug', f"{key} failed: {str(error)}")
+
+        return await hedged_tracked(
+            candidates,
+            hedge_delay=self.config.G4F_HEDGE_DELAY,
+            max_parallel=self.config.G4F_HEDGE_PARALLEL,
+            on_error=on_error,
+        )
 
 class GeminiProvider(LLMProvider):
-    async def get_completion(self, prompt: str) -> Optional[str]:
+    async def _complete(self, prompt: str) -> Optional[str]:
         try:
             import google.generativeai as genai
             
             if not self.config.GEMINI_API_KEY:
                 self._safe_log('warning', "Gemini API key not provided")
                 return None
-                
-            # Configure Gemini
-            genai.configure(api_key=self.config.GEMINI_API_KEY)
-            
-            # Use Gemini Pro model
-            model = genai.GenerativeModel('gemini-pro')
+
+            def create_model():
+                genai.configure(api_key=self.config.GEMINI_API_KEY)
+                return genai.GenerativeModel('gemini-pro')
+
+            # Configured once; the model object keeps its gRPC channel open between calls
+            model = _shared_client(("gemini", self.config.GEMINI_API_KEY), create_model)
             
-            response = model.generate_content(prompt)
+            response = await model.generate_content_async(prompt, request_options={"timeout": self.timeout})
             return response.text
             
         except ImportError:
@@ -155,19 +331,31 @@ class AWSBedrockProvider(LLMProvider):
             
         try:
             import boto3
+            from botocore.config import Config as BotoConfig
             
             # Check for AWS credentials
             if not all([self.config.AWS_ACCESS_KEY_ID, self.config.AWS_SECRET_ACCESS_KEY, self.config.AWS_REGION]):
                 self._safe_log('warning', "AWS credentials not fully configured")
                 return False
-                
-            # Create Bedrock client
-            self.client = boto3.client(
-                'bedrock-runtime',
-                aws_access_key_id=self.config.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=self.config.AWS_SECRET_ACCESS_KEY,
-                region_name=self.config.AWS_REGION
-            )
+
+            def create_client():
+                return boto3.client(
+                    'bedrock-runtime',
+                    aws_access_key_id=self.config.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=self.config.AWS_SECRET_ACCESS_KEY,
+                    region_name=self.config.AWS_REGION,
+                    config=BotoConfig(
+                        connect_timeout=10,
+                        read_timeout=self.timeout,
+                        max_pool_connections=self.config.LLM_SYNC_WORKERS,
+                    ),
+                )
+
+            # boto3 clients are thread-safe; one is shared by every call on the thread pool
+            key = ("awsbedrock", self.config.AWS_ACCESS_KEY_ID, self.config.AWS_REGION)
+            self.client = _clients.get(key)
+            if self.client is None:
+                self.client = _clients[key] = await run_blocking(create_client)
             
             self.initialized = True
             return True
@@ -179,7 +367,12 @@ class AWSBedrockProvider(LLMProvider):
             self._safe_log('error', f"AWS Bedrock initialization error: {str(e)}")
             return False
 
-    async def get_completion(self, prompt: str) -> Optional[str]:
+    def _invoke(self, model_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking invoke_model round trip, including reading the streamed body; runs on the LLM thread pool."""
+        response = self.client.invoke_model(modelId=model_id, body=json.dumps(body))
+        return json.loads(response['body'].read())
+
+    async def _complete(self, prompt: str) -> Optional[str]:
         """Get completion from AWS Bedrock"""
         if not await self._initialize_client():
             return None
@@ -221,22 +414,12 @@ class AWSBedrockProvider(LLMProvider):
                 try:
                     self._safe_log('info', f"Trying Bedrock model: {model_config['model_id']}")
                     
+                    response_body = await run_blocking(self._invoke, model_config['model_id'], model_config['body'])
+
                     if 'anthropic' in model_config['model_id']:
-                        import json
-                        response = self.client.invoke_model(
-                            modelId=model_config['model_id'],
-                            body=json.dumps(model_config['body'])
-                        )
-                        response_body = json.loads(response['body'].read())
                         return response_body['content'][0]['text']
                         
                     elif 'amazon' in model_config['model_id']:
-                        import json
-                        response = self.client.invoke_model(
-                            modelId=model_config['model_id'],
-                            body=json.dumps(model_config['body'])
-                        )
-                        response_body = json.loads(response['body'].read())
                         return response_body['results'][0]['outputText']
                         
                 except Exception as e:
@@ -251,7 +434,7 @@ class AWSBedrockProvider(LLMProvider):
             return None
 
 class AnthropicProvider(LLMProvider):
-    async def get_completion(self, prompt: str) -> Optional[str]:
+    async def _complete(self, prompt: str) -> Optional[str]:
         try:
             import anthropic
             
@@ -259,9 +442,12 @@ class AnthropicProvider(LLMProvider):
                 self._safe_log('warning', "Anthropic API key not provided")
                 return None
                 
-            client = anthropic.Anthropic(api_key=self.config.ANTHROPIC_API_KEY)
+            client = _shared_client(
+                ("anthropic", self.config.ANTHROPIC_API_KEY),
+                lambda: anthropic.AsyncAnthropic(api_key=self.config.ANTHROPIC_API_KEY, timeout=self.timeout),
+            )
             
-            response = client.messages.create(
+            response = await client.messages.create(
                 model="claude-3-sonnet-20240229",
                 max_tokens=1000,
                 temperature=0.1,
@@ -320,29 +506,50 @@ class LLMProviderManager:
         else:
             print(f"[{level.upper()}] {message}")
             
+    @staticmethod
+    def _provider_name(provider: LLMProvider) -> str:
+        return provider.__class__.__name__.lower().replace('provider', '')
+
     async def get_completion(self, prompt: str, preferred_provider: str = None) -> Optional[str]:
-        """Get completion from providers with fallback"""
-        if preferred_provider:
-            # Try preferred provider first
-            for provider in self.providers:
-                if provider.__class__.__name__.lower().replace('provider', '') == preferred_provider.lower():
-                    self._safe_log('info', f"Trying preferred provider: {provider.__class__.__name__}")
-                    result = await provider.get_completion(prompt)
-                    if result:
-                        return result
-                    break
-        
-        # Try all providers in order
-        for provider in self.providers:
-            self._safe_log('info', f"Trying LLM provider: {provider.__class__.__name__}")
-            result = await provider.get_completion(prompt)
-            if result:
-                self._safe_log('info', f"✅ Success with {provider.__class__.__name__}")
+        """
+        Get completion from providers with hedged fallback.
+
+        Providers are tried best-first by their recorded latency and success
+        rate (see ``llm_health``), with the preferred one kept in front; a
+        provider whose circuit is open is skipped. If the running provider has
+        not answered within ``Config.LLM_HEDGE_DELAY`` the next one is started
+        alongside it (up to ``LLM_HEDGE_PARALLEL`` at once); the first usable
+        answer wins and the other calls are cancelled.
+        """
+        by_name = {self._provider_name(provider): provider for provider in self.providers}
+
+        def attempt(provider: LLMProvider):
+            async def run() -> Optional[str]:
+                self._safe_log('info', f"Trying LLM provider: {provider.__class__.__name__}")
+                result = await provider.get_completion(prompt)
+                if result:
+                    self._safe_log('info', f"✅ Success with {provider.__class__.__name__}")
                 return result
-                
-        self._safe_log('error', "All LLM providers failed")
-        return None
+            return run
+
+        def on_error(name: str, error: BaseException):
+            self._safe_log('warning', f"{by_name[name].__class__.__name__} raised: {error}")
+
+        result = await hedged_tracked(
+            {name: attempt(provider) for name, provider in by_name.items()},
+            hedge_delay=self.config.LLM_HEDGE_DELAY,
+            max_parallel=self.config.LLM_HEDGE_PARALLEL,
+            pinned=preferred_provider.lower() if preferred_provider else None,
+            on_error=on_error,
+        )
+        if result is None:
+            self._safe_log('error', "All LLM providers failed")
+        return result
         
     def get_available_providers(self) -> list:
         """Get list of available provider names"""
-        return [provider.__class__.__name__.replace('Provider', '') for provider in self.providers]
\ No newline at end of file
+        return [provider.__class__.__name__.replace('Provider', '') for provider in self.providers]
+
+    def get_provider_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latency, success rate and circuit state of every LLM backend called so far in this process."""
+        return llm_health.stats()
\ No newline at end of file
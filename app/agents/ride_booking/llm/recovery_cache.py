@@ -0,0 +1,149 @@
+import hashlib
+import re
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from app.agents.ride_booking.config import Config
+from app.browser.digest import STRUCTURAL_KEYS
+from app.agents.ride_booking.utills.json_store import JsonFileStore
+
+# Opening tags of the elements a recovery answer can point at.
+_INTERACTIVE_TAG_RE = re.compile(r"<(button|input|select|textarea|a|form|label)\b([^>]*)>", re.IGNORECASE)
+# Attributes that describe page structure rather than content.
+_STRUCTURAL_ATTR_RE = re.compile(r"\b(data-testid|name|type|role|id)\s*=\s*[\"']([^\"']{1,60})[\"']", re.IGNORECASE)
+# Path segments that vary per request: numbers, UUIDs, long hex or base64-ish ids.
+_VOLATILE_SEGMENT_RE = re.compile(r"^(\d+|[0-9a-f-]{16,}|[A-Za-z0-9_-]{24,})$", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def url_pattern(url: str) -> str:
+    """'https://m.uber.com/go/trip/8f1c...?x=1' -> 'm.uber.com/go/trip/*' (query and ids dropped)."""
+    parsed = urlparse(url or "")
+    segments = ["*" if _VOLATILE_SEGMENT_RE.match(s) else s for s in parsed.path.split("/") if s]
+    return "/".join([parsed.netloc.lower()] + segments)
+
+
+def dom_fingerprint(html: str) -> str:
+    """
+    Short hash of the page's interactive structure: which tags exist with which
+    test ids, names, types, roles and ids. Text, prices and addresses do not
+    contribute, so the same screen fingerprints the same from run to run.
+    """
+    tokens = set()
+    for tag, attrs in _INTERACTIVE_TAG_RE.findall(html or ""):
+        structural = ",".join(
+            f"{name.lower()}={_DIGITS_RE.sub('#', value)}"
+            for name, value in _STRUCTURAL_ATTR_RE.findall(attrs)
+        )
+        tokens.add(f"{tag.lower()}[{structural}]")
+    return hashlib.sha1("\n".join(sorted(tokens)).encode("utf-8")).hexdigest()[:16]
+
+
+def snapshot_fingerprint(dom_snapshot: Dict[str, Any]) -> str:
+    """Structural fingerprint of a snapshot: from its element digest when present, else from its HTML body."""
+    elements = dom_snapshot.get("elements")
+    if elements is None:
+        return dom_fingerprint(dom_snapshot.get("body", ""))
+    tokens = {
+        ",".join(f"{k}={_DIGITS_RE.sub('#', str(item[k]))}" for k in STRUCTURAL_KEYS if item.get(k))
+        for item in elements
+    }
+    return hashlib.sha1("\n".join(sorted(tokens)).encode("utf-8")).hexdigest()[:16]
+
+
+def error_signature(error: str) -> str:
+    """First line of an error with numbers blanked, so retries of one failure share a key."""
+    first_line = (error or "").strip().splitlines()[0] if (error or "").strip() else ""
+    return _DIGITS_RE.sub("#", first_line)[:200]
+
+
+def answer_selectors(answer: Dict[str, Any]) -> Iterable[str]:
+    """Selectors an action or recovery-plan answer relies on ('body' waits excluded)."""
+    steps = answer.get("actions") if isinstance(answer.get("actions"), list) else [answer]
+    for step in steps:
+        selector = step.get("selector") if isinstance(step, dict) else None
+        if selector and selector != "body":
+            yield selector
+
+
+async def verify_on_page(page, answer: Dict[str, Any]) -> bool:
+    """
+    True when ``answer`` names at least one selector and every one matches an
+    element on the live page. Selector-less answers (a bare wait or reload)
+    prove nothing about the page, so they never verify.
+    """
+    selectors = list(answer_selectors(answer))
+    if not selectors:
+        return False
+    for selector in selectors:
+        try:
+            if await page.locator(selector).count() == 0:
+                return False
+        except Exception:
+            return False  # not a valid selector for this page
+    return True
+
+
+class RecoveryCache:
+    """
+    Validated LLM self-healing answers, reusable without another LLM call.
+
+    Entries are keyed by kind ('action' or 'failure'), site, URL pattern, goal
+    (or failing step plus error signature) and DOM fingerprint. Only answers
+    whose selectors resolved on the live page are stored; a hit is re-checked
+    against the page before use and dropped if it no longer resolves. The
+    cache is kept in a JSON file next to the session profiles (see
+    JsonFileStore) so it survives restarts.
+    """
+
+    def __init__(self, path: str, ttl: float = Config.RECOVERY_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._store = JsonFileStore(path, "recovery cache")
+        self._entries: Dict[str, Dict[str, Any]] = self._store.load()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def _save(self):
+        await self._store.save(self._entries)
+
+    @staticmethod
+    def key(kind: str, url: str, goal: str, fingerprint: str) -> str:
+        site = urlparse(url or "").netloc.lower()
+        return "|".join([kind, site, url_pattern(url), " ".join(goal.lower().split()), fingerprint])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry["stored_at"] > self.ttl:
+            self.misses += 1
+            return None
+        return entry["answer"]
+
+    async def put(self, key: str, answer: Dict[str, Any]):
+        self._entries[key] = {"answer": answer, "stored_at": time.time(), "uses": 0}
+        await self._save()
+
+    def mark_used(self, key: str):
+        self.hits += 1
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry["uses"] += 1
+
+    async def invalidate(self, key: str):
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+            await self._save()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+# Process-wide cache shared by every automation's LLM assistant.
+recovery_cache = RecoveryCache(Config.RECOVERY_CACHE_PATH)
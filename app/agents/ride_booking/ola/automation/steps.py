@@ -29,17 +29,16 @@ class OlaSteps:
 
             self.logger.info("Clicking the 'Current Location' input field to activate it.")
             await current_location_input.click(timeout=self.config.TIMEOUT)
-            await asyncio.sleep(2)
 
             self.logger.info(f"Typing '{pickup_location}' into the input field.")
             await current_location_input.fill(pickup_location)
             self.logger.info("Successfully typed the pickup location. Waiting for suggestions...")
-            await asyncio.sleep(5) 
 
             first_suggestion_locator = self.automation.page.locator("ul#search_location_list li.item").first
             
             self.logger.info("Waiting for the first location suggestion to be visible.")
-            await first_suggestion_locator.wait_for(state="visible", timeout=self.config.TIMEOUT)
+            await self.automation.waits.visible("ola.pickup_suggestions", first_suggestion_locator, timeout=self.config.TIMEOUT, required=True)
+            await self.automation.waits.dom_settled("ola.pickup_suggestions_settled", "ul#search_location_list", quiet=300, timeout=3000)
             await first_suggestion_locator.click()
             self.logger.info("Successfully clicked the first pickup location suggestion.")
         except Exception as e:
@@ -59,14 +58,14 @@ class OlaSteps:
             self.logger.info(f"Typing '{destination_location}' into the input field.")
             await destination_input.fill(destination_location)
             self.logger.info("Successfully typed the destination location. Waiting for suggestions...")
-            await asyncio.sleep(2) # Wait for suggestions to populate
 
             # --- Click the first suggestion ---
             # Based on the HTML, we target the first item inside the destination suggestion list.
             first_suggestion_locator = self.automation.page.locator("ul#destination_location_list li.item").first
             
             self.logger.info("Waiting for the first destination suggestion to be visible.")
-            await first_suggestion_locator.wait_for(state="visible", timeout=self.config.TIMEOUT)
+            await self.automation.waits.visible("ola.destination_suggestions", first_suggestion_locator, timeout=self.config.TIMEOUT, required=True)
+            await self.automation.waits.dom_settled("ola.destination_suggestions_settled", "ul#destination_location_list", quiet=300, timeout=3000)
             await first_suggestion_locator.click()
             self.logger.info("Successfully clicked the first destination location suggestion.")
         except Exception as e:
@@ -96,6 +95,7 @@ class OlaSteps:
             
             # IMPORTANT: Update the automation's page reference to the new page.
             self.automation.page = new_page
+            self.automation.waits.page = new_page
             self.logger.info("Automation context successfully switched to the new page.")
         except Exception as e:
             self.logger.error(f"Could not find or click the 'SEARCH OLA CABS' button: {e}", exc_info=True)
@@ -2,30 +2,38 @@ import asyncio
 from typing import Optional, List, Dict, Any
 from playwright.async_api import async_playwright
 import os
-import shutil
-import tempfile
 
 from app.agents.ride_booking.config import Config
 from app.agents.ride_booking.llm.assistant import LLMAssistant 
 from app.agents.ride_booking.utills.logger import setup_logger 
+from app.agents.ride_booking.utills.session_snapshot import session_snapshots
+from app.browser.pool import BrowserPool, browser_pool
+from app.browser.waits import WaitEngine
 
 from app.agents.ride_booking.ola.automation.steps import OlaSteps
 
 
 class OlaAutomation:
-    def __init__(self):
+    PLATFORM = "ola"
+    HOME_URL = "https://www.olacabs.com/"
+    PICKUP_INPUT_SELECTOR = "div.current_location input#textbox1"
+
+    def __init__(self, pool: Optional[BrowserPool] = None):
         self.config = Config()
         self.logger = setup_logger()
         self.llm = LLMAssistant(self.config, self.logger)
 
+        self.pool = pool or browser_pool
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
-        self.temp_user_data_dir = None # To hold the path of the temporary directory
+        self.session_name: Optional[str] = None
+        self.uses_snapshot = False # True when the context was built from an in-memory session snapshot
 
         self.status: str = "initializing"
         self.message: Optional[str] = None
+        self.ride_data: Optional[List[Dict[str, Any]]] = None
 
     def _update_status(self, status: str, message: Optional[str] = None):
         self.status = status
@@ -36,42 +44,47 @@ class OlaAutomation:
         """Initializes Playwright, launches the browser, and handles login if necessary."""
         sessions_dir = self.config.SESSIONS_DIR
         os.makedirs(sessions_dir, exist_ok=True)
-        
-        original_user_data_dir = os.path.join(sessions_dir, f"ola_profile_{session_name}") if session_name else None
-        is_existing_session = os.path.exists(original_user_data_dir) if original_user_data_dir else False
 
-        # --- Use a temporary copy of the session to avoid modifying the original ---
+        self.session_name = session_name
+        is_existing_session = session_snapshots.has_profile(self.PLATFORM, session_name)
+
         if is_existing_session:
-            # Create a temporary directory and copy the original profile into it.
-            self.temp_user_data_dir = tempfile.mkdtemp()
-            user_data_dir = os.path.join(self.temp_user_data_dir, f"ola_profile_{session_name}")
-            self.logger.info(f"Copying existing session '{original_user_data_dir}' to temporary location '{user_data_dir}' for this run.")
-            shutil.copytree(original_user_data_dir, user_data_dir)
+            # --- Load the saved login state into a fresh context on a pooled browser ---
+            self._update_status("running", "Loading Ola session snapshot into a pooled browser context.")
+            await self.pool.start()
+            snapshot = await session_snapshots.get(self.pool.playwright, self.PLATFORM, session_name, self.HOME_URL)
+            self.context = await self.pool.new_context(
+                headless=self.config.HEADLESS,
+                storage_state=snapshot.storage_state(),
+                locale='en-IN',
+                timezone_id='Asia/Kolkata',
+            )
+            await snapshot.apply_to(self.context)
+            self.uses_snapshot = True
         else:
             # If no session exists, we will create it in the original directory.
-            user_data_dir = original_user_data_dir
-
-        self._update_status("running", "Initializing browser with persistent context.")
-        self.playwright = await async_playwright().start()
-        self.context = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=self.config.HEADLESS,
-            slow_mo=self.config.SLOW_MO,
-            locale='en-IN',
-            timezone_id='Asia/Kolkata',
-        )
+            user_data_dir = session_snapshots.profile_dir(self.PLATFORM, session_name) if session_name else None
+            self._update_status("running", "Initializing browser with persistent context.")
+            self.playwright = await async_playwright().start()
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                user_data_dir=user_data_dir,
+                headless=self.config.HEADLESS,
+                slow_mo=self.config.SLOW_MO,
+                locale='en-IN',
+                timezone_id='Asia/Kolkata',
+            )
         self.page = await self.context.new_page()
+        self.waits = WaitEngine(self.page, self.logger)
         self.steps = OlaSteps(self)
         await self.steps.navigate_to_ola_Cabs()
-        await asyncio.sleep(5)
+        await self.waits.visible("ola.entry_ready", self.page.locator(self.PICKUP_INPUT_SELECTOR), timeout=self.config.TIMEOUT)
 
     async def search_rides(self, pickup_location: str, destination_location: str) -> List[Dict[str, Any]]:
         """Enters locations, searches for rides, and returns the extracted data."""
-        await self.steps.enter_pickup_location(pickup_location)
-        await asyncio.sleep(5)
-        await self.steps.enter_destination_location(destination_location)
-        await asyncio.sleep(5)
-        await self.steps.click_search_cabs_button()
+        self.waits.reset()
+        await self.llm.run_with_recovery(
+            self.page, "enter_route", lambda: self._enter_route(pickup_location, destination_location)
+        )
 
         # --- CRITICAL FIX: Wait for the first ride option to be visible ---
         # Instead of a fixed sleep, we wait for the content to actually load.
@@ -84,8 +97,24 @@ class OlaAutomation:
 
         # --- Extract ride data ---
         self.ride_data = await self.steps.extract_rides()
+        self.waits.log_summary("ola.search_rides")
         return self.ride_data
 
+    async def _enter_route(self, pickup_location: str, destination_location: str):
+        await self.steps.enter_pickup_location(pickup_location)
+        await self.steps.enter_destination_location(destination_location)
+        await self.steps.click_search_cabs_button()
+
+    async def reset(self):
+        """Returns the (results) tab to the Ola home page with an empty pickup input so the automation can serve another search."""
+        self.ride_data = None
+        for page in self.context.pages:
+            if page is not self.page:
+                await page.close()
+        await self.steps.navigate_to_ola_Cabs()
+        await self.page.locator(self.PICKUP_INPUT_SELECTOR).wait_for(state="visible", timeout=self.config.TIMEOUT)
+        self._update_status("ready", "Parked on the ride entry screen.")
+
     async def book_ride(self, ride_details: Dict[str, Any]):
         """Selects a specific ride from the list and clicks the final book button."""
         if not ride_details or 'locator' not in ride_details:
@@ -115,13 +144,14 @@ class OlaAutomation:
             self._update_status("completed", "Job finished.")
 
         if self.context:
+            if self.uses_snapshot:
+                # Keep the in-memory snapshot current with any cookies refreshed during this run.
+                try:
+                    await session_snapshots.refresh_from(self.PLATFORM, self.session_name, self.context)
+                except Exception as e:
+                    self.logger.warning(f"Could not refresh session snapshot: {e}")
             await self.context.close()
         if self.playwright:
             await self.playwright.stop()
 
-        # --- Clean up the temporary session directory if it was used ---
-        if self.temp_user_data_dir and os.path.exists(self.temp_user_data_dir):
-            self.logger.info(f"Removing temporary session directory: {self.temp_user_data_dir}")
-            shutil.rmtree(self.temp_user_data_dir)
-
         self.logger.info(f"✅ Ola automation finished.")
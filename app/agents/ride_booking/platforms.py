@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Type
+
+from app.agents.ride_booking.config import Config
+from app.agents.ride_booking.ola.core import OlaAutomation
+from app.agents.ride_booking.rapido.core import RapidoAutomation
+from app.agents.ride_booking.uber.core import UberAutomation
+
+
+@dataclass(frozen=True)
+class RidePlatform:
+    """
+    One ride-booking platform the aggregator fans out to.
+
+    ``budget_ms`` caps how long a search on this platform may hold up a response.
+    ``match_key`` is the ride field used to find the user's pick in the stored
+    results at booking time.
+    """
+    name: str
+    automation_cls: Type[Any]
+    budget_ms: int
+    match_key: str
+    warm_session: Optional[str] = None
+
+
+# Display name -> platform, in the order results are reported.
+RIDE_PLATFORMS: Dict[str, RidePlatform] = {
+    platform.name: platform
+    for platform in (
+        RidePlatform("Uber", UberAutomation, Config.UBER_SEARCH_BUDGET, "product_id", Config.WARM_UBER_SESSION),
+        RidePlatform("Rapido", RapidoAutomation, Config.RAPIDO_SEARCH_BUDGET, "name", Config.WARM_RAPIDO_SESSION),
+        RidePlatform("Ola", OlaAutomation, Config.OLA_SEARCH_BUDGET, "name", Config.WARM_OLA_SESSION),
+    )
+}
@@ -0,0 +1,191 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# "₹120", "₹1,234.50", "₹120–150", "₹120 - ₹150" (en dash, em dash or hyphen)
+_AMOUNT = r"(\d[\d,]*(?:\.\d+)?)"
+_CURRENCY = r"(?:₹|\brs\.?|\binr)"
+_RANGE = _AMOUNT + r"\s*(?:[-–—]|to)\s*" + _CURRENCY + r"?\s*" + _AMOUNT
+_PRICE_RANGE_RE = re.compile(_RANGE, re.IGNORECASE)
+_PRICE_RE = re.compile(_AMOUNT)
+# With a currency marker in the text, only the amount after it is the price ("2 seats ₹120").
+_CURRENCY_RE = re.compile(_CURRENCY, re.IGNORECASE)
+_CURRENCY_RANGE_RE = re.compile(_CURRENCY + r"\s*" + _RANGE, re.IGNORECASE)
+_CURRENCY_PRICE_RE = re.compile(_CURRENCY + r"\s*" + _AMOUNT, re.IGNORECASE)
+
+# "3 min away", "3 mins", "1 hr 5 min", "1h 5m"
+_HOURS_RE = re.compile(r"(\d+)\s*(?:h|hrs?|hours?)\b", re.IGNORECASE)
+_MINUTES_RE = re.compile(r"(\d+)\s*(?:m|mins?|minutes?)\b", re.IGNORECASE)
+# "6:42 pm", "18:42"
+_CLOCK_RE = re.compile(r"\b(\d{1,2}):(\d{2})\s*([ap]\.?m\.?)?", re.IGNORECASE)
+
+ETA_FIELDS = ("eta_and_time", "eta")
+
+
+def parse_price(text: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    '₹120–150' -> (120.0, 150.0); '₹1,234' -> (1234.0, 1234.0); None if there is no amount.
+    When the text has a currency marker (₹, Rs, INR) the amount following it is used,
+    so 'Save 10% ₹200' -> (200.0, 200.0).
+    """
+    if not text:
+        return None
+    anchored = _CURRENCY_RE.search(text) is not None
+    match = (anchored and _CURRENCY_RANGE_RE.search(text)) or _PRICE_RANGE_RE.search(text)
+    if match:
+        low, high = (float(g.replace(",", "")) for g in match.groups())
+        return (min(low, high), max(low, high))
+    match = (anchored and _CURRENCY_PRICE_RE.search(text)) or _PRICE_RE.search(text)
+    if match:
+        amount = float(match.group(1).replace(",", ""))
+        return (amount, amount)
+    return None
+
+
+def _clock_minutes_from(now: datetime, hour: int, minute: int, meridiem: Optional[str]) -> float:
+    if meridiem:
+        meridiem = meridiem[0].lower()
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    delta = (hour * 60 + minute) - (now.hour * 60 + now.minute)
+    return delta + 24 * 60 if delta < 0 else delta  # a clock time earlier than now means tomorrow
+
+
+def parse_eta(text: Optional[str], now: Optional[datetime] = None) -> Tuple[Optional[float], Optional[float]]:
+    """
+    '3 min away • 6:42 pm' -> (3.0, minutes from now until 6:42 pm).
+
+    Returns ``(pickup_minutes, dropoff_minutes)``; either is None when the text
+    does not carry it.
+    """
+    if not text:
+        return None, None
+    now = now or datetime.now()
+
+    clock = _CLOCK_RE.search(text)
+    dropoff = None
+    if clock:
+        dropoff = _clock_minutes_from(now, int(clock.group(1)), int(clock.group(2)), clock.group(3))
+        text = text[:clock.start()] + text[clock.end():]
+
+    hours = _HOURS_RE.search(text)
+    minutes = _MINUTES_RE.search(text)
+    pickup = None
+    if hours or minutes:
+        pickup = float((int(hours.group(1)) * 60 if hours else 0) + (int(minutes.group(1)) if minutes else 0))
+    return pickup, dropoff
+
+
+@dataclass
+class RankedRide:
+    ride: Dict[str, Any]
+    price_low: Optional[float]
+    price_high: Optional[float]
+    pickup_minutes: Optional[float]
+    dropoff_minutes: Optional[float]
+    score: float = field(default=float("inf"))
+
+    @property
+    def price(self) -> Optional[float]:
+        """Midpoint of a fare range; the fare itself otherwise."""
+        if self.price_low is None:
+            return None
+        return (self.price_low + self.price_high) / 2
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Minutes until the rider is picked up (or dropped off, when that is all the platform shows)."""
+        return self.pickup_minutes if self.pickup_minutes is not None else self.dropoff_minutes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "platform": self.ride.get("platform"),
+            "name": self.ride.get("name"),
+            "price": self.ride.get("price"),
+            "price_value": self.price,
+            "eta_minutes": self.eta,
+            "score": None if self.score == float("inf") else round(self.score, 4),
+        }
+
+
+def _eta_text(ride: Dict[str, Any]) -> Optional[str]:
+    for name in ETA_FIELDS:
+        if ride.get(name):
+            return ride[name]
+    return None
+
+
+def parse_ride(ride: Dict[str, Any], now: Optional[datetime] = None) -> RankedRide:
+    price = parse_price(ride.get("price"))
+    pickup, dropoff = parse_eta(_eta_text(ride), now)
+    return RankedRide(
+        ride=ride,
+        price_low=price[0] if price else None,
+        price_high=price[1] if price else None,
+        pickup_minutes=pickup,
+        dropoff_minutes=dropoff,
+    )
+
+
+def _normalized(value: Optional[float], low: float, high: float) -> float:
+    if value is None:
+        return 1.0  # unknown counts as worst
+    return 0.0 if high == low else (value - low) / (high - low)
+
+
+def rank_rides(
+    rides: List[Dict[str, Any]],
+    price_weight: float = 0.5,
+    eta_weight: float = 0.5,
+    now: Optional[datetime] = None,
+) -> List[RankedRide]:
+    """
+    Rank rides by a weighted mix of price and ETA, each min-max normalized over
+    the list (0 = best). ``price_weight=1, eta_weight=0`` ranks by price alone.
+    Rides with an unknown value score as the worst on that axis.
+    """
+    parsed = [parse_ride(ride, now) for ride in rides]
+    prices = [r.price for r in parsed if r.price is not None]
+    etas = [r.eta for r in parsed if r.eta is not None]
+    p_low, p_high = (min(prices), max(prices)) if prices else (0.0, 0.0)
+    e_low, e_high = (min(etas), max(etas)) if etas else (0.0, 0.0)
+
+    total = (price_weight + eta_weight) or 1.0
+    for r in parsed:
+        r.score = (
+            price_weight * _normalized(r.price, p_low, p_high)
+            + eta_weight * _normalized(r.eta, e_low, e_high)
+        ) / total
+    return sorted(parsed, key=lambda r: (r.score, r.price if r.price is not None else float("inf")))
+
+
+def price_sort_key(price_text: Optional[str]) -> float:
+    """Sort key for a price string: the low end of a range, infinity when unparsable."""
+    price = parse_price(price_text)
+    return price[0] if price else float("inf")
+
+
+def summarize_rides(rides: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """The cheapest, fastest and best-balanced rides (None where nothing is parsable)."""
+    parsed = [parse_ride(ride, now) for ride in rides]
+    priced = [r for r in parsed if r.price is not None]
+    timed = [r for r in parsed if r.eta is not None]
+    balanced = rank_rides(rides, now=now)
+    return {
+        "cheapest": min(priced, key=lambda r: r.price).to_dict() if priced else None,
+        "fastest": min(timed, key=lambda r: r.eta).to_dict() if timed else None,
+        "best_value": balanced[0].to_dict() if balanced else None,
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Plain-text rendering of ``summarize_rides``."""
+    lines = []
+    cheapest, fastest = summary.get("cheapest"), summary.get("fastest")
+    if cheapest:
+        lines.append(f"Cheapest: {cheapest['name']} ({cheapest['platform'] or 'unknown platform'}) at {cheapest['price']}")
+    if fastest:
+        lines.append(f"Fastest: {fastest['name']} ({fastest['platform'] or 'unknown platform'}), about {fastest['eta_minutes']:.0f} min")
+    if cheapest and fastest and (cheapest["platform"], cheapest["name"]) == (fastest["platform"], fastest["name"]):
+        lines.append("The cheapest ride is also the fastest.")
+    return "\n".join(lines) if lines else "No comparable ride options."
@@ -4,9 +4,20 @@ import os
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Dict, Any
 
+from app.browser.extraction import CardSpec, Field, extract_cards
 
 if TYPE_CHECKING:
     from app.agents.ride_booking.rapido.core import RapidoAutomation
+# Fare estimate cards. Selected and unselected cards use different markup, hence the combined selectors.
+RAPIDO_RIDE_CARD = CardSpec(
+    card="div.fare-estimate-wrapper div.card-wrap",
+    fields={
+        "name": Field("span.selected-service-name, div.card-content span:first-child", inner_text=True),
+        "price": Field("div.bolder, div", has_text="₹", inner_text=True),
+        "eta": Field("span.eta-indication, span.service-eta", inner_text=True, required=False, default="N/A"),
+    },
+)
+
 
 class RapidoSteps:
     def __init__(self, automation: "RapidoAutomation"):
@@ -17,8 +28,7 @@ class RapidoSteps:
 
     async def navigate_to_rapido(self):
         """Navigates to the Rapido website."""
-        # You'll need to find the correct URL for Rapido's web booking.
-        url = "https://www.rapido.bike"
+        url = self.automation.HOME_URL
         self.logger.info(f"Navigating to Rapido: {url}")
         await self.automation.page.goto(url, wait_until="domcontentloaded", timeout=self.config.TIMEOUT)
         self.logger.info("Successfully navigated to the Rapido page.")
@@ -37,11 +47,10 @@ class RapidoSteps:
             self.logger.info(f"Typing '{pickup_location}' into the input field.")
             await pickup_input.fill(pickup_location)
             self.logger.info("Successfully typed the pickup location. Waiting for suggestions...")
-            await asyncio.sleep(3)  
 
             first_suggestion_locator = self.automation.page.locator("div.dropdown-item").first
             self.logger.info("Waiting for the first location suggestion to be visible.")
-            await first_suggestion_locator.wait_for(state="visible", timeout=self.config.TIMEOUT)
+            await self._wait_for_suggestions("rapido.pickup_suggestions", first_suggestion_locator)
             await first_suggestion_locator.click()
             self.logger.info("Successfully clicked the first pickup location suggestion.")
         except Exception as e:
@@ -62,17 +71,21 @@ class RapidoSteps:
             self.logger.info(f"Typing '{destination_location}' into the input field.")
             await drop_input.fill(destination_location)
             self.logger.info("Successfully typed the destination location. Waiting for suggestions...")
-            await asyncio.sleep(3)  # Wait for suggestions to load.
 
             first_suggestion_locator = self.automation.page.locator("div.dropdown-item").first
             self.logger.info("Waiting for the first destination suggestion to be visible.")
-            await first_suggestion_locator.wait_for(state="visible", timeout=self.config.TIMEOUT)
+            await self._wait_for_suggestions("rapido.drop_suggestions", first_suggestion_locator)
             await first_suggestion_locator.click()
             self.logger.info("Successfully clicked the first destination location suggestion.")
         except Exception as e:
             self.logger.error(f"Failed to enter destination location: {e}", exc_info=True)
             raise
 
+    async def _wait_for_suggestions(self, name: str, first_suggestion_locator):
+        """Waits for the autosuggest list to render and stop changing, so the first entry matches the typed text."""
+        await self.automation.waits.visible(name, first_suggestion_locator, timeout=self.config.TIMEOUT, required=True)
+        await self.automation.waits.dom_settled(f"{name}_settled", quiet=300, timeout=3000)
+
     async def click_search_button(self):
         """Clicks the 'Book Ride' button to find rides."""
         self.logger.info("Looking for the 'Book Ride' button.")
@@ -81,7 +94,7 @@ class RapidoSteps:
             await book_ride_button.wait_for(state="visible", timeout=self.config.TIMEOUT)
             await book_ride_button.click()
             self.logger.info("Successfully clicked the 'Book Ride' button.")
-            await asyncio.sleep(4)
+            await self.automation.waits.dom_settled("rapido.book_ride_settled", quiet=500, timeout=4000)
             await self.automation.page.reload(wait_until="networkidle", timeout=self.config.TIMEOUT)
         except Exception as e:
             self.logger.error(f"Failed to click the 'Book Ride' button: {e}", exc_info=True)
@@ -109,7 +122,7 @@ class RapidoSteps:
         try:
             initial_pickup_input = self.automation.page.locator('input[placeholder="Enter pickup location here"]')
             self.logger.info("Waiting for the initial post-login pickup input to be visible.")
-            await initial_pickup_input.wait_for(state="visible", timeout=self.config.TIMEOUT)
+            await self.automation.waits.visible("rapido.post_login_pickup_ready", initial_pickup_input, timeout=self.config.TIMEOUT, required=True)
             await initial_pickup_input.click()
             self.logger.info("Clicked the initial pickup input. Now looking for the active input field.")
             location_input = self.automation.page.locator('input#autosuggestioninput[placeholder="Enter pickup location"]')
@@ -134,7 +147,7 @@ class RapidoSteps:
         try:
             initial_drop_input = self.automation.page.locator('input[placeholder="Enter drop location here"]')
             self.logger.info("Waiting for the initial post-login pickup input to be visible.")
-            await initial_drop_input.wait_for(state="visible", timeout=self.config.TIMEOUT)
+            await self.automation.waits.visible("rapido.post_login_drop_ready", initial_drop_input, timeout=self.config.TIMEOUT, required=True)
             await initial_drop_input.click()
             self.logger.info("Clicked the initial pickup input. Now looking for the active input field.")
             location_input = self.automation.page.locator(
@@ -155,57 +168,35 @@ class RapidoSteps:
             self.logger.error(f"Failed to enter drop location after login: {e}", exc_info=True)
             raise
 
+    async def read_ride_options(self) -> List[Dict[str, Any]]:
+        """Reads the fare estimate cards currently on screen (one evaluate once they are visible)."""
+        # The main container for ride options, based on the provided HTML.
+        ride_container_locator = self.automation.page.locator("div.fare-estimate-wrapper")
+        await ride_container_locator.wait_for(state="visible", timeout=self.config.TIMEOUT)
+
+        # FIX: Based on the new HTML, all ride cards are now under 'div.card-wrap'.
+        ride_elements_locator = ride_container_locator.locator("div.card-wrap")
+        await self.automation.waits.visible("rapido.fares_ready", ride_elements_locator.first, timeout=self.config.TIMEOUT, required=True)
+
+        cards = await extract_cards(self.automation.page, RAPIDO_RIDE_CARD)
+        self.logger.info(f"Found {len(cards)} ride options.")
+
+        return [
+            {
+                "name": card["name"],
+                "price": card["price"],
+                "eta": card["eta"],
+                "locator": ride_elements_locator.nth(card["index"]),  # Storing the locator for booking
+            }
+            for card in cards
+        ]
+
     async def extract_rides(self) -> List[Dict[str, Any]]:
         """Extracts available ride options."""
         self.logger.info("Extracting ride options from Rapido.")
 
         try:
-            # The main container for ride options, based on the provided HTML.
-            ride_container_locator = self.automation.page.locator("div.fare-estimate-wrapper")
-            await ride_container_locator.wait_for(state="visible", timeout=self.config.TIMEOUT)
-
-            # FIX: Based on the new HTML, all ride cards are now under 'div.card-wrap'.
-            ride_elements_locator = ride_container_locator.locator("div.card-wrap")
-            await ride_elements_locator.first.wait_for(state="visible", timeout=self.config.TIMEOUT)
-
-            extracted_rides = []
-            all_ride_cards = await ride_elements_locator.all()
-            self.logger.info(f"Found {len(all_ride_cards)} potential ride options. Extracting details...")
-
-            for ride_card in all_ride_cards:
-                try:
-                    # --- FIX: Use more robust, combined selectors that work for ALL ride cards ---
-                    # The ride name is in 'span.selected-service-name' (for selected) or inside 'div.card-content > div > span' (for unselected).
-                    name_locator = ride_card.locator("span.selected-service-name, div.card-content span:first-child")
-                    # The price is in 'div.bolder' (for selected) or a direct child 'div' of the card (for unselected).
-                    # The ':has-text("₹")' ensures we only grab the div containing the price.
-                    price_locator = ride_card.locator('div.bolder, div:has-text("₹")')
-                    # The ETA is in 'span.eta-indication' (for selected) or 'span.service-eta' (for unselected).
-                    eta_locator = ride_card.locator("span.eta-indication, span.service-eta")
-
-                    # Ensure the essential elements (name and price) exist before trying to extract.
-                    if await name_locator.count() > 0 and await price_locator.count() > 0:
-                        ride_name = await name_locator.inner_text()
-                        price_text = await price_locator.inner_text()
-                        
-                        # ETA is optional, so we handle its potential absence gracefully.
-                        eta_text = "N/A"
-                        if await eta_locator.count() > 0:
-                            eta_text = await eta_locator.inner_text()
-
-                        # Skip empty/invalid entries
-                        if not ride_name or not price_text:
-                            continue
-
-                        extracted_rides.append({
-                            "name": ride_name.strip(),
-                            "price": price_text.strip(),
-                            "eta": eta_text.strip(),
-                            "locator": ride_card  # Storing the locator for booking
-                        })
-                except Exception as e:
-                    self.logger.warning(f"Could not extract full data from a ride card. It might be an invalid element or missing price. Skipping. Error: {e}")
-                    continue
+            extracted_rides = await self.read_ride_options()
 
             # --- Save to JSON ---
             if extracted_rides:
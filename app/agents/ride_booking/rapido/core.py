@@ -2,27 +2,34 @@ import asyncio
 from typing import Optional, List, Dict, Any
 from playwright.async_api import async_playwright
 import os
-import shutil
-import tempfile
 
 from app.agents.ride_booking.config import Config
 from app.agents.ride_booking.llm.assistant import LLMAssistant
 from app.agents.ride_booking.utills.logger import setup_logger
+from app.agents.ride_booking.utills.session_snapshot import session_snapshots
+from app.browser.pool import BrowserPool, browser_pool
+from app.browser.waits import WaitEngine
 
-from app.agents.ride_booking.rapido.automation.steps import RapidoSteps
+from app.agents.ride_booking.fare_watch import FareWatch
+from app.agents.ride_booking.rapido.automation.steps import RAPIDO_RIDE_CARD, RapidoSteps
 
 
 class RapidoAutomation:
-    def __init__(self):
+    PLATFORM = "rapido"
+    HOME_URL = "https://www.rapido.bike"
+
+    def __init__(self, pool: Optional[BrowserPool] = None):
         self.config = Config()
         self.logger = setup_logger()
         self.llm = LLMAssistant(self.config, self.logger)
 
+        self.pool = pool or browser_pool
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
-        self.temp_user_data_dir = None # To hold the path of the temporary directory
+        self.session_name: Optional[str] = None
+        self.uses_snapshot = False # True when the context was built from an in-memory session snapshot
 
         self.status: str = "initializing"
         self.message: Optional[str] = None
@@ -37,59 +44,86 @@ class RapidoAutomation:
         """Initializes Playwright, launches the browser, and handles login if necessary."""
         sessions_dir = self.config.SESSIONS_DIR
         os.makedirs(sessions_dir, exist_ok=True)
-        
-        original_user_data_dir = os.path.join(sessions_dir, f"rapido_profile_{session_name}") if session_name else None
-        is_existing_session = os.path.exists(original_user_data_dir) if original_user_data_dir else False
 
-        # --- Use a temporary copy of the session to avoid modifying the original ---
+        self.session_name = session_name
+        is_existing_session = session_snapshots.has_profile(self.PLATFORM, session_name)
+
         if is_existing_session:
-            # Create a temporary directory and copy the original profile into it.
-            self.temp_user_data_dir = tempfile.mkdtemp()
-            user_data_dir = os.path.join(self.temp_user_data_dir, f"rapido_profile_{session_name}")
-            self.logger.info(f"Copying existing session '{original_user_data_dir}' to temporary location '{user_data_dir}' for this run.")
-            shutil.copytree(original_user_data_dir, user_data_dir)
+            # --- Load the saved login state into a fresh context on a pooled browser ---
+            self._update_status("running", "Loading Rapido session snapshot into a pooled browser context.")
+            await self.pool.start()
+            snapshot = await session_snapshots.get(self.pool.playwright, self.PLATFORM, session_name, self.HOME_URL)
+            self.context = await self.pool.new_context(
+                headless=self.config.HEADLESS,
+                storage_state=snapshot.storage_state(),
+                locale='en-IN',
+                timezone_id='Asia/Kolkata',
+            )
+            await snapshot.apply_to(self.context)
+            self.uses_snapshot = True
         else:
             # If no session exists, we will create it in the original directory.
-            user_data_dir = original_user_data_dir
-
-        self._update_status("running", "Initializing browser with persistent context for Rapido.")
-        self.playwright = await async_playwright().start()
-        self.context = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=self.config.HEADLESS,
-            slow_mo=self.config.SLOW_MO,
-            locale='en-IN',
-            timezone_id='Asia/Kolkata',
-        )
+            user_data_dir = session_snapshots.profile_dir(self.PLATFORM, session_name) if session_name else None
+            self._update_status("running", "Initializing browser with persistent context for Rapido.")
+            self.playwright = await async_playwright().start()
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                user_data_dir=user_data_dir,
+                headless=self.config.HEADLESS,
+                slow_mo=self.config.SLOW_MO,
+                locale='en-IN',
+                timezone_id='Asia/Kolkata',
+            )
         self.page = await self.context.new_page()
+        self.waits = WaitEngine(self.page, self.logger)
         self.steps = RapidoSteps(self)
         await self.steps.navigate_to_rapido()
 
     async def search_rides(self, pickup_location: str, destination_location: str) -> List[Dict[str, Any]]:
         """Enters locations, searches for rides, and returns the extracted data."""
         self._update_status("running", "Entering ride details for Rapido.")
-        await self.steps.enter_pickup_location(pickup_location)
-        await self.steps.enter_destination_location(destination_location)
-        await self.steps.click_search_button()
-        await asyncio.sleep(5)
-
+        self.waits.reset()
+        await self.llm.run_with_recovery(
+            self.page, "enter_route", lambda: self._enter_route(pickup_location, destination_location)
+        )
 
         # After attempting to search, check if a login is required.
         await self.steps.check_and_handle_login()
-        await asyncio.sleep(5)
 
         # After login, a new location prompt appears. We re-enter the pickup location.
         self.logger.info("Handling post-login location entry.")
         await self.steps.enter_location_after_login(pickup_location)
-        await asyncio.sleep(3)
         await self.steps.enter_drop_location_after_login(destination_location)
-        await asyncio.sleep(4)
-        
-
 
         self.ride_data = await self.steps.extract_rides()
+        self.waits.log_summary("rapido.search_rides")
         return self.ride_data
 
+    async def _enter_route(self, pickup_location: str, destination_location: str):
+        await self.steps.enter_pickup_location(pickup_location)
+        await self.steps.enter_destination_location(destination_location)
+        await self.steps.click_search_button()
+
+    def watch_fares(self, poll_interval: float = 30.0) -> FareWatch:
+        """
+        Watch mode: keep this page on the results screen and push fare deltas to subscribers.
+        Call after search_rides; start() the returned watch and stop() it before reusing the automation.
+        """
+        return FareWatch(
+            self,
+            self.steps.read_ride_options,
+            key="name",
+            card_selector=RAPIDO_RIDE_CARD.card,
+            poll_interval=poll_interval,
+        )
+
+    async def reset(self):
+        """Returns the page to an empty pickup-entry screen so the automation can serve another search."""
+        self.ride_data = None
+        await self.steps.navigate_to_rapido()
+        pickup_input = self.page.locator('input[placeholder="Enter Pickup Location"][aria-label="pickup"]')
+        await pickup_input.wait_for(state="visible", timeout=self.config.TIMEOUT)
+        self._update_status("ready", "Parked on the Rapido entry screen.")
+
     async def book_ride(self, ride_details: Dict[str, Any]):
         """Selects a specific ride from the list and clicks the final book button."""
         if not ride_details or 'name' not in ride_details:
@@ -110,13 +144,14 @@ class RapidoAutomation:
             self._update_status("completed", "Job finished.")
 
         if self.context:
+            if self.uses_snapshot:
+                # Keep the in-memory snapshot current with any login done during this run.
+                try:
+                    await session_snapshots.refresh_from(self.PLATFORM, self.session_name, self.context)
+                except Exception as e:
+                    self.logger.warning(f"Could not refresh Rapido session snapshot: {e}")
             await self.context.close()
         if self.playwright:
             await self.playwright.stop()
 
-        # --- Clean up the temporary session directory if it was used ---
-        if self.temp_user_data_dir and os.path.exists(self.temp_user_data_dir):
-            self.logger.info(f"Removing temporary session directory: {self.temp_user_data_dir}")
-            shutil.rmtree(self.temp_user_data_dir)
-
         self.logger.info("✅ Rapido automation finished.")
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+class RideSearchJob:
+    """
+    State of one asynchronous ride search.
+
+    Each platform search runs on its own and reports through ``publish``. The
+    job keeps the events in order, so a stream that connects late replays what
+    it missed and then follows live updates. A poll just reads the current
+    ``snapshot``. The leased automations and raw rides (with their Playwright
+    locators) stay on the job for the booking step.
+    """
+
+    def __init__(self, job_id: str, platforms: List[str]):
+        self.job_id = job_id
+        self.created_at = time.time()
+        self.status = "running"
+        self.platforms: Dict[str, Dict[str, Any]] = {
+            name: {"status": "pending", "rides": [], "error": None, "elapsed_ms": None} for name in platforms
+        }
+        self.events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+        # --- Booking state ---
+        self.automations: Dict[str, Any] = {}
+        self.pools: Dict[str, Any] = {}
+        self.all_rides: List[Dict[str, Any]] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    async def publish(self, event: Dict[str, Any]):
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def platform_started(self, platform: str):
+        self.platforms[platform]["status"] = "running"
+        await self.publish({"event": "platform_started", "platform": platform})
+
+    async def platform_completed(self, platform: str, rides: List[Dict[str, Any]], elapsed_ms: int):
+        self.platforms[platform].update(status="completed", source="live", rides=rides, elapsed_ms=elapsed_ms)
+        await self.publish({
+            "event": "platform_result",
+            "platform": platform,
+            "source": "live",
+            "rides": rides,
+            "elapsed_ms": elapsed_ms,
+        })
+
+    async def platform_cached(self, platform: str, rides: List[Dict[str, Any]], cache_age_s: float, fresh: bool):
+        """Answer for a platform from the fare cache. Cached rides are shown but cannot be booked from this job."""
+        self.platforms[platform].update(status="cached", source="cache", rides=rides, elapsed_ms=0, cache_age_s=cache_age_s, fresh=fresh)
+        await self.publish({
+            "event": "platform_result",
+            "platform": platform,
+            "source": "cache",
+            "fresh": fresh,
+            "cache_age_s": cache_age_s,
+            "rides": rides,
+            "elapsed_ms": 0,
+        })
+
+    async def platform_failed(self, platform: str, error: str, elapsed_ms: int):
+        self.platforms[platform].update(status="failed", error=error, elapsed_ms=elapsed_ms)
+        await self.publish({"event": "platform_error", "platform": platform, "error": error, "elapsed_ms": elapsed_ms})
+
+    async def platform_timed_out(self, platform: str, elapsed_ms: int, cached_rides: Optional[List[Dict[str, Any]]] = None, cache_age_s: Optional[float] = None):
+        """The platform missed its budget; report the last cached rides for the route, if any, in its place."""
+        self.platforms[platform].update(status="timed_out", rides=cached_rides or [], elapsed_ms=elapsed_ms, cache_age_s=cache_age_s)
+        await self.publish({
+            "event": "platform_timeout",
+            "platform": platform,
+            "elapsed_ms": elapsed_ms,
+            "rides": cached_rides or [],
+            "cache_age_s": cache_age_s,
+        })
+
+    async def finish(self):
+        """Mark the job done once every platform has reported."""
+        succeeded = any(p["rides"] for p in self.platforms.values())
+        self.status = "completed" if succeeded else "failed"
+        await self.publish({"event": "done", "job_id": self.job_id, "status": self.status})
+
+    def rides(self) -> List[Dict[str, Any]]:
+        """Serializable rides from every platform that has reported so far."""
+        return [ride for p in self.platforms.values() for ride in p["rides"]]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "platforms": {
+                name: {k: v for k, v in state.items() if k != "rides"} | {"count": len(state["rides"])}
+                for name, state in self.platforms.items()
+            },
+        }
+
+    async def stream(self, start: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield events from index ``start`` onwards, ending after the ``done`` event."""
+        index = start
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.events) > index)
+                pending = self.events[index:]
+            for event in pending:
+                yield event
+                if event["event"] == "done":
+                    return
+            index += len(pending)
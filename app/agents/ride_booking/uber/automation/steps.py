@@ -8,9 +8,125 @@ from typing import Dict, Optional, Any, List, TYPE_CHECKING
 import time
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
+from app.browser.extraction import CardSpec, Field, extract_cards
+from app.browser.waits import WaitTimeout
+from app.agents.ride_booking.uber.places import PICKUP_PARAM, uber_places
+
 if TYPE_CHECKING:
     from app.agents.ride_booking.uber.core import UberAutomation
 
+# --- Fare response parsing ---
+# The Uber web app fetches its product list (GraphQL / JSON) before rendering it.
+# Field names differ between app versions, so each field is looked up by alias.
+# Only fare and estimate operations are read: by REST path or GraphQL operation name.
+FARE_OPERATION_HINTS = ("fare", "estimate")
+# A record needs a product-specific id; a bare "id"/"uuid" matches unrelated objects.
+PRODUCT_ID_KEYS = ("productUuid", "productId", "product_id")
+PRODUCT_NAME_KEYS = ("displayName", "productName", "name", "title")
+PRODUCT_FARE_KEYS = ("fare", "fares", "fareString", "displayFare", "formattedFare", "price")
+PRODUCT_ETA_KEYS = ("etaStringShort", "etaString", "pickupEtaString", "eta")
+PRODUCT_SEATS_KEYS = ("capacity", "seats", "maxCapacity")
+
+
+def _first_value(node: Dict[str, Any], keys: tuple) -> Any:
+    for key in keys:
+        value = node.get(key)
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def _fare_text(value: Any) -> Optional[str]:
+    """Reduces the many shapes a fare can take (string, list of fares, nested object) to display text."""
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, (int, float)):
+        return f"₹{value:g}"
+    if isinstance(value, list):
+        return _fare_text(value[0]) if value else None
+    if isinstance(value, dict):
+        return _fare_text(_first_value(value, PRODUCT_FARE_KEYS + ("amountString", "formatted", "display", "value")))
+    return None
+
+
+def _graphql_operations(request) -> List[str]:
+    """operationName(s) of a GraphQL request, from the query string or the (possibly batched) JSON body."""
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(request.url).query)
+    names = list(query.get("operationName", []))
+    try:
+        body = json.loads(request.post_data or "null")
+    except (TypeError, ValueError):
+        body = None
+    for operation in body if isinstance(body, list) else [body]:
+        if isinstance(operation, dict) and isinstance(operation.get("operationName"), str):
+            names.append(operation["operationName"])
+    return names
+
+
+def is_fare_response(response) -> bool:
+    """True for an XHR/fetch response of a fare or estimate operation."""
+    request = response.request
+    if request.resource_type not in ("xhr", "fetch"):
+        return False
+    path = urllib.parse.urlparse(response.url).path.lower()
+    names = [path] if "graphql" not in path else [name.lower() for name in _graphql_operations(request)]
+    return any(hint in name for name in names for hint in FARE_OPERATION_HINTS)
+
+
+def parse_fare_payload(payload: Any) -> List[Dict[str, Any]]:
+    """
+    Walks a fare/product JSON payload and returns ride records shaped like the
+    DOM extraction output (product_id, name, seats, price, eta_and_time, is_selected).
+    """
+    records: List[Dict[str, Any]] = []
+    seen_ids = set()
+
+    def walk(node: Any):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+            return
+        if not isinstance(node, dict):
+            return
+
+        product_id = _first_value(node, PRODUCT_ID_KEYS)
+        name = _first_value(node, PRODUCT_NAME_KEYS)
+        price = _fare_text(_first_value(node, PRODUCT_FARE_KEYS))
+        if product_id and isinstance(name, str) and price:
+            if product_id not in seen_ids:
+                seen_ids.add(product_id)
+                seats = _first_value(node, PRODUCT_SEATS_KEYS)
+                eta = _first_value(node, PRODUCT_ETA_KEYS)
+                records.append({
+                    "product_id": str(product_id),
+                    "name": name.strip(),
+                    "seats": int(seats) if isinstance(seats, (int, float)) else None,
+                    "price": price,
+                    "eta_and_time": eta.strip() if isinstance(eta, str) else "",
+                    "is_selected": bool(node.get("isSelected") or node.get("selected")),
+                })
+            return
+
+        for value in node.values():
+            walk(value)
+
+    walk(payload)
+    return records
+
+
+# Product selection list, read in one evaluate by read_ride_options.
+UBER_RIDE_CARD = CardSpec(
+    card='li[data-testid="product_selector.list_item"]',
+    fields={
+        "product_id": Field(attr="data-itemid"),
+        "name": Field("p", inner_text=True),
+        "price": Field("p", has_text="₹"),
+        "eta_and_time": Field('p[data-testid="product_selector.list_item.eta_string"]', inner_text=True, required=False, default=""),
+        "is_selected": Field(attr="aria-selected", required=False),
+    },
+)
+
+
 class UberSteps:
     def __init__(self, automation: "UberAutomation"):
         self.automation = automation
@@ -22,6 +138,10 @@ class UberSteps:
         self.pickup_location: Optional[str] = None
         self.destination_location: Optional[str] = None
 
+        # Network fare capture state (see start_fare_capture)
+        self._fare_future: Optional[asyncio.Future] = None
+        self._fare_handler = None
+
     async def navigate_to_uber(self):
         """Navigates to the Uber sign-in/booking page."""
         url = "https://www.uber.com/global/en/sign-in/"
@@ -181,32 +301,32 @@ class UberSteps:
             # 4. Await the action
             await pickup_input.click()
             self.logger.info("Pickup location input field is now active.")
-            await asyncio.sleep(2)
+            await self.automation.waits.enabled("uber.pickup_input_ready", pickup_input, timeout=5000)
             
             self.logger.info(f"Entering pickup location: '{pickup_location}'")
             await pickup_input.fill(pickup_location)
-            await asyncio.sleep(3)
             self.logger.info("Successfully entered pickup location.")
             
-            # Assuming 'page' is your Playwright Page object
-
             # --- Locator for the first suggestion ---
             # This targets the first list item with role="option" inside the listbox element.
-            first_suggestion_locator = self.automation.page.locator('div[aria-label="pickup location dropdown"] li[role="option"]').first
+            dropdown_selector = 'div[aria-label="pickup location dropdown"]'
+            first_suggestion_locator = self.automation.page.locator(f'{dropdown_selector} li[role="option"]').first
 
             # --- Action to Wait and Click ---
             try:
                 print("Waiting for the first address suggestion to become visible...")
                 
-                # Explicitly wait for the element to be visible with a generous timeout (e.g., 20 seconds)
-                await first_suggestion_locator.wait_for(state="visible", timeout=20000)
+                # Suggestions render as soon as the place search returns; let the list finish
+                # re-rendering for the typed text before clicking its first entry.
+                await self.automation.waits.visible("uber.pickup_suggestions", first_suggestion_locator, timeout=20000, required=True)
+                await self.automation.waits.dom_settled("uber.pickup_suggestions_settled", dropdown_selector, quiet=300, timeout=3000)
                 
                 # Click the element
                 await first_suggestion_locator.click()
                 
                 print("Successfully clicked the first address suggestion.")
 
-            except TimeoutError:
+            except WaitTimeout:
                 # This will catch the error if the element never becomes visible
                 print("ERROR: Timed out waiting for the first address suggestion to appear and become visible.")
                 # You can add a screenshot here for debugging: page.screenshot(path="timeout_error.png")
@@ -238,15 +358,16 @@ class UberSteps:
 
             self.logger.info(f"Entering destination location: '{destination_location}'")
             await destination_input.fill(destination_location)
-            await asyncio.sleep(5)
             self.logger.info("Successfully entered destination location.")
 
             # --- Wait for and click the first suggestion ---
             self.logger.info("Waiting for destination address suggestions to appear...")
             # The destination dropdown has a different aria-label
-            first_suggestion_locator = self.automation.page.locator('div[aria-label="destination location dropdown"] li[role="option"]').first
+            dropdown_selector = 'div[aria-label="destination location dropdown"]'
+            first_suggestion_locator = self.automation.page.locator(f'{dropdown_selector} li[role="option"]').first
 
-            await first_suggestion_locator.wait_for(state="visible", timeout=20000)
+            await self.automation.waits.visible("uber.destination_suggestions", first_suggestion_locator, timeout=20000, required=True)
+            await self.automation.waits.dom_settled("uber.destination_suggestions_settled", dropdown_selector, quiet=300, timeout=3000)
             await first_suggestion_locator.click()
             self.logger.info("Clicked the first address suggestion to confirm destination location.")
 
@@ -264,7 +385,7 @@ class UberSteps:
             desktop_container = self.automation.page.locator('[data-testid="child-content-desktop"]')
             see_prices_button = desktop_container.locator('[data-bits-testid="dotcom-ui.cta-link.button.0"]')
             
-            await see_prices_button.wait_for(state="visible", timeout=self.config.TIMEOUT)
+            await self.automation.waits.enabled("uber.see_prices_enabled", see_prices_button, timeout=self.config.TIMEOUT, required=True)
             await see_prices_button.click()
             self.logger.info("Successfully clicked the 'See prices' button.")
             await self.automation.page.wait_for_load_state("domcontentloaded")
@@ -272,6 +393,28 @@ class UberSteps:
             self.logger.error(f"Could not find or click the 'See prices' button: {e}")
             raise
 
+    async def open_ride_deep_link(self, url: str) -> bool:
+        """
+        Opens a product-selection URL with pickup and drop pre-filled.
+        Returns False if the ride options do not render, so the caller can fall back to typing the locations.
+        """
+        self.logger.info("Opening Uber product selection directly from known places.")
+        await self.automation.page.goto(url, wait_until="domcontentloaded", timeout=self.config.TIMEOUT)
+        ride_options = self.automation.page.locator(UBER_RIDE_CARD.card).first
+        return await self.automation.waits.visible("uber.deep_link_rides", ride_options, timeout=self.config.FARE_RESPONSE_TIMEOUT)
+
+    async def remember_route_places(self, pickup_location: str, destination_location: str):
+        """After a typed search, stores the places Uber resolved so the route can be deep-linked next time."""
+        page = self.automation.page
+
+        async def url_has_places():
+            query = urllib.parse.urlparse(page.url).query
+            return f"{PICKUP_PARAM}=" in query and "drop" in query
+
+        has_places = await self.automation.waits.until("uber.product_selection_url", url_has_places, timeout=10000)
+        if has_places:
+            await uber_places.learn_from_url(page.url, pickup_location, destination_location)
+
     async def click_add_payment_method_button(self):
         """Clicks the 'Add Payment Method' button that appears after viewing prices."""
         self.logger.info("Looking for the 'Add Payment Method' button.")
@@ -322,10 +465,75 @@ class UberSteps:
             self.logger.error(f"Could not find or click the 'Confirm' payment button: {e}")
             raise
 
+    def start_fare_capture(self):
+        """
+        Starts listening for the fare/product JSON the Uber web app fetches.
+        Must be called before the request is triggered (i.e. before 'See prices').
+        """
+        self.stop_fare_capture()
+        page = self.automation.page
+        self._fare_future = asyncio.get_running_loop().create_future()
+        future = self._fare_future
+
+        async def on_response(response):
+            if future.done():
+                return
+            if not is_fare_response(response):
+                return
+            if "json" not in (response.headers.get("content-type") or ""):
+                return
+            try:
+                records = parse_fare_payload(await response.json())
+            except Exception as e:
+                self.logger.debug(f"Ignoring unparsable response from {response.url}: {e}")
+                return
+            if records and not future.done():
+                self.logger.info(f"Captured {len(records)} ride options from network response: {response.url[:80]}")
+                future.set_result(records)
+
+        self._fare_handler = on_response
+        page.on("response", on_response)
+
+    def stop_fare_capture(self):
+        """Removes the response listener installed by start_fare_capture."""
+        if self._fare_handler is not None:
+            try:
+                self.automation.page.remove_listener("response", self._fare_handler)
+            except Exception:
+                pass
+        self._fare_handler = None
+
+    async def _wait_for_captured_fares(self) -> List[Dict[str, Any]]:
+        """Returns the ride records parsed from the fare response, or [] if none arrived in time."""
+        if self._fare_future is None:
+            return []
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._fare_future), timeout=self.config.FARE_RESPONSE_TIMEOUT / 1000)
+        except asyncio.TimeoutError:
+            self.logger.warning("No fare response observed in time; falling back to DOM extraction.")
+            return []
+        finally:
+            self.stop_fare_capture()
+            self._fare_future = None
+
     async def extract_uber_rides_to_json(self):
         """
-        Extracts ride details (Name, Price, ETA, Product ID) from the Uber product selection list
-        and saves them to a timestamped file with location context. Returns the current ride options.
+        Extracts ride details (Name, Price, ETA, Product ID) and saves them to a timestamped
+        file with location context. Returns the current ride options.
+
+        Uses the fare response captured by start_fare_capture when available and falls back
+        to scraping the product selection list otherwise.
+        """
+        ride_data = await self._wait_for_captured_fares()
+        if not ride_data:
+            ride_data = await self.read_ride_options()
+
+        self._save_ride_history(ride_data)
+        return ride_data
+
+    async def read_ride_options(self) -> List[Dict[str, Any]]:
+        """
+        Extracts ride details (Name, Price, ETA, Product ID) from the Uber product selection list.
         """
         page = self.automation.page
         
@@ -340,64 +548,32 @@ class UberSteps:
             self.logger.error("Timed out waiting for ride options to appear on the screen.")
             return []
 
+        cards = await extract_cards(page, UBER_RIDE_CARD)
+        self.logger.info(f"Found {len(cards)} ride options.")
+
         ride_data = []
-        count = await ride_options_locator.count()
-        self.logger.info(f"Found {count} ride options. Extracting data...")
-        
-        for i in range(count):
-            ride_element = ride_options_locator.nth(i)
-            
-            # --- Define Specific Locators based on the provided HTML ---
-            
-            # 1. Ride Name: The first <p> tag inside the list item is typically the name.
-            name_locator = ride_element.locator('p').first
-            
-            # 2. Price: The <p> tag that contains the currency symbol '₹'.
-            price_locator = ride_element.locator("p:has-text('₹')").first
-            
-            # 3. ETA/Time: The <p> with a specific data-testid for the ETA string.
-            eta_locator = ride_element.locator('p[data-testid="product_selector.list_item.eta_string"]').first
-            
-            # --- Extraction and Error Handling ---
-            
-            try:
-                # 4. Product ID (Highly reliable as a data attribute)
-                product_id = await ride_element.get_attribute('data-itemid')
-                
-                # 5. Current Selection Status
-                is_selected = await ride_element.get_attribute('aria-selected') == 'true'
-
-                # Extract Text (use strip() to clean whitespace)
-                ride_name_raw = (await name_locator.inner_text()).strip()
-                price = await price_locator.inner_text()
-                # Extract ETA and remove unnecessary whitespace/newlines
-                eta_string = (await eta_locator.inner_text()).replace('\n', ' ').strip()
-                
-                # --- Logic to separate ride name and seat count ---
-                ride_name = ride_name_raw
-                seats = None
-                # Use regex to find a number at the end of the string, which usually indicates seat count.
-                match = re.search(r'^(.*?)\s*(\d+)$', ride_name_raw)
-                if match:
-                    # If a match is found, separate the name and the number of seats.
-                    ride_name = match.group(1).strip()
-                    seats = int(match.group(2))
-
-                # Append the structured data
-                ride_data.append({
-                    "product_id": product_id,
-                    "name": ride_name,
-                    "seats": seats,
-                    "price": price.strip(),
-                    "eta_and_time": eta_string,
-                    "is_selected": is_selected,
-                })
-                
-            except Exception as e:
-                self.logger.warning(f"Could not extract full data from ride option {i+1}. Skipping. Error: {e}")
-                continue
+        for card in cards:
+            # The name cell often ends with the seat count (e.g. "Uber Go 4"); split it off.
+            ride_name = card["name"]
+            seats = None
+            match = re.search(r'^(.*?)\s*(\d+)$', ride_name)
+            if match:
+                ride_name = match.group(1).strip()
+                seats = int(match.group(2))
+
+            ride_data.append({
+                "product_id": card["product_id"],
+                "name": ride_name,
+                "seats": seats,
+                "price": card["price"],
+                "eta_and_time": card["eta_and_time"],
+                "is_selected": card["is_selected"] == "true",
+            })
 
-        # --- Save to JSON ---
+        return ride_data
+
+    def _save_ride_history(self, ride_data: List[Dict[str, Any]]):
+        """Archives the extracted ride options to a timestamped JSON file."""
         if ride_data:
             # Create a directory for historical ride data if it doesn't exist.
             history_dir = os.path.join(os.path.dirname(__file__), '..', 'ride_history')
@@ -422,7 +598,6 @@ class UberSteps:
         else:
             self.logger.warning("Extraction failed: No ride data was collected.")
             
-        return ride_data
 
     async def select_ride_by_product_id(self, product_id: str):
         """
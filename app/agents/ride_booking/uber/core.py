@@ -3,24 +3,33 @@ from typing import Dict, Any, Optional, List
 from playwright.async_api import async_playwright
 import os
 from app.agents.ride_booking.config import Config
-import shutil
-import tempfile
 import difflib
 from app.agents.ride_booking.llm.assistant import LLMAssistant
 from app.agents.ride_booking.utills.logger import setup_logger
-from app.agents.ride_booking.uber.automation.steps import UberSteps
+from app.agents.ride_booking.utills.session_snapshot import session_snapshots
+from app.agents.ride_booking.fare_watch import FareWatch
+from app.agents.ride_booking.uber.automation.steps import UBER_RIDE_CARD, UberSteps, is_fare_response
+from app.agents.ride_booking.uber.places import uber_places
+from app.browser.pool import BrowserPool, browser_pool
+from app.browser.waits import WaitEngine
 
 
 class UberAutomation:
-    def __init__(self):
+    PLATFORM = "uber"
+    RIDE_URL = "https://www.uber.com/in/en/start-riding/?_csid=tf88Y3Gcr0V7cKx-kcgqdA&sm_flow_id=hrZAftti&state=AScUbrw05Y_2-pEFluwHm6ezQw1Pi8a-2ytrb_vUixw%3D"
+    PICKUP_INPUT_SELECTOR = '[data-testid="child-content-desktop"] [aria-label="Pickup location needs to be filled in"]'
+
+    def __init__(self, pool: Optional[BrowserPool] = None):
         self.config = Config()
         self.logger = setup_logger()
         self.llm = LLMAssistant(self.config, self.logger)
 
+        self.pool = pool or browser_pool
         self.playwright = None
         self.context = None
         self.page = None
-        self.temp_user_data_dir = None # To hold the path of the temporary directory
+        self.session_name: Optional[str] = None
+        self.uses_snapshot = False # True when the context was built from an in-memory session snapshot
 
         # --- State Management for API ---
         self.status: str = "initializing"
@@ -37,39 +46,45 @@ class UberAutomation:
         sessions_dir = self.config.SESSIONS_DIR
         os.makedirs(sessions_dir, exist_ok=True)
 
-        original_user_data_dir = os.path.join(sessions_dir, f"uber_profile_{session_name}") if session_name else None
-        is_existing_session = os.path.exists(original_user_data_dir) if original_user_data_dir else False
+        self.session_name = session_name
+        is_existing_session = session_snapshots.has_profile(self.PLATFORM, session_name)
 
-        # --- Use a temporary copy of the session to avoid modifying the original ---
         if is_existing_session:
-            # Create a temporary directory and copy the original profile into it.
-            self.temp_user_data_dir = tempfile.mkdtemp()
-            user_data_dir = os.path.join(self.temp_user_data_dir, f"uber_profile_{session_name}")
-            self.logger.info(f"Copying existing session '{original_user_data_dir}' to temporary location '{user_data_dir}' for this run.")
-            shutil.copytree(original_user_data_dir, user_data_dir)
+            # --- Load the saved login state into a fresh context on a pooled browser ---
+            self._update_status("running", "Loading session snapshot into a pooled browser context.")
+            await self.pool.start()
+            snapshot = await session_snapshots.get(self.pool.playwright, self.PLATFORM, session_name, self.RIDE_URL)
+            self.context = await self.pool.new_context(
+                headless=self.config.HEADLESS,
+                storage_state=snapshot.storage_state(),
+                locale='en-IN',
+                timezone_id='Asia/Kolkata',
+            )
+            await snapshot.apply_to(self.context)
+            self.uses_snapshot = True
         else:
-            # If no session exists, we will create it in the original directory.
-            user_data_dir = original_user_data_dir
-
-        self._update_status("running", "Initializing browser with persistent context.")
-
-        self.playwright = await async_playwright().start()
-        self.context = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=self.config.HEADLESS,
-            slow_mo=self.config.SLOW_MO,
-            locale='en-IN',
-            timezone_id='Asia/Kolkata',
-        )
+            # If no session exists, log in on a persistent profile in the original
+            # directory so it can be snapshotted on later runs.
+            user_data_dir = session_snapshots.profile_dir(self.PLATFORM, session_name) if session_name else None
+            self._update_status("running", "Initializing browser with persistent context.")
+
+            self.playwright = await async_playwright().start()
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                user_data_dir=user_data_dir,
+                headless=self.config.HEADLESS,
+                slow_mo=self.config.SLOW_MO,
+                locale='en-IN',
+                timezone_id='Asia/Kolkata',
+            )
         self.page = await self.context.new_page()
+        self.waits = WaitEngine(self.page, self.logger)
         self.steps = UberSteps(self)
 
         if is_existing_session:
             # --- EXISTING SESSION WORKFLOW ---
             self._update_status("running", "Existing session found. Navigating directly to ride booking page.")
-            ride_url = "https://www.uber.com/in/en/start-riding/?_csid=tf88Y3Gcr0V7cKx-kcgqdA&sm_flow_id=hrZAftti&state=AScUbrw05Y_2-pEFluwHm6ezQw1Pi8a-2ytrb_vUixw%3D"
-            await self.page.goto(ride_url, wait_until="domcontentloaded")
-            await asyncio.sleep(5)
+            await self.page.goto(self.RIDE_URL, wait_until="domcontentloaded")
+            await self.waits.visible("uber.ride_entry_ready", self.page.locator(self.PICKUP_INPUT_SELECTOR), timeout=self.config.TIMEOUT)
 
 
         if not is_existing_session:
@@ -87,19 +102,61 @@ class UberAutomation:
         self._update_status("running", "Entering ride details.")
         # await self.steps.click_ride_link_after_login()
         # await asyncio.sleep(5)
-        await self.steps.enter_pickup_location(pickup_location)
-        await asyncio.sleep(5)
-        await self.steps.enter_destination_location(destination_location)
-        await asyncio.sleep(5)
-        await self.steps.click_see_prices_button()
-        await asyncio.sleep(5)
-
+        if self.config.UBER_NETWORK_EXTRACTION:
+            # Listen before the locations are entered; the fare request fires as soon as both are set.
+            self.steps.start_fare_capture()
+        self.waits.reset()
+
+        # Routes whose places were resolved before skip the autocomplete flow entirely.
+        deep_link = None
+        if self.config.UBER_DEEP_LINKS:
+            deep_link = uber_places.deep_link(self.config.UBER_DEEP_LINK_URL, pickup_location, destination_location)
+
+        if deep_link and await self.steps.open_ride_deep_link(deep_link):
+            self.logger.info("Ride options loaded from deep link.")
+        else:
+            if deep_link:
+                self.logger.warning("Deep link did not load ride options; entering the locations instead.")
+                await self.page.goto(self.RIDE_URL, wait_until="domcontentloaded")
+            await self.llm.run_with_recovery(
+                self.page, "enter_route", lambda: self._enter_route(pickup_location, destination_location)
+            )
+            await self.steps.remember_route_places(pickup_location, destination_location)
 
         self._update_status("running", "Extracting ride options.")
         extracted_data = await self.steps.extract_uber_rides_to_json()
         self.ride_data = extracted_data if extracted_data else []
+        self.waits.log_summary("uber.search_rides")
         return self.ride_data
 
+    async def _enter_route(self, pickup_location: str, destination_location: str):
+        await self.steps.enter_pickup_location(pickup_location)
+        await self.steps.enter_destination_location(destination_location)
+        await self.steps.click_see_prices_button()
+
+    def watch_fares(self, poll_interval: float = 30.0) -> FareWatch:
+        """
+        Watch mode: keep this page on the results screen and push fare deltas to subscribers.
+        Call after search_rides; start() the returned watch and stop() it before reusing the automation.
+        """
+        return FareWatch(
+            self,
+            self.steps.read_ride_options,
+            key="product_id",
+            card_selector=UBER_RIDE_CARD.card,
+            poll_interval=poll_interval,
+            is_fare_response=is_fare_response,
+        )
+
+    async def reset(self):
+        """Returns the page to an empty pickup-entry screen so the automation can serve another search."""
+        self.ride_data = None
+        self.steps.stop_fare_capture()
+        await self.page.goto(self.RIDE_URL, wait_until="domcontentloaded")
+        pickup_input = self.page.locator(self.PICKUP_INPUT_SELECTOR)
+        await pickup_input.wait_for(state="visible", timeout=self.config.TIMEOUT)
+        self._update_status("ready", "Parked on the ride entry screen.")
+
     async def book_ride(self, ride_details: Dict[str, Any]):
         """Selects a specific ride from the list and clicks the final request button."""
         # The API passes the full ride object. We use it directly.
@@ -125,14 +182,15 @@ class UberAutomation:
             self._update_status("completed", "Job finished.")
 
         if self.context:
+            if self.uses_snapshot:
+                # Keep the in-memory snapshot current with any cookies refreshed during this run.
+                try:
+                    await session_snapshots.refresh_from(self.PLATFORM, self.session_name, self.context)
+                except Exception as e:
+                    self.logger.warning(f"Could not refresh session snapshot: {e}")
             await self.context.close()
         if self.playwright:
             await self.playwright.stop()
             self.logger.info("[Playwright stopped.")
 
-        # --- Clean up the temporary session directory if it was used ---
-        if self.temp_user_data_dir and os.path.exists(self.temp_user_data_dir):
-            self.logger.info(f"Removing temporary session directory: {self.temp_user_data_dir}")
-            shutil.rmtree(self.temp_user_data_dir)
-
         self.logger.info(f"✅  Automation finished.")
@@ -0,0 +1,72 @@
+import json
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from app.agents.ride_booking.config import Config
+from app.agents.ride_booking.utills.common import normalize_location
+from app.agents.ride_booking.utills.json_store import JsonFileStore
+from app.agents.ride_booking.utills.logger import setup_logger
+
+logger = setup_logger()
+
+# Query parameters of the product-selection URL that carry the resolved places.
+PICKUP_PARAM = "pickup"
+DROP_PARAM = "drop[0]"
+
+
+class UberPlaceCache:
+    """
+    Maps location text as users type it to the place objects Uber resolved it to.
+
+    After a typed search the Uber web app lands on a product-selection URL whose
+    ``pickup`` and ``drop[0]`` parameters hold the chosen places as JSON (id,
+    provider, coordinates, address lines). Those objects are remembered per
+    normalized input. Once both ends of a route are known, the search opens the
+    deep link directly and skips the autocomplete flow. The cache is kept in a
+    JSON file next to the session profiles (see JsonFileStore) so it survives
+    restarts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._store = JsonFileStore(path, "Uber place cache")
+        self._places: Dict[str, Dict[str, Any]] = self._store.load()
+
+    def get(self, location: str) -> Optional[Dict[str, Any]]:
+        return self._places.get(normalize_location(location))
+
+    async def learn_from_url(self, url: str, pickup_location: str, destination_location: str) -> bool:
+        """Record the places encoded in a product-selection URL. Returns True if both were found."""
+        params = parse_qs(urlparse(url).query)
+        learned = {}
+        for param, location in ((PICKUP_PARAM, pickup_location), (DROP_PARAM, destination_location)):
+            try:
+                place = json.loads(params[param][0])
+            except (KeyError, IndexError, ValueError):
+                continue
+            if isinstance(place, dict) and (place.get("id") or ("latitude" in place and "longitude" in place)):
+                learned[location] = place
+
+        if len(learned) < 2:
+            return False
+        for location, place in learned.items():
+            self._places[normalize_location(location)] = place
+        await self._store.save(self._places)
+        logger.info(f"Learned Uber places for '{pickup_location}' and '{destination_location}'.")
+        return True
+
+    def deep_link(self, base_url: str, pickup_location: str, destination_location: str) -> Optional[str]:
+        """Product-selection URL with both places pre-filled, or None if either place is unknown."""
+        pickup = self.get(pickup_location)
+        drop = self.get(destination_location)
+        if not pickup or not drop:
+            return None
+        query = urlencode({
+            PICKUP_PARAM: json.dumps(pickup, separators=(",", ":")),
+            DROP_PARAM: json.dumps(drop, separators=(",", ":")),
+        })
+        return f"{base_url}?{query}"
+
+
+# Process-wide place cache shared by every Uber automation.
+uber_places = UberPlaceCache(Config.UBER_PLACE_CACHE_PATH)
@@ -1,4 +1,17 @@
 import os
+import re
+import unicodedata
+
+
+def normalize_location(location: str) -> str:
+    """
+    Canonical form of a typed location, so trivially different spellings of the
+    same place share a cache entry: 'MG Road,  Bengaluru.' -> 'mg road bengaluru'.
+    """
+    text = unicodedata.normalize("NFKC", location).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
 
 def select_session(sessions_dir: str, platform_name: str, profile_prefix: str) -> str:
     """
@@ -0,0 +1,55 @@
+import asyncio
+import json
+import os
+import threading
+from typing import Any, Dict
+
+from app.agents.ride_booking.utills.logger import setup_logger
+
+logger = setup_logger()
+
+
+class JsonFileStore:
+    """
+    A dict persisted as one JSON file, for the small caches kept next to the
+    session profiles.
+
+    ``save`` serializes on the event loop, so the caller's dict is never read
+    while it changes, and writes the file on a worker thread through a temp
+    file and ``os.replace``. When saves overlap, an older snapshot never
+    overwrites a newer one.
+    """
+
+    def __init__(self, path: str, label: str):
+        self.path = path
+        self.label = label
+        self._lock = threading.Lock()
+        self._version = 0
+        self._written = 0
+
+    def load(self) -> Dict[str, Any]:
+        """The stored dict; empty when the file is missing or unreadable."""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {self.label} at {self.path}: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    async def save(self, data: Dict[str, Any]):
+        self._version += 1
+        await asyncio.to_thread(self._write, self._version, json.dumps(data, ensure_ascii=False, indent=2))
+
+    def _write(self, version: int, payload: str):
+        with self._lock:
+            if version < self._written:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+            self._written = version
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import BrowserContext, Playwright
+
+from app.agents.ride_booking.config import Config
+from app.agents.ride_booking.utills.logger import setup_logger
+
+logger = setup_logger()
+
+# Profile sub-directories that carry no login state. They make up the bulk of a
+# Chromium profile on disk, so they are skipped when the profile is staged for
+# snapshot extraction.
+PROFILE_IGNORE_PATTERNS = (
+    "Cache",
+    "Code Cache",
+    "GPUCache",
+    "DawnCache",
+    "DawnGraphiteCache",
+    "DawnWebGPUCache",
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+    "Service Worker",
+    "optimization_guide_*",
+    "Safe Browsing*",
+    "component_crx_cache",
+    "BrowserMetrics*",
+    "Crashpad",
+    "Singleton*",
+)
+
+# Copies every captured sessionStorage entry for the current origin back into
+# sessionStorage before any page script runs.
+_SESSION_STORAGE_INIT_SCRIPT = """
+(() => {
+    const entries = %s[window.location.origin];
+    if (!entries) return;
+    for (const [key, value] of Object.entries(entries)) {
+        if (window.sessionStorage.getItem(key) === null) {
+            window.sessionStorage.setItem(key, value);
+        }
+    }
+})();
+"""
+
+
+@dataclass
+class SessionSnapshot:
+    """
+    Login state captured from a Chromium profile: cookies, localStorage and
+    sessionStorage. It can be loaded into a new context on any browser.
+    """
+    cookies: List[Dict[str, Any]] = field(default_factory=list)
+    origins: List[Dict[str, Any]] = field(default_factory=list)
+    session_storage: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    captured_at: float = field(default_factory=time.time)
+
+    def storage_state(self) -> Dict[str, Any]:
+        """Return the snapshot in Playwright's ``storage_state`` format."""
+        return {"cookies": self.cookies, "origins": self.origins}
+
+    async def apply_to(self, context: BrowserContext):
+        """Install the captured sessionStorage on ``context`` (cookies and localStorage go in via ``storage_state``)."""
+        if self.session_storage:
+            await context.add_init_script(_SESSION_STORAGE_INIT_SCRIPT % json.dumps(self.session_storage))
+
+
+class SessionSnapshotStore:
+    """
+    In-memory cache of SessionSnapshots keyed by ``(platform, session_name)``.
+
+    A snapshot is extracted once per profile: the profile is staged without its
+    caches, opened headlessly, the platform's page is loaded so its storage is
+    readable, and the state is read back. Later lookups are served from memory.
+    """
+
+    def __init__(self, sessions_dir: str):
+        self.sessions_dir = sessions_dir
+        self._snapshots: Dict[Tuple[str, str], SessionSnapshot] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    def profile_dir(self, platform: str, session_name: str) -> str:
+        return os.path.join(self.sessions_dir, f"{platform}_profile_{session_name}")
+
+    def has_profile(self, platform: str, session_name: Optional[str]) -> bool:
+        return bool(session_name) and os.path.exists(self.profile_dir(platform, session_name))
+
+    async def refresh_from(self, platform: str, session_name: str, context: BrowserContext):
+        """Replace the cached cookies/localStorage with the live state of ``context``."""
+        key = (platform, session_name)
+        previous = self._snapshots.get(key)
+        state = await context.storage_state()
+        self._snapshots[key] = SessionSnapshot(
+            cookies=state.get("cookies", []),
+            origins=state.get("origins", []),
+            session_storage=previous.session_storage if previous else {},
+        )
+
+    async def get(
+        self,
+        playwright: Playwright,
+        platform: str,
+        session_name: str,
+        warm_url: str,
+    ) -> SessionSnapshot:
+        """Return the cached snapshot for a profile, extracting it on first use."""
+        key = (platform, session_name)
+        if key in self._snapshots:
+            return self._snapshots[key]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self._snapshots:
+                self._snapshots[key] = await self._extract(playwright, platform, session_name, warm_url)
+        return self._snapshots[key]
+
+    async def _extract(
+        self,
+        playwright: Playwright,
+        platform: str,
+        session_name: str,
+        warm_url: str,
+    ) -> SessionSnapshot:
+        original_dir = self.profile_dir(platform, session_name)
+        staging_dir = tempfile.mkdtemp()
+        user_data_dir = os.path.join(staging_dir, os.path.basename(original_dir))
+        started = time.perf_counter()
+
+        try:
+            # Stage the profile without caches; the original stays untouched.
+            await asyncio.to_thread(
+                shutil.copytree,
+                original_dir,
+                user_data_dir,
+                ignore=shutil.ignore_patterns(*PROFILE_IGNORE_PATTERNS),
+            )
+
+            context = await playwright.chromium.launch_persistent_context(
+                user_data_dir=user_data_dir,
+                headless=True,
+                locale='en-IN',
+                timezone_id='Asia/Kolkata',
+            )
+            try:
+                page = context.pages[0] if context.pages else await context.new_page()
+                await page.goto(warm_url, wait_until="domcontentloaded")
+                state = await context.storage_state()
+                session_items = await page.evaluate(
+                    "() => Object.fromEntries(Object.entries(window.sessionStorage))"
+                )
+                origin = await page.evaluate("() => window.location.origin")
+            finally:
+                await context.close()
+        finally:
+            await asyncio.to_thread(shutil.rmtree, staging_dir, True)
+
+        snapshot = SessionSnapshot(
+            cookies=state.get("cookies", []),
+            origins=state.get("origins", []),
+            session_storage={origin: session_items} if session_items else {},
+        )
+        logger.info(
+            f"Extracted {platform} session snapshot '{session_name}' "
+            f"({len(snapshot.cookies)} cookies, {len(snapshot.origins)} origins) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return snapshot
+
+
+# Process-wide store shared by every ride-booking automation.
+session_snapshots = SessionSnapshotStore(Config.SESSIONS_DIR)
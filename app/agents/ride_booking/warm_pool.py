@@ -0,0 +1,127 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Type
+
+from app.agents.ride_booking.config import Config
+from app.agents.ride_booking.platforms import RIDE_PLATFORMS
+from app.agents.ride_booking.utills.logger import setup_logger
+
+logger = setup_logger()
+
+
+class WarmAutomationPool:
+    """
+    Standby pool of initialized automations for one platform and session.
+
+    Idle automations are already logged in and parked on the ride entry screen.
+    A search leases one, runs ``search_rides`` on it, and releases it; release
+    resets the page and parks it again. When the pool is empty a cold automation
+    is created instead of waiting, and surplus automations are stopped on release.
+    """
+
+    def __init__(self, automation_cls: Type[Any], session_name: Optional[str], size: int = 1):
+        self.automation_cls = automation_cls
+        self.session_name = session_name
+        self.size = max(0, size)
+        self._idle: asyncio.Queue = asyncio.Queue()
+
+    @property
+    def name(self) -> str:
+        return f"{self.automation_cls.PLATFORM}:{self.session_name}"
+
+    @property
+    def idle_count(self) -> int:
+        return self._idle.qsize()
+
+    async def _create(self):
+        automation = self.automation_cls()
+        try:
+            await automation.initialize(self.session_name)
+        except Exception:
+            await automation.stop()
+            raise
+        return automation
+
+    async def fill(self):
+        """Initialize automations concurrently until ``size`` are parked."""
+        missing = self.size - self._idle.qsize()
+        if missing <= 0:
+            return
+        logger.info(f"Warming {missing} automation(s) for {self.name}")
+        results = await asyncio.gather(*(self._create() for _ in range(missing)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Failed to warm automation for {self.name}: {result}")
+            else:
+                self._idle.put_nowait(result)
+
+    async def acquire(self):
+        """Return a parked automation, or a freshly initialized one if none is idle."""
+        while not self._idle.empty():
+            automation = self._idle.get_nowait()
+            if automation.page and not automation.page.is_closed():
+                return automation
+            logger.warning(f"Discarding dead standby automation for {self.name}")
+            await automation.stop()
+
+        logger.info(f"No warm automation available for {self.name}; starting a cold one.")
+        return await self._create()
+
+    async def release(self, automation, reusable: bool = True):
+        """Reset and park ``automation``, or stop it if the pool is full or the reset fails."""
+        if reusable and self._idle.qsize() < self.size:
+            try:
+                await automation.reset()
+                self._idle.put_nowait(automation)
+                return
+            except Exception as e:
+                logger.warning(f"Could not reset automation for {self.name}, stopping it: {e}")
+        await automation.stop()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Any]:
+        automation = await self.acquire()
+        reusable = True
+        try:
+            yield automation
+        except Exception:
+            reusable = False
+            raise
+        finally:
+            await self.release(automation, reusable=reusable)
+
+    async def stop(self):
+        while not self._idle.empty():
+            await self._idle.get_nowait().stop()
+
+
+class WarmPoolRegistry:
+    """Process-wide map of ``(platform, session_name)`` to its WarmAutomationPool."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._pools: Dict[Tuple[str, Optional[str]], WarmAutomationPool] = {}
+
+    def pool_for(self, automation_cls: Type[Any], session_name: Optional[str]) -> WarmAutomationPool:
+        key = (automation_cls.PLATFORM, session_name)
+        if key not in self._pools:
+            self._pools[key] = WarmAutomationPool(automation_cls, session_name, self.size)
+        return self._pools[key]
+
+    async def warm_configured(self):
+        """Fill the pools for the sessions named in Config (used at app startup)."""
+        await asyncio.gather(*(
+            self.pool_for(platform.automation_cls, platform.warm_session).fill()
+            for platform in RIDE_PLATFORMS.values()
+            if platform.warm_session
+        ))
+
+    def stats(self) -> Dict[str, int]:
+        return {pool.name: pool.idle_count for pool in self._pools.values()}
+
+    async def stop_all(self):
+        await asyncio.gather(*(pool.stop() for pool in self._pools.values()), return_exceptions=True)
+        self._pools.clear()
+
+
+ride_pools = WarmPoolRegistry(Config.WARM_POOL_SIZE)
@@ -9,11 +9,21 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 
 from app.prompts.zepto_prompts.zepto_prompts import find_best_match
+from app.browser.extraction import CardSpec, Field, extract_cards, parse_price
 
 # Headless-friendly browser settings (align with API usage)
 DESKTOP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
 DEFAULT_VIEWPORT = {"width": 1366, "height": 768}
 DEFAULT_GEOLOCATION = {"latitude": 19.0760, "longitude": 72.8777}
+# Search result cards, read in a single evaluate; only cards with a rendered name and price count.
+ZEPTO_PRODUCT_CARD = CardSpec(
+    card='a.B4vNQ',
+    fields={
+        "name": Field('div[data-slot-id="ProductName"] span', visible=True),
+        "price": Field('div[data-slot-id="EdlpPrice"] span', visible=True, parse=parse_price),
+    },
+)
+
 HEADLESS_ARGS = [
     "--disable-blink-features=AutomationControlled",
     "--disable-dev-shm-usage",
@@ -56,27 +66,12 @@ async def search_and_add_item(page, item_name: str, quantity: int):
         return
 
     product_locator = page.locator(product_card_selector)
-    count = await product_locator.count()
-    scraped_products = []
-    analyze_count = min(count, 10)
-    print(f"- Found {count} products. Analyzing top {analyze_count}.")
-
-    for i in range(analyze_count):
-        card = product_locator.nth(i)
-        try:
-            name_elem = card.locator('div[data-slot-id="ProductName"] span').first
-            price_elem = card.locator('div[data-slot-id="EdlpPrice"] span').first
-            
-            if not await name_elem.is_visible(timeout=1000) or not await price_elem.is_visible(timeout=1000):
-                continue
-            
-            name = (await name_elem.text_content(timeout=2000)).strip()
-            price_text = (await price_elem.text_content(timeout=2000)).strip()
-            price = float(re.sub(r'[^\d.]', '', price_text))
-            
-            scraped_products.append({'name': name, 'price': price, 'card': card})
-        except Exception as e:
-            continue 
+    cards = await extract_cards(page, ZEPTO_PRODUCT_CARD, limit=10)
+    print(f"- Scraped {len(cards)} of the top 10 products.")
+    scraped_products = [
+        {'name': card['name'], 'price': card['price'], 'card': product_locator.nth(card['index'])}
+        for card in cards
+    ]
 
     if not scraped_products:
         print(f"⚠️ Could not scrape product details for '{item_name}'. Skipping.")
@@ -152,22 +147,8 @@ async def search_products_zepto(page, query: str, max_items: int = 20):
             print("⚠️ No product cards rendered for Zepto search even after retry.")
             return []
 
-    product_locator = page.locator(product_card_selector)
-    count = await product_locator.count()
-    scraped = []
-    for i in range(min(count, max_items)):
-        card = product_locator.nth(i)
-        try:
-            name_elem = card.locator('div[data-slot-id="ProductName"] span').first
-            price_elem = card.locator('div[data-slot-id="EdlpPrice"] span').first
-            if not await name_elem.is_visible(timeout=1000) or not await price_elem.is_visible(timeout=1000):
-                continue
-            name = (await name_elem.text_content(timeout=2000)).strip()
-            price_text = (await price_elem.text_content(timeout=2000)).strip()
-            price = float(re.sub(r'[^\d.]', '', price_text))
-            scraped.append({"name": name, "price": price})
-        except Exception:
-            continue
+    cards = await extract_cards(page, ZEPTO_PRODUCT_CARD, limit=max_items)
+    scraped = [{"name": card["name"], "price": card["price"]} for card in cards]
     if not scraped:
         print("⚠️ Scraper could not extract product name/price despite cards being present. Check selectors.")
     return scraped
@@ -932,14 +913,14 @@ async def automate_zepto(shopping_list: dict, location: str, mobile_number: str,
         await browser.close()
         print("\nBrowser closed. Script finished.")
 
-async def login_zepto(mobile_number: str, location: str, playwright):
+async def login_zepto(mobile_number: str, location: str, browser_pool):
     """
-    Launches Playwright, navigates to Zepto, sets location, and performs login.
-    Returns the browser and page objects to continue the session.
+    Leases a context from the shared browser pool, navigates to Zepto, sets location,
+    and performs login. Returns the context and page objects to continue the session.
     """
     print("\nStarting browser automation with Playwright for Zepto Login...")
-    browser = await playwright.chromium.launch(headless=True, slow_mo=50, args=HEADLESS_ARGS)
-    context = await browser.new_context(
+    context = await browser_pool.new_context(
+        headless=True,
         viewport=DEFAULT_VIEWPORT,
         user_agent=DESKTOP_USER_AGENT,
         locale="en-US",
@@ -947,7 +928,7 @@ async def login_zepto(mobile_number: str, location: str, playwright):
         geolocation=DEFAULT_GEOLOCATION,
         permissions=["geolocation"],
     )
-    context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined});")
+    await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined});")
     page = await context.new_page()
 
     try:
@@ -959,7 +940,7 @@ async def login_zepto(mobile_number: str, location: str, playwright):
         print(f"\n➡️ Setting location to '{location}'...")
         location_ok = await _select_location_from_search(page, location)
         if not location_ok:
-            await browser.close()
+            await context.close()
             raise RuntimeError("Unable to set Zepto location from search dialog.")
         await page.wait_for_load_state('networkidle')
 
@@ -986,7 +967,7 @@ async def login_zepto(mobile_number: str, location: str, playwright):
             await page.wait_for_timeout(1000)
         except Exception as e:
             print(f"❌ Error entering phone number: {e}")
-            await browser.close()
+            await context.close()
             raise
 
         print("\n➡️ Clicking 'Continue' button...")
@@ -1002,12 +983,12 @@ async def login_zepto(mobile_number: str, location: str, playwright):
         print("✅ Continue button clicked successfully.")
 
         print("\n✅ Login initiated. Browser is waiting for OTP.")
-        return browser, page
+        return context, page
 
     except Exception as e:
         print(f"❌ An unexpected error occurred: {e}")
-        await browser.close()
-        print("\nBrowser closed due to error.")
+        await context.close()
+        print("\nBrowser context closed due to error.")
         raise
 
 async def enter_otp_zepto(page, otp: str):
@@ -0,0 +1,18 @@
+from app.browser.digest import build_dom_digest, capture_dom_snapshot, format_digest
+from app.browser.extraction import CardSpec, Field, extract_cards, parse_price
+from app.browser.pool import BrowserPool, browser_pool
+from app.browser.waits import WaitEngine, WaitTimeout
+
+__all__ = [
+    "BrowserPool",
+    "browser_pool",
+    "build_dom_digest",
+    "capture_dom_snapshot",
+    "format_digest",
+    "CardSpec",
+    "Field",
+    "extract_cards",
+    "parse_price",
+    "WaitEngine",
+    "WaitTimeout",
+]
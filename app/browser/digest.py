@@ -0,0 +1,109 @@
+from typing import Any, Dict, List
+
+from playwright.async_api import Page
+
+# Elements a user (or an LLM-suggested selector) can act on.
+INTERACTIVE_SELECTOR = ", ".join([
+    "a[href]", "button", "input", "select", "textarea", "summary",
+    "[role=button]", "[role=link]", "[role=tab]", "[role=option]", "[role=menuitem]",
+    "[role=checkbox]", "[role=radio]", "[role=combobox]", "[role=textbox]",
+    "[data-testid]", "[onclick]", "[tabindex]:not([tabindex='-1'])",
+])
+
+# One pass over the interactive elements of the live DOM. Invisible nodes are
+# skipped, each kept node is reduced to the attributes selectors are built
+# from plus a short text (its first text nodes, not the whole subtree),
+# duplicates are dropped, and collection stops once the serialized digest
+# would exceed `maxChars`.
+_DIGEST_JS = """
+([selector, maxChars, maxText]) => {
+    const clean = (value, limit) => (value || '').replace(/\\s+/g, ' ').trim().slice(0, limit);
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+    };
+    // Leading text of an element, read node by node and stopped once `limit`
+    // characters are collected, so large wrappers cost no more than small ones.
+    const leadingText = (el, limit) => {
+        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        let text = '';
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            const parent = node.parentElement;
+            if (parent && /^(SCRIPT|STYLE|NOSCRIPT|TEMPLATE)$/.test(parent.tagName)) continue;
+            const part = clean(node.nodeValue.slice(0, 4 * limit), limit);
+            if (!part) continue;
+            text = text ? `${text} ${part}` : part;
+            if (text.length >= limit) break;
+        }
+        return text.slice(0, limit);
+    };
+    const seen = new Set();
+    const items = [];
+    let used = 0;
+    for (const el of document.querySelectorAll(selector)) {
+        if (!visible(el)) continue;
+        const tag = el.tagName.toLowerCase();
+        const item = { tag };
+        const attrs = {
+            testid: el.getAttribute('data-testid'),
+            aria: el.getAttribute('aria-label'),
+            role: el.getAttribute('role'),
+            name: el.getAttribute('name'),
+            type: el.getAttribute('type'),
+            placeholder: el.getAttribute('placeholder'),
+            id: el.id,
+            href: tag === 'a' ? el.getAttribute('href') : null,
+        };
+        for (const [key, value] of Object.entries(attrs)) {
+            if (value) item[key] = clean(value, 80);
+        }
+        const text = leadingText(el, maxText) || clean(el.value, maxText);
+        if (text) item.text = text;
+        if (el.disabled) item.disabled = true;
+
+        const signature = JSON.stringify(item);
+        if (seen.has(signature)) continue;
+        seen.add(signature);
+        used += signature.length;
+        if (used > maxChars) break;
+        items.push(item);
+    }
+    return items;
+}
+"""
+
+# Attributes that identify an element's role in the page, as opposed to its content.
+STRUCTURAL_KEYS = ("tag", "testid", "role", "name", "type", "id")
+
+
+async def build_dom_digest(page: Page, max_chars: int = 6000, max_text: int = 60) -> List[Dict[str, Any]]:
+    """Visible interactive elements of ``page`` as compact dicts, capped at roughly ``max_chars`` of JSON."""
+    return await page.evaluate(_DIGEST_JS, [INTERACTIVE_SELECTOR, max_chars, max_text])
+
+
+def format_digest(items: List[Dict[str, Any]]) -> str:
+    """One line per element, e.g. ``button testid=confirm aria="Confirm pickup" "Confirm"``."""
+    lines = []
+    for item in items:
+        parts = [item["tag"]]
+        for key in ("testid", "id", "name", "type", "role", "aria", "placeholder", "href"):
+            value = item.get(key)
+            if value:
+                parts.append(f'{key}="{value}"' if " " in value else f"{key}={value}")
+        if item.get("disabled"):
+            parts.append("disabled")
+        if item.get("text"):
+            parts.append(f'"{item["text"]}"')
+        lines.append(" ".join(parts))
+    return "\n".join(lines)
+
+
+async def capture_dom_snapshot(page: Page, max_chars: int = 6000) -> Dict[str, Any]:
+    """Title, URL and interactive-element digest of ``page``: the snapshot the LLM assistant prompts with."""
+    return {
+        "title": await page.title(),
+        "url": page.url,
+        "elements": await build_dom_digest(page, max_chars=max_chars),
+    }
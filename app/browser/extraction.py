@@ -0,0 +1,122 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Runs entirely in the page: finds every card, reads each declared field from
+# it and returns plain rows, so a whole result list costs one CDP round trip
+# instead of one per card and field.
+_EXTRACT_CARDS_JS = """
+(spec) => {
+    const isVisible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const readField = (card, f) => {
+        let candidates = f.selector ? Array.from(card.querySelectorAll(f.selector)) : [card];
+        if (f.has_text) {
+            candidates = candidates.filter((el) => (el.textContent || '').includes(f.has_text));
+            // Keep the innermost matches only, so a wrapper div does not win over the price itself.
+            candidates = candidates.filter((el) => !candidates.some((other) => other !== el && el.contains(other)));
+        }
+        if (f.visible) candidates = candidates.filter(isVisible);
+        const el = candidates[0];
+        if (!el) return null;
+        let value;
+        if (f.attr) value = el.getAttribute(f.attr);
+        else value = f.inner_text ? el.innerText : el.textContent;
+        if (value === null || value === undefined) return null;
+        value = value.replace(/\\s+/g, ' ').trim();
+        return value === '' ? null : value;
+    };
+
+    const cards = Array.from(document.querySelectorAll(spec.card));
+    const limit = spec.limit === null ? cards.length : Math.min(spec.limit, cards.length);
+    const rows = [];
+    for (let i = 0; i < limit; i++) {
+        const row = { index: i };
+        let complete = true;
+        for (const f of spec.fields) {
+            const value = readField(cards[i], f);
+            if (value === null && f.required) { complete = false; break; }
+            row[f.name] = value;
+        }
+        if (complete) rows.push(row);
+    }
+    return { total: cards.length, rows: rows };
+}
+"""
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    One value read from inside a card.
+
+    ``selector`` is resolved relative to the card (``None`` means the card
+    itself). Text is read unless ``attr`` names an attribute. ``has_text`` keeps
+    only the innermost matches containing that text, like Playwright's
+    ``:has-text``. ``parse`` runs in Python on the raw string; if it raises, the
+    row is dropped, mirroring the old per-card ``try/except continue``.
+    """
+    selector: Optional[str] = None
+    attr: Optional[str] = None
+    has_text: Optional[str] = None
+    visible: bool = False
+    required: bool = True
+    inner_text: bool = False
+    parse: Optional[Callable[[str], Any]] = None
+    default: Any = None
+
+
+@dataclass(frozen=True)
+class CardSpec:
+    """A card selector plus the fields to read from each card, in output order."""
+    card: str
+    fields: Dict[str, Field] = field(default_factory=dict)
+
+    def compile(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Return the JSON-serializable argument for the in-page extraction function."""
+        return {
+            "card": self.card,
+            "limit": limit,
+            "fields": [
+                {
+                    "name": name,
+                    "selector": f.selector,
+                    "attr": f.attr,
+                    "has_text": f.has_text,
+                    "visible": f.visible,
+                    "required": f.required,
+                    "inner_text": f.inner_text,
+                }
+                for name, f in self.fields.items()
+            ],
+        }
+
+
+def parse_price(text: str) -> float:
+    """'₹1,249.00' -> 1249.0. Raises ValueError when the text holds no number."""
+    return float(re.sub(r'[^\d.]', '', text))
+
+
+async def extract_cards(page, spec: CardSpec, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Extract every card matching ``spec`` in a single ``page.evaluate`` call.
+
+    Each row holds the declared fields plus ``index``, the card's position among
+    all matches, so callers can still act on it with ``page.locator(spec.card).nth(index)``.
+    ``page`` may be a Page or a Frame.
+    """
+    result = await page.evaluate(_EXTRACT_CARDS_JS, spec.compile(limit))
+
+    rows = []
+    for raw in result["rows"]:
+        row = {"index": raw["index"]}
+        try:
+            for name, f in spec.fields.items():
+                value = raw.get(name)
+                if value is None:
+                    row[name] = f.default
+                else:
+                    row[name] = f.parse(value) if f.parse else value
+        except (TypeError, ValueError):
+            continue
+        rows.append(row)
+    return rows
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+logger = logging.getLogger(__name__)
+
+# Launch flags shared by every pooled browser. Per-vendor tweaks (user agent,
+# viewport, geolocation, storage_state) belong on the context, not the browser.
+DEFAULT_LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+]
+
+
+class BrowserPool:
+    """
+    One long-lived Playwright driver plus a small pool of Chromium browsers.
+
+    Routers lease fresh ``BrowserContext`` objects (carrying whatever
+    ``storage_state`` they need) instead of starting their own driver and
+    browser, so a request only pays for context creation.
+
+    Headed and headless browsers are pooled separately because the mode is a
+    launch option. Browsers are launched lazily, up to ``size`` per mode, and
+    contexts are placed on the least loaded one.
+    """
+
+    def __init__(self, size: int = 2, launch_args: Optional[List[str]] = None):
+        self.size = max(1, size)
+        self.launch_args = launch_args or DEFAULT_LAUNCH_ARGS
+        self.playwright: Optional[Playwright] = None
+        self._browsers: Dict[bool, List[Browser]] = {True: [], False: []}
+        self._lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self.playwright is not None
+
+    async def start(self):
+        """Start the shared Playwright driver (idempotent)."""
+        if self.playwright is not None:
+            return
+        async with self._lock:
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+                logger.info(f"Browser pool started (size={self.size} per mode)")
+
+    async def stop(self):
+        """Close every pooled browser and stop the driver."""
+        async with self._lock:
+            for browsers in self._browsers.values():
+                for browser in browsers:
+                    try:
+                        await browser.close()
+                    except Exception as e:
+                        logger.debug(f"Error closing pooled browser: {e}")
+                browsers.clear()
+
+            if self.playwright is not None:
+                await self.playwright.stop()
+                self.playwright = None
+                logger.info("Browser pool stopped")
+
+    async def _get_browser(self, headless: bool) -> Browser:
+        """Return the least loaded browser for ``headless``, launching one if needed."""
+        await self.start()
+        async with self._lock:
+            browsers = self._browsers[headless]
+            # Drop browsers that crashed or were closed behind our back.
+            browsers[:] = [b for b in browsers if b.is_connected()]
+
+            all_busy = all(len(b.contexts) > 0 for b in browsers)
+            if len(browsers) < self.size and all_busy:
+                browser = await self.playwright.chromium.launch(
+                    headless=headless,
+                    args=self.launch_args,
+                )
+                browsers.append(browser)
+                logger.info(f"Launched pooled browser #{len(browsers)} (headless={headless})")
+
+            return min(browsers, key=lambda b: len(b.contexts))
+
+    async def new_context(self, headless: bool = True, **context_kwargs: Any) -> BrowserContext:
+        """
+        Create a new context on a pooled browser. The caller owns the context
+        and must close it; the browser itself stays in the pool.
+        """
+        browser = await self._get_browser(headless)
+        return await browser.new_context(**context_kwargs)
+
+    @asynccontextmanager
+    async def lease_context(self, headless: bool = True, **context_kwargs: Any) -> AsyncIterator[BrowserContext]:
+        """Context manager variant of ``new_context`` that always closes the context."""
+        context = await self.new_context(headless=headless, **context_kwargs)
+        try:
+            yield context
+        finally:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"Error closing leased context: {e}")
+
+
+# Process-wide pool. Started and stopped by the FastAPI lifespan in api/main.py;
+# it also starts lazily on first use so scripts can share it without a lifespan.
+browser_pool = BrowserPool(size=int(os.getenv("BROWSER_POOL_SIZE", "2")))
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Resolves once `selector` has seen no DOM mutation for `quiet` ms (or `timeout`
+# ms have passed). Returns true when the subtree actually went quiet.
+_DOM_SETTLED_JS = """
+([selector, quiet, timeout]) => new Promise((resolve) => {
+    const root = (selector && document.querySelector(selector)) || document.body;
+    let quietTimer = null;
+    const finish = (settled) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(deadline);
+        resolve(settled);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quiet);
+    });
+    observer.observe(root, { childList: true, subtree: true, attributes: true, characterData: true });
+    quietTimer = setTimeout(() => finish(true), quiet);
+    const deadline = setTimeout(() => finish(false), timeout);
+})
+"""
+
+
+class WaitTimeout(Exception):
+    """Raised by a ``required`` wait whose condition did not hold within its bound."""
+
+
+@dataclass
+class WaitTiming:
+    name: str
+    elapsed_ms: int
+    timeout_ms: int
+    satisfied: bool
+
+
+class WaitEngine:
+    """
+    Condition-based replacement for fixed ``asyncio.sleep`` calls.
+
+    Every wait names the readiness condition it is waiting for (suggestions
+    rendered, the DOM settled, a button enabled), returns as soon as it holds,
+    and gives up after its own upper bound. How long each wait actually took
+    is recorded so slow steps show up in the logs.
+
+    A wait that times out returns ``False`` and the flow carries on, as it did
+    after a sleep; pass ``required=True`` to raise ``WaitTimeout`` instead.
+    """
+
+    def __init__(self, page: Page, log: Optional[logging.Logger] = None):
+        self.page = page
+        self.logger = log or logger
+        self.timings: List[WaitTiming] = []
+
+    def reset(self):
+        self.timings = []
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [asdict(t) for t in self.timings]
+
+    def log_summary(self, label: str = "waits"):
+        total = sum(t.elapsed_ms for t in self.timings)
+        steps = ", ".join(
+            f"{t.name}={t.elapsed_ms}ms" + ("" if t.satisfied else " (timed out)") for t in self.timings
+        )
+        self.logger.info(f"[{label}] {total}ms total across {len(self.timings)} waits: {steps}")
+
+    async def _timed(self, name: str, timeout_ms: int, required: bool, waiter: Awaitable[bool]) -> bool:
+        started = time.perf_counter()
+        try:
+            satisfied = bool(await waiter)
+        except (PlaywrightTimeoutError, asyncio.TimeoutError):
+            satisfied = False
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        self.timings.append(WaitTiming(name, elapsed_ms, timeout_ms, satisfied))
+
+        if satisfied:
+            self.logger.debug(f"Wait '{name}' satisfied after {elapsed_ms}ms")
+        else:
+            self.logger.warning(f"Wait '{name}' not satisfied within {timeout_ms}ms")
+            if required:
+                raise WaitTimeout(f"'{name}' not satisfied within {timeout_ms}ms")
+        return satisfied
+
+    # --- Conditions ---
+
+    async def visible(self, name: str, locator: Locator, timeout: int = 10000, required: bool = False) -> bool:
+        """Until ``locator`` (e.g. the first suggestion of a list) is visible."""
+        async def waiter():
+            await locator.wait_for(state="visible", timeout=timeout)
+            return True
+        return await self._timed(name, timeout, required, waiter())
+
+    async def enabled(self, name: str, locator: Locator, timeout: int = 10000, required: bool = False) -> bool:
+        """Until ``locator`` is visible and enabled; the three steps share one ``timeout`` budget."""
+        async def waiter():
+            deadline = time.monotonic() + timeout / 1000
+
+            def remaining() -> int:
+                # Never 0: Playwright reads a zero timeout as "wait forever".
+                return max(1, int((deadline - time.monotonic()) * 1000))
+
+            await locator.wait_for(state="visible", timeout=remaining())
+            handle = await locator.element_handle(timeout=remaining())
+            await handle.wait_for_element_state("enabled", timeout=remaining())
+            return True
+        return await self._timed(name, timeout, required, waiter())
+
+    async def dom_settled(
+        self,
+        name: str,
+        selector: Optional[str] = None,
+        quiet: int = 400,
+        timeout: int = 5000,
+        required: bool = False,
+    ) -> bool:
+        """Until the subtree under ``selector`` (default: body) has had no mutations for ``quiet`` ms."""
+        return await self._timed(
+            name, timeout, required, self.page.evaluate(_DOM_SETTLED_JS, [selector, quiet, timeout])
+        )
+
+    async def until(
+        self,
+        name: str,
+        predicate: Callable[[], Awaitable[bool]],
+        timeout: int = 10000,
+        interval: int = 100,
+        required: bool = False,
+    ) -> bool:
+        """Until the async ``predicate`` returns truthy, polling every ``interval`` ms."""
+        async def waiter():
+            deadline = time.monotonic() + timeout / 1000
+            while time.monotonic() < deadline:
+                try:
+                    if await predicate():
+                        return True
+                except Exception:
+                    pass
+                await asyncio.sleep(interval / 1000)
+            return False
+        return await self._timed(name, timeout, required, waiter())
@@ -4,11 +4,16 @@ import re
 import logging
 from datetime import datetime
 from typing import Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, astuple
 from enum import Enum
 
 # Crawl4AI imports
-from crawl4ai import AsyncWebCrawler, CacheMode
+from crawl4ai import CacheMode
+
+from app.tools.html_parsing import BACKENDS, HtmlBackend, HtmlNode, backend_by_name, default_backend
+from app.tools.crawler_pool import crawler_pool
+from app.tools.http_fetch import http_fetcher
+from app.tools.parse_pool import run_parse
 
 
 # Configure logging
@@ -46,6 +51,41 @@ class Product:
     scraped_at: str
 
 
+@dataclass
+class PageAnalysis:
+    """Everything read from one results page."""
+    products: list
+    next_page_url: Optional[str]
+    has_captcha: bool
+    total_results: Optional[int] = None
+    results_per_page: Optional[int] = None
+
+
+# Per-process scraper used by parse-pool workers (one per backend name).
+_worker_scrapers: dict = {}
+
+
+def _analyze_page_in_worker(html: str, page_num: int, backend: str) -> tuple:
+    """
+    Parse-pool entry point: analyze one page with a fresh ``seen_asins``.
+    
+    Returns ``(product rows, next_page_url, has_captcha, total_results,
+    results_per_page)`` with each product as a field tuple (see ``Product``),
+    which pickles far smaller than dataclass instances.
+    """
+    scraper = _worker_scrapers.get(backend)
+    if scraper is None:
+        scraper = _worker_scrapers[backend] = AmazonScraper(parser_backend=backend_by_name(backend))
+    analysis = scraper._analyze_page(html, page_num)
+    return (
+        [astuple(product) for product in analysis.products],
+        analysis.next_page_url,
+        analysis.has_captcha,
+        analysis.total_results,
+        analysis.results_per_page,
+    )
+
+
 class AmazonScraper:
     """
     Class-based Amazon.in product scraper using Crawl4AI.
@@ -60,11 +100,12 @@ class AmazonScraper:
         status: Current scraper status
     """
     
-    # Default user agents
+    # Default user agents: complete Chrome strings, matching the Chrome navigation
+    # headers the HTTP tier sends (see http_fetch.BROWSER_HEADERS).
     DEFAULT_USER_AGENTS = [
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
     ]
     
     # Default settings
@@ -72,6 +113,14 @@ class AmazonScraper:
     BASE_URL = "https://www.amazon.in/s?k={}"
     AMAZON_DOMAIN = "https://www.amazon.in"
     
+    # Robot-check detection: page title phrases and CAPTCHA form elements
+    CAPTCHA_TITLES = ('robot check', 'seems you are a bot')
+    CAPTCHA_SELECTOR = (
+        'form[action*="validateCaptcha"], #captchacharacters, .g-recaptcha, '
+        'img[src*="captcha"], img[src*="Captcha"]'
+    )
+    RESULT_INFO_SELECTOR = '[data-component-type="s-result-info-bar"] span, .s-breadcrumb span'
+    
     def __init__(
         self,
         max_pages: int = 3,
@@ -79,7 +128,12 @@ class AmazonScraper:
         headful: bool = False,
         proxies: Optional[list] = None,
         user_agents: Optional[list] = None,
-        throttle: float = 2.0
+        throttle: float = 2.0,
+        speculative: bool = False,
+        concurrency: int = 3,
+        parser_backend: Optional[HtmlBackend] = None,
+        http_first: bool = True,
+        storage_state: Optional[str | dict] = None
         ):
         """
         Initialize the AmazonScraper.
@@ -91,6 +145,12 @@ class AmazonScraper:
             proxies: List of proxy URLs (default: None)
             user_agents: Custom user agents (default: uses sensible defaults)
             throttle: Delay between requests in seconds (default: 2.0)
+            speculative: Fetch pages by URL (&page=N) concurrently instead of following
+                the next link one page at a time; page starts stay ``throttle`` apart (default: False)
+            concurrency: Pages in flight at once in speculative mode (default: 3)
+            parser_backend: HTML parser backend (default: fastest installed, see html_parsing)
+            http_first: Try each page over plain HTTP before rendering it in the browser (default: True)
+            storage_state: Playwright storage_state (path or dict) whose cookies the HTTP tier sends (default: None)
         """
         self.max_pages = max_pages
         self.max_items = max_items
@@ -98,6 +158,11 @@ class AmazonScraper:
         self.proxies = proxies or []
         self.user_agents = user_agents or self.DEFAULT_USER_AGENTS
         self.throttle = throttle
+        self.speculative = speculative
+        self.concurrency = max(1, concurrency)
+        self.parser_backend = parser_backend or default_backend()
+        self.http_first = http_first
+        self.storage_state = storage_state
         self.status = ScraperStatus.IDLE
         
         # State tracking
@@ -107,9 +172,13 @@ class AmazonScraper:
         self.pages_crawled = 0
         self.current_page = 1
         self.next_page_url = None
-        self.crawler = None
+        self.total_results = None
+        self.fetch_counts = {"http": 0, "browser": 0}
         
-        logger.info(f"AmazonScraper initialized with max_pages={max_pages}, throttle={throttle}s")
+        logger.info(
+            f"AmazonScraper initialized with max_pages={max_pages}, throttle={throttle}s, "
+            f"speculative={speculative}, concurrency={self.concurrency}"
+        )
     
     def reset(self):
         """Reset scraper state for a new search."""
@@ -119,6 +188,8 @@ class AmazonScraper:
         self.pages_crawled = 0
         self.current_page = 1
         self.next_page_url = None
+        self.total_results = None
+        self.fetch_counts = {"http": 0, "browser": 0}
         self.status = ScraperStatus.IDLE
         logger.info("Scraper state reset")
     
@@ -140,41 +211,94 @@ class AmazonScraper:
         match = re.search(r'/dp/([A-Z0-9]{10})', url)
         return match.group(1) if match else None
     
-    def _extract_products_from_html(self, html: str, page_num: int) -> tuple[list[Product], bool]:
+    def _analyze_page(self, html: str, page_num: int) -> PageAnalysis:
         """
-        Extract products from raw HTML using CSS selectors.
+        Analyze a results page in one parse: CAPTCHA verdict, products, the
+        next-page link and the total-results hint.
         
         Args:
             html: Raw HTML content
             page_num: Current page number
         
         Returns:
-            Tuple of (products list, has_captcha_detected)
+            PageAnalysis (no products or next link when a CAPTCHA was detected)
         """
-        from bs4 import BeautifulSoup
+        root = self.parser_backend.parse(html)
         
-        products = []
-        
-        # Check for CAPTCHA/verifier pages
-        captcha_indicators = [
-            'robot check',
-            'seems you are a bot',
-            'imgCaptcha',
-            'g-recaptcha'
-        ]
-        html_lower = html.lower()
-        has_captcha = any(indicator in html_lower for indicator in captcha_indicators)
-        
-        if has_captcha:
+        # CAPTCHA/robot-check pages are recognised by their title and form, not by scanning the document text
+        title = root.select_one('title')
+        title_text = title.text().lower() if title else ''
+        if (any(indicator in title_text for indicator in self.CAPTCHA_TITLES)
+                or root.select_one(self.CAPTCHA_SELECTOR)):
             logger.warning(f"CAPTCHA detected on page {page_num}")
-            return [], True
+            return PageAnalysis(products=[], next_page_url=None, has_captcha=True)
+        
+        next_link = root.select_one('li.a-last a') or root.select_one('a[aria-label="Next"]')
+        next_page_url = self.AMAZON_DOMAIN + next_link.attr('href') if next_link and next_link.attr('href') else None
+        
+        total_results, results_per_page = self._total_results_hint(root)
+        return PageAnalysis(
+            products=self._extract_products(root, page_num),
+            next_page_url=next_page_url,
+            has_captcha=False,
+            total_results=total_results,
+            results_per_page=results_per_page,
+        )
+    
+    async def _analyze_page_offloaded(self, html: str, page_num: int, dedupe: bool = True) -> PageAnalysis:
+        """
+        ``_analyze_page`` on the parse process pool, keeping the event loop free.
         
-        soup = BeautifulSoup(html, 'html.parser')
+        With ``dedupe=False`` products already in ``seen_asins`` are kept; pass
+        them through ``_unseen`` once earlier pages have been merged.
+        """
+        backend = self.parser_backend.name
+        if backend not in BACKENDS:
+            analysis = self._analyze_page(html, page_num)  # custom backends cannot be rebuilt in a worker
+        else:
+            rows, next_page_url, has_captcha, total_results, results_per_page = await run_parse(
+                _analyze_page_in_worker, html, page_num, backend
+            )
+            analysis = PageAnalysis(
+                products=[Product(*row) for row in rows],
+                next_page_url=next_page_url,
+                has_captcha=has_captcha,
+                total_results=total_results,
+                results_per_page=results_per_page,
+            )
+        if dedupe:
+            analysis.products = self._unseen(analysis.products)
+        return analysis
+    
+    def _unseen(self, products: list[Product]) -> list[Product]:
+        """Drop products whose ASIN is already in ``seen_asins`` and renumber ``rank_on_page``,
+        matching what ``_extract_products`` returns when it sees the current ``seen_asins``."""
+        unseen = [product for product in products if product.asin not in self.seen_asins]
+        for rank, product in enumerate(unseen, start=1):
+            product.rank_on_page = rank
+        return unseen
+    
+    def _total_results_hint(self, root: HtmlNode) -> tuple[Optional[int], Optional[int]]:
+        """(total results, results per page) from the info bar ('1-16 of over 2,000 results for ...'), if shown."""
+        for span in root.select(self.RESULT_INFO_SELECTOR):
+            match = re.search(
+                r'(?:(\d+)\s*-\s*(\d+)\s+)?of\s+(?:over\s+)?([\d,]+)\s+results',
+                span.text().replace('\xa0', ' ')
+            )
+            if match:
+                first, last, total = match.groups()
+                per_page = int(last) - int(first) + 1 if first and last and int(last) >= int(first) else None
+                return int(total.replace(',', '')), per_page
+        return None, None
+    
+    def _extract_products(self, root: HtmlNode, page_num: int) -> list[Product]:
+        """Extract products from a parsed results page using CSS selectors."""
+        products = []
         
         # Primary: div with data-asin attribute and s-result-item class
-        product_containers = soup.select('div[data-asin].s-result-item')
+        product_containers = root.select('div[data-asin].s-result-item')
         if not product_containers:
-            product_containers = soup.select('div[data-asin]')
+            product_containers = root.select('div[data-asin]')
         
         logger.info(f"Found {len(product_containers)} product containers on page {page_num}")
         
@@ -182,7 +306,7 @@ class AmazonScraper:
         for idx, container in enumerate(product_containers, start=1):
             try:
                 # Extract ASIN
-                asin = container.get('data-asin', '').strip()
+                asin = (container.attr('data-asin') or '').strip()
                 if not asin or asin in self.seen_asins:
                     continue
                 
@@ -190,29 +314,29 @@ class AmazonScraper:
                 title = None
                 title_elem = container.select_one('h2 a span')
                 if title_elem:
-                    title = title_elem.get_text(strip=True)
+                    title = title_elem.text()
                 else:
                     h2 = container.select_one('h2')
                     if h2:
-                        spans = h2.find_all('span')
+                        spans = h2.select('span')
                         if spans:
-                            title = spans[0].get_text(strip=True)
+                            title = spans[0].text()
                 
                 # Extract URL
                 url = None
                 title_link = container.select_one('h2 a')
-                if title_link and title_link.get('href'):
-                    url = self.AMAZON_DOMAIN + title_link.get('href')
+                if title_link and title_link.attr('href'):
+                    url = self.AMAZON_DOMAIN + title_link.attr('href')
                 else:
                     first_link = container.select_one('a[href*="/dp/"]')
                     if first_link:
-                        url = self.AMAZON_DOMAIN + first_link.get('href')
+                        url = self.AMAZON_DOMAIN + first_link.attr('href')
                 
                 # Extract image URL
                 image = None
                 img_elem = container.select_one('img')
-                if img_elem and img_elem.get('src'):
-                    image = img_elem.get('src')
+                if img_elem and img_elem.attr('src'):
+                    image = img_elem.attr('src')
                 
                 # Extract price
                 price_text = None
@@ -225,7 +349,7 @@ class AmazonScraper:
                     price_elem = container.select_one('.a-price')
                 
                 if price_elem:
-                    price_text = price_elem.get_text(strip=True)
+                    price_text = price_elem.text()
                     price = self._parse_price(price_text)
                     if price_text and '₹' in price_text:
                         currency = 'INR'
@@ -233,14 +357,14 @@ class AmazonScraper:
                 # Determine availability
                 available = price is not None
                 unavailable_elem = container.select_one('.a-size-base-plus.a-color-price')
-                if unavailable_elem and 'unavailable' in unavailable_elem.get_text(strip=True).lower():
+                if unavailable_elem and 'unavailable' in unavailable_elem.text().lower():
                     available = False
                 
                 # Extract rating value
                 rating_value = None
                 rating_elem = container.select_one('.a-star-small span')
                 if rating_elem:
-                    rating_text = rating_elem.get_text(strip=True)
+                    rating_text = rating_elem.text()
                     match = re.search(r'(\d+\.?\d*)', rating_text)
                     if match:
                         rating_value = float(match.group(1))
@@ -249,7 +373,7 @@ class AmazonScraper:
                 rating_count = None
                 rating_count_elem = container.select_one('.a-size-base')
                 if rating_count_elem:
-                    count_text = rating_count_elem.get_text(strip=True)
+                    count_text = rating_count_elem.text()
                     match = re.search(r'([\d,]+)', count_text)
                     if match:
                         try:
@@ -261,7 +385,7 @@ class AmazonScraper:
                 badges = []
                 badge_elems = container.select('[aria-label*="Prime"], .a-badge')
                 for badge_elem in badge_elems:
-                    badge_text = badge_elem.get_text(strip=True)
+                    badge_text = badge_elem.text()
                     if badge_text and badge_text not in badges:
                         badges.append(badge_text)
                 
@@ -292,7 +416,65 @@ class AmazonScraper:
                 logger.error(f"Error extracting product {idx}: {e}")
                 continue
         
-        return products, False
+        return products
+    
+    def _http_proxy(self, page_num: int) -> Optional[str]:
+        """Proxy for the HTTP tier: the configured proxies in rotation by page, or None to connect directly."""
+        return self.proxies[(page_num - 1) % len(self.proxies)] if self.proxies else None
+    
+    def _crawler_proxy(self):
+        """Proxy setting for the pooled crawler: the single proxy, the whole list, or None."""
+        if not self.proxies:
+            return None
+        return self.proxies[0] if len(self.proxies) == 1 else self.proxies
+    
+    async def _fetch_page(self, url: str, user_agent: str, page_num: int, dedupe: bool = True) -> Optional[PageAnalysis]:
+        """
+        Fetch and analyze one results page, over plain HTTP first.
+        
+        The HTTP response is kept when it is not a CAPTCHA and holds close to a
+        full page of products (per the "1-16 of N results" hint when shown);
+        otherwise the page is rendered in the browser. Every page is recorded
+        on ``http_fetcher`` so the HTTP hit rate can be tracked.
+        
+        Returns:
+            PageAnalysis, or None when the browser could not fetch the page either
+        """
+        if self.http_first:
+            html_content = await http_fetcher.get(
+                url, user_agent=user_agent, storage_state=self.storage_state, proxy=self._http_proxy(page_num)
+            )
+            if html_content is None:
+                escalation = "http_failed"
+            else:
+                analysis = await self._analyze_page_offloaded(html_content, page_num, dedupe=False)
+                if analysis.has_captcha:
+                    escalation = "captcha"
+                elif http_fetcher.is_short(len(analysis.products), self._expected_products(analysis, page_num)):
+                    escalation = "shortfall"
+                else:
+                    http_fetcher.record("amazon")
+                    self.fetch_counts["http"] += 1
+                    if dedupe:
+                        analysis.products = self._unseen(analysis.products)
+                    return analysis
+            http_fetcher.record("amazon", escalation)
+        
+        html_content = await self._crawl_page(url, user_agent)
+        if html_content is None:
+            return None
+        self.fetch_counts["browser"] += 1
+        return await self._analyze_page_offloaded(html_content, page_num, dedupe=dedupe)
+    
+    @staticmethod
+    def _expected_products(analysis: PageAnalysis, page_num: int) -> Optional[int]:
+        """Products a complete page ``page_num`` should hold, from the results hint; None when not shown."""
+        per_page = analysis.results_per_page
+        if not per_page:
+            return None
+        if analysis.total_results is None:
+            return per_page
+        return max(0, min(per_page, analysis.total_results - (page_num - 1) * per_page))
     
     async def _crawl_page(self, url: str, user_agent: str) -> Optional[str]:
         """
@@ -311,9 +493,12 @@ class AmazonScraper:
             try:
                 logger.info(f"Crawling: {url[:80]}... (attempt {retry_count + 1}/{self.MAX_RETRIES})")
                 
-                result = await self.crawler.arun(
+                result = await crawler_pool.arun(
                     url=url,
+                    headless=not self.headful,
+                    proxy=self._crawler_proxy(),
                     user_agent=user_agent,
+                    cache_mode=CacheMode.BYPASS,
                     bypass_cache=True,
                     wait_for='window.scrollY > 1000'
                 )
@@ -354,84 +539,15 @@ class AmazonScraper:
         
         logger.info(f"Starting search for: {query}")
         
-        crawler_kwargs = {
-            'headless': not self.headful,
-            'cache_mode': CacheMode.BYPASS,
-            'verbose': True,
-        }
-        
-        if self.proxies:
-            crawler_kwargs['proxy'] = self.proxies[0] if len(self.proxies) == 1 else self.proxies
-        
         try:
-            async with AsyncWebCrawler(**crawler_kwargs) as crawler:
-                self.crawler = crawler
-                user_agent_idx = 0
-                
-                while (self.current_page <= self.max_pages and 
-                       (self.max_items is None or len(self.all_products) < self.max_items)):
-                    
-                    try:
-                        # Build URL
-                        if self.current_page == 1:
-                            url = self.BASE_URL.format(query)
-                        else:
-                            url = self.next_page_url or f"{self.BASE_URL.format(query)}&page={self.current_page}"
-                        
-                        # Select user agent
-                        ua = self.user_agents[user_agent_idx % len(self.user_agents)]
-                        user_agent_idx += 1
-                        
-                        # Crawl page
-                        html_content = await self._crawl_page(url, ua)
-                        
-                        if html_content is None:
-                            break
-                        
-                        # Extract products
-                        products, has_captcha = self._extract_products_from_html(html_content, self.current_page)
-                        
-                        if has_captcha:
-                            self.errors.append(f"CAPTCHA detected on page {self.current_page}; stopping")
-                            break
-                        
-                        # Deduplicate and add
-                        for product in products:
-                            if product.asin not in self.seen_asins:
-                                self.seen_asins.add(product.asin)
-                                self.all_products.append(product)
-                                
-                                if self.max_items and len(self.all_products) >= self.max_items:
-                                    break
-                        
-                        self.pages_crawled += 1
-                        logger.info(f"Page {self.current_page} complete: {len(products)} products, total {len(self.all_products)}")
-                        
-                        # Detect next page
-                        from bs4 import BeautifulSoup
-                        soup = BeautifulSoup(html_content, 'html.parser')
-                        next_link = soup.select_one('li.a-last a')
-                        if not next_link:
-                            next_link = soup.select_one('a[aria-label="Next"]')
-                        
-                        if next_link and next_link.get('href'):
-                            self.next_page_url = self.AMAZON_DOMAIN + next_link.get('href')
-                            self.current_page += 1
-                        else:
-                            logger.info("No next page found")
-                            break
-                        
-                        # Throttle
-                        if self.current_page <= self.max_pages:
-                            await asyncio.sleep(self.throttle)
-                    
-                    except Exception as e:
-                        self.errors.append(f"Error on page {self.current_page}: {str(e)}")
-                        logger.error(f"Error on page {self.current_page}: {e}", exc_info=True)
-                        break
+            # Pages are fetched on the process-wide crawler pool, so no browser boots here
+            if self.speculative:
+                await self._crawl_speculative(query)
+            else:
+                await self._crawl_serial(query)
         
         except Exception as e:
-            self.errors.append(f"Crawler initialization error: {str(e)}")
+            self.errors.append(f"Crawler error: {str(e)}")
             logger.error(f"Crawler error: {e}", exc_info=True)
             self.status = ScraperStatus.ERROR
             return self._get_result_dict(query)
@@ -439,6 +555,139 @@ class AmazonScraper:
         self.status = ScraperStatus.COMPLETE
         return self._get_result_dict(query)
     
+    async def _crawl_serial(self, query: str):
+        """Crawl one page at a time, following the next-page link and throttling in between."""
+        user_agent_idx = 0
+        
+        while (self.current_page <= self.max_pages and 
+               (self.max_items is None or len(self.all_products) < self.max_items)):
+            
+            try:
+                # Build URL
+                if self.current_page == 1:
+                    url = self.BASE_URL.format(query)
+                else:
+                    url = self.next_page_url or self._page_url(query, self.current_page)
+                
+                # Select user agent
+                ua = self.user_agents[user_agent_idx % len(self.user_agents)]
+                user_agent_idx += 1
+                
+                # Fetch and analyze: products, next link and CAPTCHA verdict
+                analysis = await self._fetch_page(url, ua, self.current_page)
+                
+                if analysis is None:
+                    break
+                
+                if analysis.has_captcha:
+                    self.errors.append(f"CAPTCHA detected on page {self.current_page}; stopping")
+                    break
+                
+                self._add_products(analysis.products)
+                if analysis.total_results is not None:
+                    self.total_results = analysis.total_results
+                
+                self.pages_crawled += 1
+                logger.info(f"Page {self.current_page} complete: {len(analysis.products)} products, total {len(self.all_products)}")
+                
+                # Detect next page
+                self.next_page_url = analysis.next_page_url
+                if self.next_page_url:
+                    self.current_page += 1
+                else:
+                    logger.info("No next page found")
+                    break
+                
+                # Throttle
+                if self.current_page <= self.max_pages:
+                    await asyncio.sleep(self.throttle)
+            
+            except Exception as e:
+                self.errors.append(f"Error on page {self.current_page}: {str(e)}")
+                logger.error(f"Error on page {self.current_page}: {e}", exc_info=True)
+                break
+    
+    async def _crawl_speculative(self, query: str):
+        """
+        Fetch pages 1..max_pages by URL, up to ``concurrency`` at once, each with
+        the next user agent in rotation. Page N starts no sooner than
+        ``(N - 1) * throttle`` after page 1, so requests keep the serial crawl's
+        spacing; only the waiting overlaps. Pages are consumed in order, so products
+        keep their page order and ``seen_asins`` dedupes exactly as in a serial
+        crawl. The crawl stops, and pages still in flight are cancelled, at the
+        first failed page, CAPTCHA, last page or once ``max_items`` is reached.
+        """
+        slots = asyncio.Semaphore(self.concurrency)
+        started = asyncio.get_running_loop().time()
+        
+        async def fetch(page: int) -> Optional[PageAnalysis]:
+            delay = started + (page - 1) * self.throttle - asyncio.get_running_loop().time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with slots:
+                ua = self.user_agents[(page - 1) % len(self.user_agents)]
+                # Parsed as soon as it arrives, so pages parse in parallel on the pool; ASIN dedupe happens in page order below
+                return await self._fetch_page(self._page_url(query, page), ua, page, dedupe=False)
+        
+        tasks = [asyncio.create_task(fetch(page)) for page in range(1, self.max_pages + 1)]
+        last_page = self.max_pages
+        try:
+            for page, task in enumerate(tasks, start=1):
+                if page > last_page:
+                    break
+                self.current_page = page
+                try:
+                    analysis = await task
+                    if analysis is None:
+                        break
+                    
+                    analysis.products = self._unseen(analysis.products)
+                    if analysis.has_captcha:
+                        self.errors.append(f"CAPTCHA detected on page {page}; stopping")
+                        break
+                    
+                    self._add_products(analysis.products)
+                    self.pages_crawled += 1
+                    logger.info(f"Page {page} complete: {len(analysis.products)} products, total {len(self.all_products)}")
+                    
+                    if self.max_items is not None and len(self.all_products) >= self.max_items:
+                        break
+                    if page < self.max_pages and not analysis.next_page_url:
+                        logger.info("No next page found")
+                        break
+                    
+                    if analysis.total_results is not None:
+                        self.total_results = analysis.total_results
+                        if page == 1 and analysis.results_per_page:
+                            # Pages past the last one cannot have results; stop fetching them now
+                            last_page = min(last_page, -(-analysis.total_results // analysis.results_per_page))
+                            for extra in tasks[last_page:]:
+                                extra.cancel()
+                
+                except Exception as e:
+                    self.errors.append(f"Error on page {page}: {str(e)}")
+                    logger.error(f"Error on page {page}: {e}", exc_info=True)
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _page_url(self, query: str, page: int) -> str:
+        """Search URL for ``page``, derived directly rather than read from the previous page."""
+        url = self.BASE_URL.format(query)
+        return url if page == 1 else f"{url}&page={page}"
+    
+    def _add_products(self, products: list[Product]):
+        """Deduplicate by ASIN and append, stopping at max_items."""
+        for product in products:
+            if product.asin not in self.seen_asins:
+                self.seen_asins.add(product.asin)
+                self.all_products.append(product)
+                
+                if self.max_items and len(self.all_products) >= self.max_items:
+                    break
+    
     def _get_result_dict(self, query: str) -> dict:
         """Build result dictionary."""
         items_dicts = [asdict(p) for p in self.all_products]
@@ -449,6 +698,8 @@ class AmazonScraper:
             "meta": {
                 "pages_crawled": self.pages_crawled,
                 "items_extracted": len(self.all_products),
+                "total_results": self.total_results,
+                "fetched_over": dict(self.fetch_counts),
                 "query": query,
                 "status": self.status.value,
                 "max_pages": self.max_pages,
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Crawlers are shared per launch configuration: (headless, proxy).
+CrawlerKey = Tuple[bool, Optional[str]]
+
+
+@dataclass(eq=False)
+class PooledCrawler:
+    crawler: Any
+    pages: int = 0
+    failures: int = 0
+    in_flight: int = 0
+    retiring: bool = False
+
+
+class CrawlerPool:
+    """
+    Long-lived crawl4ai crawlers shared by the product scrapers.
+
+    Scrapers call ``arun`` instead of opening their own ``AsyncWebCrawler``, so
+    a search starts fetching at once instead of waiting for crawl4ai to boot a
+    browser. One crawler is kept per launch configuration and serves
+    concurrent pages. At most ``host_limit`` pages per host are in flight
+    across all scrapers. A crawler is recycled (replaced for new work and
+    closed once its in-flight pages finish) after ``max_pages`` pages or
+    ``max_failures`` consecutive crawl exceptions, which is how a crashed
+    browser shows up.
+    """
+
+    def __init__(self, max_pages: int = 200, max_failures: int = 2, host_limit: int = 4):
+        self.max_pages = max(1, max_pages)
+        self.max_failures = max(1, max_failures)
+        self.host_limit = max(1, host_limit)
+        self._crawlers: Dict[CrawlerKey, PooledCrawler] = {}
+        self._launching: Dict[CrawlerKey, asyncio.Task] = {}
+        self._retired: Set[PooledCrawler] = set()
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self.launches = 0
+        self.recycles = 0
+
+    async def start(self, headless: bool = True):
+        """Boot the default crawler ahead of the first search. Failures are logged, not raised."""
+        try:
+            await self._get((headless, None))
+            logger.info("Crawler pool started")
+        except Exception as e:
+            logger.warning(f"Could not pre-start a crawler: {e}")
+
+    async def stop(self):
+        """Close every crawler, including retired ones still finishing pages."""
+        if self._launching:
+            # Let in-flight launches land in the pool so they are closed below.
+            await asyncio.gather(*self._launching.values(), return_exceptions=True)
+        async with self._lock:
+            entries: List[PooledCrawler] = list(self._crawlers.values()) + list(self._retired)
+            self._crawlers.clear()
+            self._retired.clear()
+        for entry in entries:
+            await self._close(entry)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        logger.info("Crawler pool stopped")
+
+    async def _launch(self, headless: bool, proxy: Optional[Any]) -> PooledCrawler:
+        from crawl4ai import AsyncWebCrawler
+
+        kwargs: Dict[str, Any] = {"headless": headless, "verbose": False}
+        if proxy:
+            kwargs["proxy"] = proxy
+        crawler = AsyncWebCrawler(**kwargs)
+        await crawler.start()
+        self.launches += 1
+        logger.info(f"Launched pooled crawler #{self.launches} (headless={headless}, proxy={bool(proxy)})")
+        return PooledCrawler(crawler)
+
+    async def _get(self, key: CrawlerKey, proxy: Optional[Any] = None) -> PooledCrawler:
+        # The key holds the proxy's repr; the crawler is launched with the original value.
+        # The lock covers only the lookup: a slow launch for one key never blocks another,
+        # and concurrent callers for the same key share one launch.
+        async with self._lock:
+            entry = self._crawlers.get(key)
+            if entry is not None:
+                return entry
+            launch = self._launching.get(key)
+            if launch is None:
+                launch = self._launching[key] = asyncio.create_task(self._launch(key[0], proxy))
+                launch.add_done_callback(lambda task: self._launched(key, task))
+        return await asyncio.shield(launch)
+
+    def _launched(self, key: CrawlerKey, task: asyncio.Task):
+        self._launching.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._crawlers[key] = task.result()
+
+    def _retire(self, key: CrawlerKey, entry: PooledCrawler, reason: str):
+        if entry.retiring:
+            return
+        entry.retiring = True
+        self.recycles += 1
+        if self._crawlers.get(key) is entry:
+            del self._crawlers[key]
+        self._retired.add(entry)
+        logger.info(f"Recycling crawler after {reason}")
+
+    async def _close(self, entry: PooledCrawler):
+        try:
+            await entry.crawler.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled crawler: {e}")
+
+    def _close_later(self, entry: PooledCrawler):
+        self._retired.discard(entry)
+        task = asyncio.create_task(self._close(entry))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def arun(self, url: str, headless: bool = True, proxy: Optional[Any] = None, **run_kwargs: Any):
+        """``AsyncWebCrawler.arun(url=url, **run_kwargs)`` on the shared crawler for ``(headless, proxy)``."""
+        key: CrawlerKey = (headless, repr(proxy) if proxy is not None else None)
+        host = urlparse(url).netloc
+        host_slots = self._hosts.setdefault(host, asyncio.Semaphore(self.host_limit))
+
+        async with host_slots:
+            entry = await self._get(key, proxy)
+            entry.in_flight += 1
+            try:
+                result = await entry.crawler.arun(url=url, **run_kwargs)
+            except Exception:
+                entry.failures += 1
+                if entry.failures >= self.max_failures:
+                    self._retire(key, entry, f"{entry.failures} consecutive crawl errors")
+                raise
+            else:
+                entry.failures = 0
+                return result
+            finally:
+                entry.in_flight -= 1
+                entry.pages += 1
+                if entry.pages >= self.max_pages:
+                    self._retire(key, entry, f"{entry.pages} pages")
+                if entry.retiring and entry.in_flight == 0:
+                    self._close_later(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "crawlers": len(self._crawlers),
+            "retiring": len(self._retired),
+            "launches": self.launches,
+            "recycles": self.recycles,
+            "pages": {f"headless={k[0]},proxy={k[1] is not None}": e.pages for k, e in self._crawlers.items()},
+        }
+
+
+# Process-wide pool. Started and stopped by the FastAPI lifespan in api/main.py;
+# crawlers also launch lazily on first use so the CLIs work without it.
+crawler_pool = CrawlerPool(
+    max_pages=int(os.getenv("CRAWLER_MAX_PAGES", "200")),
+    host_limit=int(os.getenv("CRAWLER_HOST_LIMIT", "4")),
+)
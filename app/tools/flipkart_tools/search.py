@@ -7,23 +7,28 @@ import random
 from argparse import ArgumentParser
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List, Dict, Set, Any
+from typing import Optional, List, Dict, Set, Any, Union
 from urllib.parse import urljoin, urlparse
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, astuple
 from abc import ABC, abstractmethod
 
 try:
-    from crawl4ai import AsyncWebCrawler
+    from crawl4ai import AsyncWebCrawler  # noqa: F401 - pages are fetched through crawler_pool
 except ImportError:
     print("ERROR: Crawl4AI not installed. Install with: pip install crawl4ai")
     exit(1)
 
 try:
-    from bs4 import BeautifulSoup
+    from bs4 import BeautifulSoup  # noqa: F401 - fallback parser backend
 except ImportError:
     print("ERROR: BeautifulSoup4 not installed. Install with: pip install beautifulsoup4")
     exit(1)
 
+from app.tools.html_parsing import BACKENDS, HtmlBackend, HtmlNode, backend_by_name, default_backend
+from app.tools.crawler_pool import crawler_pool
+from app.tools.http_fetch import http_fetcher
+from app.tools.parse_pool import run_parse
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -84,14 +89,21 @@ class FlipkartParser(Parser):
         "image": "img",
     }
 
+    def __init__(self, backend: Optional[HtmlBackend] = None):
+        """
+        Args:
+            backend: HTML parser backend (default: fastest installed, see html_parsing.default_backend)
+        """
+        self.backend = backend or default_backend()
+
     def parse(self, html: str, base_url: str) -> List[Product]:
         """Parse Flipkart HTML and extract products."""
-        soup = BeautifulSoup(html, "html.parser")
+        root = self.backend.parse(html)
         products = []
         seen_ids: Set[str] = set()
 
         # Find all product containers
-        containers = soup.select("div[class*='col-12-12']") or soup.select("a[href*='/p/']")
+        containers = root.select("div[class*='col-12-12']") or root.select("a[href*='/p/']")
 
         for container in containers[:50]:  # Safety limit
             product = self._parse_card(container, base_url)
@@ -101,68 +113,68 @@ class FlipkartParser(Parser):
 
         return products
 
-    def _parse_card(self, card: Any, base_url: str) -> Optional[Product]:
+    def _parse_card(self, card: HtmlNode, base_url: str) -> Optional[Product]:
         """Parse single product card."""
         try:
             product = Product()
 
             # Product link & ID
-            link = card.select_one(self.SELECTORS["product_link"]) if hasattr(card, 'select_one') else None
-            if link and link.get("href"):
-                product.product_url = urljoin(base_url, link["href"])
+            link = card.select_one(self.SELECTORS["product_link"])
+            if link and link.attr("href"):
+                product.product_url = urljoin(base_url, link.attr("href"))
                 product.id = self._generate_id(product.product_url)
             else:
                 return None
 
             # Title
-            title_elem = card.select_one(self.SELECTORS["title"]) if hasattr(card, 'select_one') else None
+            title_elem = card.select_one(self.SELECTORS["title"])
             if title_elem:
-                product.title = title_elem.get_text(strip=True)
+                product.title = title_elem.text()
             elif link:
-                product.title = link.get_text(strip=True) or link.get("title")
+                product.title = link.text() or link.attr("title")
 
             if not product.title:
                 return None
 
             # Price
-            price_elem = card.select_one(self.SELECTORS["price"]) if hasattr(card, 'select_one') else None
+            price_elem = card.select_one(self.SELECTORS["price"])
             if price_elem:
-                product.price = self._parse_price(price_elem.get_text(strip=True))
+                product.price = self._parse_price(price_elem.text())
 
             # Original price
-            orig_elem = card.select_one(self.SELECTORS["original_price"]) if hasattr(card, 'select_one') else None
+            orig_elem = card.select_one(self.SELECTORS["original_price"])
             if orig_elem:
-                product.original_price = self._parse_price(orig_elem.get_text(strip=True))
+                product.original_price = self._parse_price(orig_elem.text())
 
             # Discount
-            disc_elem = card.select_one(self.SELECTORS["discount"]) if hasattr(card, 'select_one') else None
+            disc_elem = card.select_one(self.SELECTORS["discount"])
             if disc_elem:
-                product.discount_percent = self._parse_price(disc_elem.get_text(strip=True))
+                product.discount_percent = self._parse_price(disc_elem.text())
 
             # Rating
-            rating_elem = card.select_one(self.SELECTORS["rating"]) if hasattr(card, 'select_one') else None
+            rating_elem = card.select_one(self.SELECTORS["rating"])
             if rating_elem:
-                product.rating = self._parse_rating(rating_elem.get_text(strip=True))
+                product.rating = self._parse_rating(rating_elem.text())
 
             # Rating count
-            count_elem = card.select_one(self.SELECTORS["rating_count"]) if hasattr(card, 'select_one') else None
+            count_elem = card.select_one(self.SELECTORS["rating_count"])
             if count_elem:
-                product.rating_count = self._parse_price(count_elem.get_text(strip=True))
+                product.rating_count = self._parse_price(count_elem.text())
 
             # Seller
-            seller_elem = card.select_one(self.SELECTORS["seller"]) if hasattr(card, 'select_one') else None
+            seller_elem = card.select_one(self.SELECTORS["seller"])
             if seller_elem:
-                product.seller = seller_elem.get_text(strip=True)
+                product.seller = seller_elem.text()
 
             # Availability
-            avail_elem = card.select_one(self.SELECTORS["availability"]) if hasattr(card, 'select_one') else None
+            avail_elem = card.select_one(self.SELECTORS["availability"])
             if avail_elem:
-                product.availability = avail_elem.get_text(strip=True)
+                product.availability = avail_elem.text()
 
             # Image
-            img = card.select_one(self.SELECTORS["image"]) if hasattr(card, 'select_one') else None
-            if img and img.get("src"):
-                product.image_urls = [urljoin(base_url, img["src"])]
+            img = card.select_one(self.SELECTORS["image"])
+            if img and img.attr("src"):
+                product.image_urls = [urljoin(base_url, img.attr("src"))]
 
             return product
         except Exception as e:
@@ -199,8 +211,13 @@ class FlipkartParser(Parser):
         return float(match.group(1)) if match else None
 
 
+def _parse_in_worker(html: str, base_url: str, backend: str) -> List[tuple]:
+    """Parse-pool entry point: FlipkartParser output as field tuples (see ``Product``), compact to pickle."""
+    return [astuple(product) for product in FlipkartParser(backend_by_name(backend)).parse(html, base_url)]
+
+
 class RateLimiter:
-    """Rate limiter with exponential backoff."""
+    """Rate limiter with exponential backoff. Concurrent callers get evenly spaced start slots."""
 
     def __init__(self, delay: float = 1.0):
         self.delay = delay
@@ -208,11 +225,13 @@ class RateLimiter:
         self.backoff_factor = 1.0
 
     async def wait(self):
-        """Wait before next request."""
-        elapsed = asyncio.get_event_loop().time() - self.last_request
-        if elapsed < self.delay * self.backoff_factor:
-            await asyncio.sleep(self.delay * self.backoff_factor - elapsed)
-        self.last_request = asyncio.get_event_loop().time()
+        """Wait for this request's slot: ``delay * backoff_factor`` after the previous one."""
+        now = asyncio.get_event_loop().time()
+        # Claim the slot before sleeping so concurrent waiters queue up instead of firing together
+        slot = max(now, self.last_request + self.delay * self.backoff_factor)
+        self.last_request = slot
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
     def reset(self):
         """Reset backoff."""
@@ -259,6 +278,8 @@ class FlipkartCrawler:
         ignore_robots: bool = False,
         proxy_file: Optional[str] = None,
         parser: Optional[Parser] = None,
+        http_first: bool = True,
+        storage_state: Optional[Union[str, Dict[str, Any]]] = None,
     ):
         """
         Initialize Flipkart crawler.
@@ -270,6 +291,8 @@ class FlipkartCrawler:
             ignore_robots: Ignore robots.txt
             proxy_file: Path to proxy list file
             parser: Custom parser (default: FlipkartParser)
+            http_first: Try each page over plain HTTP before rendering it in the browser
+            storage_state: Playwright storage_state (path or dict) whose cookies the HTTP tier sends
         """
         self.concurrency = concurrency
         self.timeout = timeout * 1000  # Convert to milliseconds
@@ -277,7 +300,10 @@ class FlipkartCrawler:
         self.parser = parser or FlipkartParser()
         self.rate_limiter = RateLimiter(rate_limit_delay)
         self.proxy_manager = ProxyManager(proxy_file)
+        self.http_first = http_first
+        self.storage_state = storage_state
         self.products: Dict[str, Product] = {}
+        self.fetch_counts = {"http": 0, "browser": 0}
 
         if not ignore_robots:
             logger.info("robots.txt checking enabled")
@@ -302,47 +328,91 @@ class FlipkartCrawler:
             List of Product objects
         """
         self.products.clear()
+        self.fetch_counts = {"http": 0, "browser": 0}
         logger.info(f"Starting search for: {query}")
 
-        async with AsyncWebCrawler(crawler_type="async", concurrency=self.concurrency) as crawler:
-            page = 1
-            empty_pages = 0
+        # Pages render concurrently on the shared crawler pool (at most `concurrency` at once) but are
+        # merged in page order, so the empty-page rule and the callback see the same sequence as a serial crawl.
+        slots = asyncio.Semaphore(max(1, self.concurrency))
 
-            while page <= max_pages and empty_pages < 2:
-                url = f"{self.SEARCH_URL}?q={query}&page={page}"
+        async def fetch(page: int):
+            url = f"{self.SEARCH_URL}?q={query}&page={page}"
+            async with slots:
                 logger.info(f"Crawling page {page}")
+                # One rate-limit slot per page, whichever tier ends up serving it
+                await self.rate_limiter.wait()
+                batch = await self._fetch_http(url) if self.http_first else None
+                if batch is not None:
+                    return batch
+                html = await self._fetch_page(url)
+            if not html:
+                return None
+            self.fetch_counts["browser"] += 1
+            # Parse as soon as the page arrives so pages parse in parallel, off the event loop
+            return await self._parse_offloaded(html, url)
 
-                html = await self._fetch_page(crawler, url)
-                if not html:
+        tasks = [asyncio.create_task(fetch(page)) for page in range(1, max_pages + 1)]
+        empty_pages = 0
+        try:
+            for page, task in enumerate(tasks, start=1):
+                batch = await task
+                if batch is None:
                     empty_pages += 1
-                    page += 1
-                    continue
-
-                batch = self.parser.parse(html, url)
-                new_count = self._add_products(batch)
+                else:
+                    new_count = self._add_products(batch)
 
-                logger.info(f"Page {page}: {len(batch)} items, {new_count} new")
+                    logger.info(f"Page {page}: {len(batch)} items, {new_count} new")
 
-                if callback:
-                    callback(batch)
+                    if callback:
+                        callback(batch)
 
-                if new_count == 0:
-                    empty_pages += 1
-                else:
-                    empty_pages = 0
+                    if new_count == 0:
+                        empty_pages += 1
+                    else:
+                        empty_pages = 0
 
-                page += 1
-                await self.rate_limiter.wait()
+                if empty_pages >= 2:
+                    logger.info(f"Stopping after page {page}: no new products on the last 2 pages")
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         result = list(self.products.values())
         logger.info(f"Total products: {len(result)}")
         return result
 
-    async def _fetch_page(self, crawler: AsyncWebCrawler, url: str) -> Optional[str]:
-        """Fetch single page."""
+    async def _parse_offloaded(self, html: str, url: str) -> List[Product]:
+        """Run the parser on the parse process pool; parsers other than FlipkartParser run inline."""
+        backend = getattr(self.parser, "backend", None)
+        if type(self.parser) is not FlipkartParser or backend.name not in BACKENDS:
+            return self.parser.parse(html, url)
+        rows = await run_parse(_parse_in_worker, html, url, backend.name)
+        return [Product(*row) for row in rows]
+
+    async def _fetch_http(self, url: str) -> Optional[List[Product]]:
+        """
+        Fetch and parse a page over plain HTTP. Returns the products when the
+        parser found enough cards for a full page, else None so the caller
+        renders it in the browser; either way the outcome is recorded.
+        """
+        html = await http_fetcher.get(url, storage_state=self.storage_state, proxy=self.proxy_manager.get_proxy())
+        if html is None:
+            http_fetcher.record("flipkart", "http_failed")
+            return None
+        batch = await self._parse_offloaded(html, url)
+        if http_fetcher.is_short(len(batch)):
+            http_fetcher.record("flipkart", "shortfall")
+            return None
+        http_fetcher.record("flipkart")
+        self.fetch_counts["http"] += 1
+        return batch
+
+    async def _fetch_page(self, url: str) -> Optional[str]:
+        """Fetch single page in the browser. The caller has already waited for its rate-limit slot."""
         try:
-            await self.rate_limiter.wait()
-            result = await crawler.arun(
+            result = await crawler_pool.arun(
                 url=url,
                 bypass_cache=True,
                 timeout=self.timeout,
@@ -422,6 +492,7 @@ class FlipkartCrawler:
                 if any(p.rating for p in prods)
                 else None
             ),
+            "fetched_over": dict(self.fetch_counts),
         }
 
 
@@ -449,7 +520,11 @@ async def main():
     def log_batch(batch):
         logger.info(f"  Batch: {len(batch)} products")
 
-    products = await crawler.search(args.query, max_pages=args.max_pages, callback=log_batch)
+    try:
+        products = await crawler.search(args.query, max_pages=args.max_pages, callback=log_batch)
+    finally:
+        await crawler_pool.stop()
+        await http_fetcher.close()
 
     if not args.dry_run and products:
         crawler.save_json(args.output_dir, query_slug)
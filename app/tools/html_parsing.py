@@ -0,0 +1,250 @@
+"""
+Pluggable HTML parsing backends for the product scrapers.
+
+Scrapers parse through the small ``HtmlNode`` interface (CSS ``select`` /
+``select_one``, ``text`` and ``attr``) instead of BeautifulSoup directly, so a
+compiled parser can be swapped in. ``default_backend()`` picks the fastest one
+installed: selectolax (lexbor), then lxml (+ cssselect), then BeautifulSoup with
+``html.parser``. Set ``HTML_PARSER_BACKEND`` to ``selectolax``, ``lxml`` or
+``soup`` to force one.
+
+``text()`` follows BeautifulSoup's ``get_text(strip=True)``: every text node
+under the element is stripped, empty ones are dropped, the rest are joined
+with no separator, and ``<script>``, ``<style>`` and ``<template>`` contents
+are not text. That keeps scraper output the same whichever backend parsed it.
+"""
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Elements whose contents BeautifulSoup does not treat as text.
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+
+class HtmlNode(ABC):
+    """An element of a parsed document."""
+
+    @abstractmethod
+    def select(self, css: str) -> List["HtmlNode"]:
+        """Descendants matching ``css``, in document order."""
+
+    def select_one(self, css: str) -> Optional["HtmlNode"]:
+        """First descendant matching ``css``, or None."""
+        matches = self.select(css)
+        return matches[0] if matches else None
+
+    @abstractmethod
+    def text(self) -> str:
+        """Stripped text content (``get_text(strip=True)`` semantics)."""
+
+    @abstractmethod
+    def attr(self, name: str) -> Optional[str]:
+        """Attribute value, or None when absent."""
+
+
+class HtmlBackend(ABC):
+    """Turns HTML into a root ``HtmlNode``."""
+
+    name = "base"
+
+    @abstractmethod
+    def parse(self, html: str) -> HtmlNode:
+        pass
+
+
+# --- BeautifulSoup (pure Python, always available) ---
+
+class SoupNode(HtmlNode):
+    def __init__(self, tag):
+        self._tag = tag
+
+    def select(self, css: str) -> List[HtmlNode]:
+        return [SoupNode(tag) for tag in self._tag.select(css)]
+
+    def select_one(self, css: str) -> Optional[HtmlNode]:
+        tag = self._tag.select_one(css)
+        return SoupNode(tag) if tag is not None else None
+
+    def text(self) -> str:
+        return self._tag.get_text(strip=True)
+
+    def attr(self, name: str) -> Optional[str]:
+        value = self._tag.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+
+class SoupBackend(HtmlBackend):
+    name = "soup"
+
+    def parse(self, html: str) -> HtmlNode:
+        from bs4 import BeautifulSoup
+        return SoupNode(BeautifulSoup(html, "html.parser"))
+
+
+# --- selectolax (lexbor, C) ---
+
+class SelectolaxNode(HtmlNode):
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, css: str) -> List[HtmlNode]:
+        # lexbor's css() can match the node itself; BeautifulSoup and lxml return descendants only
+        return [SelectolaxNode(node) for node in self._node.css(css) if node != self._node]
+
+    def text(self) -> str:
+        parts = []
+        for node in self._node.traverse(include_text=True):
+            if node.tag != "-text" or node.parent is None or node.parent.tag in _NON_TEXT_TAGS:
+                continue
+            part = node.text_content.strip()
+            if part:
+                parts.append(part)
+        return "".join(parts)
+
+    def attr(self, name: str) -> Optional[str]:
+        attributes = self._node.attributes
+        if name not in attributes:
+            return None
+        return attributes[name] or ""  # valueless attributes read as "" like BeautifulSoup
+
+
+class SelectolaxBackend(HtmlBackend):
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser_cls = LexborHTMLParser
+
+    def parse(self, html: str) -> HtmlNode:
+        tree = self._parser_cls(html)
+        return SelectolaxNode(tree.root if tree.root is not None else tree.body)
+
+
+# --- lxml (libxml2, C) ---
+
+class LxmlNode(HtmlNode):
+    def __init__(self, element, selectors: Dict[str, object]):
+        self._element = element
+        self._selectors = selectors  # compiled CSSSelector cache shared by one backend
+
+    def _compiled(self, css: str):
+        selector = self._selectors.get(css)
+        if selector is None:
+            from lxml.cssselect import CSSSelector
+            selector = self._selectors[css] = CSSSelector(css)
+        return selector
+
+    def select(self, css: str) -> List[HtmlNode]:
+        return [LxmlNode(element, self._selectors) for element in self._compiled(css)(self._element)
+                if element is not self._element]
+
+    def text(self) -> str:
+        parts = []
+        for part in self._element.xpath(".//text()"):
+            parent = part.getparent()
+            if parent is None:
+                continue
+            # A tail string belongs to the parent of the element it trails.
+            owner = parent.getparent() if part.is_tail else parent
+            if owner is not None and isinstance(owner.tag, str) and owner.tag in _NON_TEXT_TAGS:
+                continue
+            part = part.strip()
+            if part:
+                parts.append(part)
+        return "".join(parts)
+
+    def attr(self, name: str) -> Optional[str]:
+        return self._element.get(name)
+
+
+class LxmlBackend(HtmlBackend):
+    name = "lxml"
+
+    def __init__(self):
+        import cssselect  # noqa: F401 - required by lxml.cssselect
+        from lxml import html as lxml_html
+        self._fromstring = lxml_html.document_fromstring
+        self._selectors: Dict[str, object] = {}
+
+    def parse(self, html: str) -> HtmlNode:
+        return LxmlNode(self._fromstring(html), self._selectors)
+
+
+BACKENDS = {
+    "selectolax": SelectolaxBackend,
+    "lxml": LxmlBackend,
+    "soup": SoupBackend,
+}
+
+_default: Optional[HtmlBackend] = None
+
+
+def default_backend() -> HtmlBackend:
+    """The configured (``HTML_PARSER_BACKEND``) or fastest available backend, created once."""
+    global _default
+    if _default is not None:
+        return _default
+
+    requested = os.getenv("HTML_PARSER_BACKEND", "").lower()
+    order = [requested] if requested in BACKENDS else ["selectolax", "lxml", "soup"]
+    if "soup" not in order:
+        order.append("soup")
+    for name in order:
+        try:
+            _default = BACKENDS[name]()
+            break
+        except ImportError as e:
+            logger.debug(f"HTML backend {name} unavailable: {e}")
+    logger.info(f"Using HTML parser backend: {_default.name}")
+    return _default
+
+
+_by_name: Dict[str, HtmlBackend] = {}
+
+
+def backend_by_name(name: str) -> HtmlBackend:
+    """A shared instance of the named backend; how parse-pool workers rebuild the caller's choice."""
+    backend = _by_name.get(name)
+    if backend is None:
+        backend = _by_name[name] = BACKENDS[name]()
+    return backend
+
+
+# --- Parity check: python -m app.tools.html_parsing ---
+
+_PARITY_HTML = """<html><head><title>Results</title><style>.x{}</style></head><body>
+<div class="col-12-12"><a href="/item/p/ITM1?pid=1" title="One"><div class="s1Q50tG"> Phone <b>One</b> </div>
+<div class="Nx9bqj">&#8377;1,299</div><img src="/img/1.jpg" alt></a><script>var t = "not text";</script></div>
+<a href="/item/p/ITM2"><span>Two</span> card</a>
+</body></html>"""
+
+_PARITY_QUERIES = ("div[class*='col-12-12']", "a[href*='/p/']", "[class*='Nx9bqj']", "img", "title")
+
+
+def _parity_view(backend: HtmlBackend) -> List[tuple]:
+    root = backend.parse(_PARITY_HTML)
+    view = []
+    for css in _PARITY_QUERIES:
+        for node in root.select(css):
+            # Re-selecting the same query inside each match covers nodes that match their own selector
+            inner = node.select_one(css)
+            view.append((css, node.text(), node.attr("href"), node.attr("alt"),
+                         inner.text() if inner else None, len(node.select(css))))
+    return view
+
+
+if __name__ == "__main__":
+    views = {}
+    for name, cls in BACKENDS.items():
+        try:
+            views[name] = _parity_view(cls())
+        except ImportError as e:
+            print(f"{name}: unavailable ({e})")
+    reference = views.get("soup")
+    for name, view in views.items():
+        print(f"{name}: {'matches soup' if view == reference else 'DIFFERS from soup'}")
+    if any(view != reference for view in views.values()):
+        raise SystemExit(1)
@@ -0,0 +1,225 @@
+"""
+HTTP-first fetch tier for the product scrapers.
+
+Amazon and Flipkart search results are mostly server-rendered, so a plain GET
+usually returns every product card. Scrapers try ``http_fetcher.get`` first,
+check the parsed card count with ``is_short``, and fall back to rendering the
+page on the crawler pool only when the HTTP response failed, came back short
+or was a CAPTCHA. ``record`` counts HTTP hits and escalations (by reason) per
+site; ``stats()`` reports the hit rate.
+
+One ``httpx.AsyncClient`` per proxy (``None`` for direct) is shared
+process-wide: keep-alive connections, HTTP/2 when ``h2`` is installed, and
+Chrome-like navigation headers. Cookies come from a Playwright
+``storage_state`` (file path or dict) passed per request and live in a
+per-fetch ``httpx.Cookies`` jar. Redirects are followed here rather than by
+httpx, which would rebuild each hop's cookies from the shared client jar, so
+the session and any cookies set along the way survive every hop. The shared
+jar accepts nothing, so one user's session never leaks into another's
+request.
+
+``HTTP_FETCH_ENABLED=0`` turns the tier off (every page renders in the
+browser). ``HTTP_FETCH_MIN_CARDS`` and ``HTTP_FETCH_MIN_RATIO`` tune the
+completeness check.
+"""
+import json
+import logging
+import os
+from collections import defaultdict
+from http.cookiejar import Cookie, CookieJar, DefaultCookiePolicy
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Headers Chrome sends on a top-level navigation. Accept-Encoding is left to httpx,
+# which only advertises the encodings it can decode.
+BROWSER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-IN,en-GB;q=0.9,en;q=0.8",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+}
+
+StorageState = Union[str, Dict[str, Any]]
+
+MAX_REDIRECTS = 10
+
+
+def _state_cookie(cookie: Dict[str, Any]) -> Cookie:
+    """A cookiejar ``Cookie`` from a storage_state entry, keeping its domain, path, secure flag and expiry."""
+    domain = cookie.get("domain", "")
+    expires = cookie.get("expires", -1)
+    return Cookie(
+        version=0, name=cookie["name"], value=cookie["value"], port=None, port_specified=False,
+        domain=domain, domain_specified=bool(domain), domain_initial_dot=domain.startswith("."),
+        path=cookie.get("path") or "/", path_specified=True, secure=bool(cookie.get("secure")),
+        expires=int(expires) if expires and expires > 0 else None, discard=not (expires and expires > 0),
+        comment=None, comment_url=None, rest={"HttpOnly": None} if cookie.get("httpOnly") else {},
+    )
+
+
+class HttpFetcher:
+    """Shared HTTP client for search pages, plus per-site hit/escalation counters."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        min_cards: int = 8,
+        min_ratio: float = 0.75,
+    ):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.max_connections = max(1, max_connections)
+        self.min_cards = max(1, min_cards)
+        self.min_ratio = min_ratio
+        self._clients: Dict[Optional[str], Any] = {}
+        self._states: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._pages: Dict[str, int] = defaultdict(int)
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._escalations: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _client(self, proxy: Optional[str] = None):
+        client = self._clients.get(proxy)
+        if client is None:
+            import httpx
+
+            try:
+                import h2  # noqa: F401 - enables HTTP/2 in httpx
+                http2 = True
+            except ImportError:
+                http2 = False
+            client = self._clients[proxy] = httpx.AsyncClient(
+                http2=http2,
+                proxy=proxy,
+                headers=BROWSER_HEADERS,
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0,
+                ),
+            )
+            logger.info(f"HTTP fetch client created (http2={http2}, proxy={bool(proxy)})")
+        return client
+
+    async def close(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    # --- Cookies from storage_state ---
+
+    def _state_cookies(self, storage_state: StorageState) -> List[Dict[str, Any]]:
+        if isinstance(storage_state, dict):
+            return storage_state.get("cookies", [])
+        try:
+            mtime = os.path.getmtime(storage_state)
+        except OSError:
+            return []
+        cached = self._states.get(storage_state)
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(storage_state, "r", encoding="utf-8") as f:
+                    cookies = json.load(f).get("cookies", [])
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable storage state {storage_state}: {e}")
+                cookies = []
+            cached = self._states[storage_state] = (mtime, cookies)
+        return cached[1]
+
+    def cookies(self, storage_state: Optional[StorageState] = None):
+        """A fresh ``httpx.Cookies`` jar for one fetch, seeded from ``storage_state``; cookies are matched per URL as a browser would."""
+        import httpx
+
+        jar = httpx.Cookies()
+        if storage_state:
+            for cookie in self._state_cookies(storage_state):
+                jar.jar.set_cookie(_state_cookie(cookie))
+        return jar
+
+    # --- Fetching ---
+
+    async def get(
+        self,
+        url: str,
+        user_agent: Optional[str] = None,
+        storage_state: Optional[StorageState] = None,
+        proxy: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Page HTML over plain HTTP (through ``proxy`` when given), or None when
+        the tier is off or the request failed or was refused.
+        """
+        if not self.enabled:
+            return None
+        headers = {"User-Agent": user_agent} if user_agent else {}
+        try:
+            client = self._client(proxy)
+            cookies = self.cookies(storage_state)
+            for _ in range(MAX_REDIRECTS + 1):
+                request = client.build_request("GET", url, headers=headers, cookies=cookies)
+                response = await client.send(request)
+                if not response.has_redirect_location:
+                    break
+                cookies.extract_cookies(response)
+                url = str(response.next_request.url)
+                await response.aclose()
+        except ImportError:
+            logger.warning("httpx is not installed; HTTP-first fetching disabled")
+            self.enabled = False
+            return None
+        except Exception as e:
+            logger.info(f"HTTP fetch failed for {url[:80]}: {e}")
+            return None
+        if response.status_code != 200:
+            logger.info(f"HTTP fetch got {response.status_code} for {url[:80]}")
+            return None
+        return response.text
+
+    def is_short(self, cards: int, expected: Optional[int] = None) -> bool:
+        """True when ``cards`` falls short of a complete page: ``min_ratio`` of ``expected`` when known, else ``min_cards``."""
+        if expected:
+            return cards < max(1, int(expected * self.min_ratio))
+        return cards < self.min_cards
+
+    # --- Hit rate ---
+
+    def record(self, site: str, escalation: Optional[str] = None):
+        """Count a page for ``site``: an HTTP hit, or an escalation to the browser with its reason."""
+        self._pages[site] += 1
+        if escalation is None:
+            self._hits[site] += 1
+        else:
+            self._escalations[site][escalation] += 1
+            logger.info(f"{site}: escalating to browser ({escalation})")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            site: {
+                "pages": pages,
+                "http_hits": self._hits[site],
+                "hit_rate": round(self._hits[site] / pages, 3),
+                "escalations": dict(self._escalations[site]),
+            }
+            for site, pages in self._pages.items()
+        }
+
+
+# Process-wide fetcher shared by the scrapers; closed by the FastAPI lifespan in api/main.py.
+http_fetcher = HttpFetcher(
+    enabled=os.getenv("HTTP_FETCH_ENABLED", "1") != "0",
+    timeout=float(os.getenv("HTTP_FETCH_TIMEOUT", "10")),
+    max_connections=int(os.getenv("HTTP_FETCH_MAX_CONNECTIONS", "20")),
+    min_cards=int(os.getenv("HTTP_FETCH_MIN_CARDS", "8")),
+    min_ratio=float(os.getenv("HTTP_FETCH_MIN_RATIO", "0.75")),
+)
@@ -0,0 +1,62 @@
+"""
+Process pool for HTML parsing.
+
+Parsing a 1-2 MB results page is pure CPU work; done on the event loop it
+stalls every other request in the process. Scrapers hand pages to
+``run_parse`` instead, which runs a module-level worker function in a
+bounded ``ProcessPoolExecutor``. Workers receive the HTML string (pickled as
+UTF-8 bytes) and should return plain tuples rather than dataclass instances,
+which keeps the result pickles small and cheap to rebuild.
+
+``PARSE_WORKERS`` sets the pool size (default: up to 4, one per core);
+``PARSE_WORKERS=0`` parses inline, e.g. for one-off CLI runs.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _workers() -> int:
+    configured = os.getenv("PARSE_WORKERS")
+    if configured is not None:
+        return max(0, int(configured))
+    return min(4, os.cpu_count() or 1)
+
+
+def _pool() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if _executor is None and _workers() > 0:
+        # spawn, not fork: the server process runs threads (uvicorn, Playwright) that fork would copy mid-flight
+        _executor = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"HTML parse pool started with {_workers()} workers")
+    return _executor
+
+
+async def run_parse(fn: Callable[..., Any], *args) -> Any:
+    """Run ``fn(*args)`` in the parse pool; inline when the pool is disabled or has crashed."""
+    global _executor
+    pool = _pool()
+    if pool is None:
+        return fn(*args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        logger.error("HTML parse pool crashed; restarting it and parsing this page inline")
+        _executor = None
+        return fn(*args)
+
+
+def shutdown_parse_pool():
+    """Stop the worker processes. Called from the app lifespan."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None